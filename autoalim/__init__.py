@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+네이버 스마트스토어 / 쿠팡 신규 주문에 카카오 알림톡(알리고)을 자동 발송합니다.
+
+    python -m autoalim --help
+
+import 비용을 줄이기 위해 여기서는 하위 모듈을 미리 불러오지 않습니다.
+"""
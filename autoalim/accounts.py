@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+판매자 계정(스토어) 목록.
+
+ACCOUNTS_FILE(기본 accounts.json)이 있으면 계정마다 네이버/쿠팡 자격증명을 읽고,
+없으면 예전처럼 NAVER_* / COUPANG_* 환경변수로 "default" 계정 하나를 만듭니다.
+문자열 값의 ${변수} 는 환경변수로 바뀌므로 비밀값은 .env 에 두고 이름만 적을 수 있습니다.
+
+    {"accounts": [
+        {"name": "default",
+         "naver":   {"client_id": "${NAVER_CLIENT_ID}", "client_secret": "${NAVER_CLIENT_SECRET}", "account_id": "..."},
+         "coupang": {"access_key": "...", "secret_key": "${COUPANG_SECRET_KEY}", "vendor_id": "A00012345"}},
+        {"name": "store-b",
+         "naver":   {"client_id": "...", "client_secret": "${STORE_B_NAVER_SECRET}", "account_id": "..."}}
+    ]}
+
+naver / coupang 외의 섹션은 같은 이름으로 등록된 판매처 플러그인(marketplace.register)의 자격증명이 됩니다.
+계정마다 토큰 캐시 파일, 조회 워터마크, 발송 기록(중복 확인) 이름이 따로 잡힙니다.
+"default" 계정은 예전 이름("naver", "coupang", .naver_access_token)을 그대로 써서 기존 기록이 이어집니다.
+"""
+import json
+import os
+from pathlib import Path
+
+
+ACCOUNTS_FILE   = Path(os.getenv("ACCOUNTS_FILE", "accounts.json"))
+DEFAULT_ACCOUNT = "default"
+
+
+class Account:
+    def __init__(self, name, naver=None, coupang=None, **others):
+        self.name = name
+        # 판매처 이름 → 자격증명 dict (자격증명이 없는 판매처는 빠짐)
+        #   naver   : {"client_id", "client_secret", "account_id", "type"}
+        #   coupang : {"access_key", "secret_key", "vendor_id", "statuses"}
+        self.credentials = {p: c for p, c in {"naver": naver, "coupang": coupang, **others}.items() if c}
+
+    @property
+    def naver(self):
+        return self.credentials.get("naver")
+
+    @property
+    def coupang(self):
+        return self.credentials.get("coupang")
+
+    def key(self, provider):
+        """발송 기록 / 워터마크에 쓰는 이름. default 계정은 'naver', 그 외는 'store-b:naver'"""
+        return provider if self.name == DEFAULT_ACCOUNT else f"{self.name}:{provider}"
+
+    def providers(self):
+        return list(self.credentials)
+
+    def __repr__(self):
+        return f"Account({self.name!r}, providers={self.providers()})"
+
+
+def _statuses(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    return [st.strip() for st in value if st.strip()]
+
+
+def _expand(value):
+    if isinstance(value, str):
+        return os.path.expandvars(value)
+    if isinstance(value, list):
+        return [_expand(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _expand(v) for k, v in value.items()}
+    return value
+
+
+def account_from_env(name=DEFAULT_ACCOUNT):
+    """예전 단일 계정 환경변수로 만든 계정"""
+    naver = coupang = None
+    if os.getenv("NAVER_CLIENT_ID") or os.getenv("NAVER_ACCOUNT_ID"):
+        naver = {
+            "client_id": os.getenv("NAVER_CLIENT_ID"),
+            "client_secret": os.getenv("NAVER_CLIENT_SECRET"),
+            "account_id": os.getenv("NAVER_ACCOUNT_ID"),
+            "type": os.getenv("NAVER_TYPE", "SELLER").upper(),
+        }
+    if os.getenv("COUPANG_ACCESS_KEY") or os.getenv("COUPANG_VENDOR_ID"):
+        coupang = {
+            "access_key": os.getenv("COUPANG_ACCESS_KEY"),
+            "secret_key": os.getenv("COUPANG_SECRET_KEY"),
+            "vendor_id": os.getenv("COUPANG_VENDOR_ID"),
+            "statuses": _statuses(os.getenv("COUPANG_STATUSES", "INSTRUCT")),
+        }
+    return Account(name, naver, coupang)
+
+
+def _account_from_config(entry):
+    entry = _expand(entry)
+    sections = {k: v for k, v in entry.items() if k != "name" and isinstance(v, dict)}
+    naver, coupang = sections.pop("naver", None), sections.pop("coupang", None)
+    if naver:
+        naver = {**naver, "type": str(naver.get("type", "SELLER")).upper()}
+    if coupang:
+        coupang = {**coupang, "statuses": _statuses(coupang.get("statuses", "INSTRUCT"))}
+    return Account(entry["name"], naver, coupang, **sections)
+
+
+def load_accounts(path=ACCOUNTS_FILE):
+    path = Path(path)
+    if not path.exists():
+        return [account_from_env()]
+    accounts = [_account_from_config(e) for e in json.loads(path.read_text(encoding="utf-8"))["accounts"]]
+    names = [a.name for a in accounts]
+    duplicated = {n for n in names if names.count(n) > 1}
+    if duplicated:
+        raise ValueError(f"계정 이름이 중복되었습니다: {sorted(duplicated)}")
+    for account in accounts:
+        if ":" in account.name or "/" in account.name:
+            raise ValueError(f"계정 이름에는 ':' 나 '/' 를 쓸 수 없습니다: {account.name!r}")
+    return accounts
+
+
+_default = None
+
+
+def default_account():
+    """계정 인자를 주지 않은 호출(list-naver 등)이 쓰는 계정: 환경변수 기준 default 계정"""
+    global _default
+    if _default is None:
+        _default = account_from_env()
+    return _default
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+알리고 카카오 알림톡 발송 (묶음 발송, 이력 상세로 수신자별 실패 확인)
+
+묶음 안에서 수신번호가 같은 주문은 알림톡 1건으로 합쳐 보냅니다.
+본문(message / fmessage)에 ALIGO_ORDER_PLACEHOLDER(기본 #{주문번호})가 있으면 합친 주문번호 목록으로 바꿉니다.
+"""
+import os
+import re
+
+import requests
+
+from . import http_client, log, metrics
+
+
+ALIGO_API_KEY       = os.getenv("ALIGO_API_KEY")
+ALIGO_USER_ID       = os.getenv("ALIGO_USER_ID")
+ALIGO_SENDER_KEY    = os.getenv("ALIGO_SENDER_KEY")
+ALIGO_TEMPLATE_CODE = os.getenv("ALIGO_TEMPLATE_CODE")
+ALIGO_SENDER        = os.getenv("ALIGO_SENDER_PHONE")
+
+# 주소는 *_API_BASE 로 바꿀 수 있습니다 (benchmarks/mock_servers.py 같은 로컬 대역 서버용)
+ALIGO_API_BASE    = os.getenv("ALIGO_API_BASE", "https://kakaoapi.aligo.in").rstrip("/")
+ALIGO_SEND_URL    = f"{ALIGO_API_BASE}/akv10/alimtalk/send/"
+ALIGO_HISTORY_URL = f"{ALIGO_API_BASE}/akv10/history/detail/"
+ALIGO_BATCH_SIZE  = int(os.getenv("ALIGO_BATCH_SIZE", "500"))   # 1회 요청 최대 수신자 수 (receiver_1 ~ receiver_500)
+# 이력 조회 rslt 값 중 성공으로 보는 코드 (빈 값은 아직 결과 대기)
+ALIGO_RSLT_OK     = {"0", "Y"}
+# 이력 조회 type 이 이 값이면 알림톡 대신 대체 문자(failover)로 나간 건
+ALIGO_FALLBACK_TYPES = set(os.getenv("ALIGO_FALLBACK_TYPES", "SM,LM,MM").split(","))
+# 본문에서 주문번호 목록으로 바꿀 템플릿 변수 (알림톡 템플릿에 같은 변수가 등록돼 있어야 합니다)
+ALIGO_ORDER_PLACEHOLDER = os.getenv("ALIGO_ORDER_PLACEHOLDER", "#{주문번호}")
+
+ALIGO_FAILOVER_MESSAGE = "[한경희홈케어] \n접수안내\n\n서비스 신청해 주셔서 감사드립니다.\n접수 완료 되었습니다.\n\n케어 마스터 담당자가 순차적으로 영업일 기준 4일 이내 해피콜하여 방문 일정 안내 예정이니 안심하고 기다려주세요.  \n\n고객 만족을 최우선으로 하는 한경희홈케어는 최고의 서비스 제공을 위해 더욱 노력할 것을 약속드리겠습니다. \n\n감사합니다.\n\n\n■한경희홈케어 문의하기\n▷1:1 채팅상담\nhttp://pf.kakao.com/_JRxoxfxl/chat\n▷한경희홈케어 고객센터:1566-3321\n▷운영시간:평일 09:00~18:00(주말&공휴일제외)\n\n＊서비스 받으실 제품 확인을 위해 주문 상품의 사진을 요청할 수 있습니다.\n＊주차공간 확보는 필수이며 유료 주차장 이용 시 고객님께서 부담해주셔야 합니다.\n＊시즌형 서비스 상품의 경우 주문량이 많아 해피콜 및 일정 지연될 수 있습니다. \n＊장소  협소, 기기 노후, 분해 시 하자 발생 위험이 높은 경우 등으로 서비스가 제한될 수 있습니다."
+
+# 수신자별 기본값. "_1" 로 끝나는 키는 배치 발송 시 수신자 번호에 맞게 _N 으로 바뀝니다.
+ALIMTALK_DEFAULTS = {
+    "subject_1": "접수완료",
+    "fsubject_1": "접수완료",
+    "fmessage_1": ALIGO_FAILOVER_MESSAGE,
+}
+
+
+def normalize_phone(phone):
+    """'010-1234-5678', '+82 10 1234 5678' → '01012345678' (같은 수신자를 묶는 키)"""
+    digits = re.sub(r"\D", "", str(phone or ""))
+    if digits.startswith("82") and len(digits) > 10:
+        digits = "0" + digits[2:]
+    return digits
+
+
+def group_by_recipient(orders):
+    """[(key, phone), ...] → 수신번호별 [[(key, phone), ...], ...] (처음 나온 순서 유지)"""
+    groups = {}
+    for key, phone in orders:
+        groups.setdefault(normalize_phone(phone), []).append((key, phone))
+    return list(groups.values())
+
+
+def recipient_count(orders):
+    return len({normalize_phone(phone) for _, phone in orders})
+
+
+def alimtalk_payload():
+    return {
+        "subject_1": "접수 완료 안내",
+        "message_1": os.getenv("ALIGO_MESSAGE"),   # .env로 본문 관리
+        "button_1": os.getenv("ALIGO_BUTTON_JSON"),
+        "testMode": os.getenv("ALIGO_TEST_MODE")
+    }
+
+
+def _aligo_base_data():
+    return {
+        "apikey": ALIGO_API_KEY,
+        "userid": ALIGO_USER_ID,
+        "senderkey": ALIGO_SENDER_KEY,
+        "tpl_code": ALIGO_TEMPLATE_CODE,
+        "sender": ALIGO_SENDER,
+        "templateEmType": "BASIC",
+        "failover": "Y",
+    }
+
+
+def _post_alimtalk(data):
+    r = http_client.post("aligo_send", ALIGO_SEND_URL, data=data)
+    return r.json() if r.status_code == 200 else {"code":r.status_code, "message":r.text}
+
+
+def send_alimtalk(phone, payload_template):
+    data = _aligo_base_data()
+    data.update(ALIMTALK_DEFAULTS)
+    data["receiver_1"] = phone
+    data.update(payload_template)
+    return _post_alimtalk(data)
+
+
+def aligo_history_data(mid):
+    return {"apikey": ALIGO_API_KEY, "userid": ALIGO_USER_ID, "mid": mid, "page": 1, "limit": ALIGO_BATCH_SIZE}
+
+
+def failed_phones_from_history(mid, res):
+    """이력 상세 응답에서 실패한 수신번호 set. 조회 자체가 실패했으면 None."""
+    if res.get("code") != 0:
+        log.warning("aligo_history_failed", f"⚠️ 알리고 이력 조회 실패: {mid} {res.get('message')}",
+                    mid=mid, error=res.get("message"))
+        return None
+    return {
+        item.get("phone") for item in res.get("list", [])
+        if item.get("rslt") and str(item.get("rslt")) not in ALIGO_RSLT_OK
+    }
+
+
+def aligo_history(mid):
+    """발송 이력 상세 응답 dict. 통신 오류면 None."""
+    try:
+        r = http_client.post("aligo_history", ALIGO_HISTORY_URL, data=aligo_history_data(mid))
+        r.raise_for_status()
+        return r.json()
+    except (requests.RequestException, ValueError) as e:
+        log.warning("aligo_history_failed", f"⚠️ 알리고 이력 조회 실패: {mid} {e}", mid=mid, error=str(e))
+        return None
+
+
+def _aligo_failed_phones(mid):
+    """발송 이력 상세에서 실패한 수신번호를 찾습니다. 조회 실패 시 None."""
+    res = aligo_history(mid)
+    return None if res is None else failed_phones_from_history(mid, res)
+
+
+def delivery_state(item):
+    """
+    이력 상세 1건 → "delivered" / "fallback"(대체 문자로 나감) / "failed", 아직 결과가 없으면 None.
+    """
+    rslt = str(item.get("rslt") or "")
+    if not rslt:
+        return None
+    if str(item.get("type") or "").upper() in ALIGO_FALLBACK_TYPES:
+        return "fallback"
+    return "delivered" if rslt in ALIGO_RSLT_OK else "failed"
+
+
+def message_id(res):
+    """발송 응답의 mid (이력 조회용). 없으면 None."""
+    mid = (res.get("info") or {}).get("mid") if res.get("code") == 0 else None
+    return str(mid) if mid not in (None, "") else None
+
+
+def _fill_orders(value, group):
+    if not isinstance(value, str) or ALIGO_ORDER_PLACEHOLDER not in value:
+        return value
+    return value.replace(ALIGO_ORDER_PLACEHOLDER, ", ".join(str(order_id) for (_, order_id), _ in group))
+
+
+def alimtalk_batch_data(orders, payload_template):
+    """
+    [(key, phone), ...] → receiver_N/message_N 형식의 요청 데이터.
+    수신번호가 같은 주문은 receiver 하나로 합치고 본문의 주문번호 변수에 모두 넣습니다.
+    """
+    data = _aligo_base_data()
+    fields = {**ALIMTALK_DEFAULTS, **payload_template}
+    for n, group in enumerate(group_by_recipient(orders), 1):
+        data[f"receiver_{n}"] = group[0][1]
+        for k, v in fields.items():
+            if k.endswith("_1"):
+                data[f"{k[:-2]}_{n}"] = _fill_orders(v, group)
+            else:
+                data[k] = v
+    return data
+
+
+def needs_history_check(res):
+    """
+    일부 실패(fcnt > 0)한 접수 응답의 실패 번호를 발송하면서 바로 이력 상세로 골라낼지.
+    전달 결과 확인(reconcile)이 켜져 있으면 발송 경로에서는 조회하지 않고 모두 접수(accepted)로 기록하며,
+    실패한 번호는 reconcile 이 이력으로 찾아 다시 대기열에 넣습니다.
+    """
+    from . import reconcile
+    if reconcile.RECONCILE_ENABLED:
+        return False
+    return res.get("code") == 0 and int((res.get("info") or {}).get("fcnt") or 0) > 0
+
+
+def split_batch_result(orders, res, failed_phones=None):
+    """응답(+이력 상세의 실패 번호)으로 (성공 key 목록, 실패 key 목록) 을 나눕니다."""
+    if res.get("code") != 0:
+        return [], [key for key, _ in orders]
+    failed = {normalize_phone(phone) for phone in failed_phones or ()}
+    ok   = [key for key, phone in orders if normalize_phone(phone) not in failed]
+    fail = [key for key, phone in orders if normalize_phone(phone) in failed]
+    return ok, fail
+
+
+def send_alimtalk_batch(orders, payload_template):
+    """
+    orders: [(key, phone), ...] 를 receiver_N/message_N 으로 묶어 한 번에 발송합니다. (같은 번호는 1건으로)
+    (성공 key 목록, 실패 key 목록, 응답) 을 돌려줍니다.
+
+    - 요청 전체가 거절되면 전부 실패
+    - 일부 실패(info.fcnt > 0)면 reconcile 이 꺼져 있을 때만 이력 상세로 실패 번호를 골라냄 (needs_history_check).
+      이력 조회도 실패하면 중복 발송을 막기 위해 접수된 것으로 봅니다.
+    """
+    try:
+        res = _post_alimtalk(alimtalk_batch_data(orders, payload_template))
+    except (requests.RequestException, ValueError) as e:
+        res = {"code": None, "message": str(e)}
+    failed_phones = None
+    if needs_history_check(res):
+        failed_phones = _aligo_failed_phones(res["info"].get("mid"))
+    ok, fail = split_batch_result(orders, res, failed_phones)
+    return ok, fail, res
+
+
+def aligo_rejected(res):
+    """알리고 API 가 요청을 처리하고 거절한 경우(음수 code). 통신/HTTP 오류와 구분합니다."""
+    try:
+        return int(res.get("code")) < 0
+    except (TypeError, ValueError):
+        return False
+
+
+@metrics.timer("send_batch_seconds")
+def send_chunk(chunk, payload):
+    """
+    묶음 1개 발송. 묶음 전체가 거절되면 잘못된 번호 하나 때문일 수 있으므로 수신자별로 다시 시도합니다.
+    (성공 key 목록, 실패 key 목록, 응답, {성공 key: mid}) 를 돌려줍니다. 다시 시도했으면 응답은 merge_results() 입니다.
+    """
+    ok, failed, res = send_alimtalk_batch(chunk, payload)
+    mids = dict.fromkeys(ok, message_id(res))
+    if failed and recipient_count(chunk) > 1 and aligo_rejected(res):
+        groups = retry_groups(chunk, failed)
+        ok, failed, retries = list(ok), [], []
+        for group in groups:
+            one_ok, one_failed, one_res = send_alimtalk_batch(group, payload)
+            ok += one_ok
+            failed += one_failed
+            retries.append(one_res)
+            mids.update(dict.fromkeys(one_ok, message_id(one_res)))
+        res = merge_results(res, retries, failed)
+    return ok, failed, res, mids
+
+
+def _count(res, key):
+    try:
+        return int((res.get("info") or {}).get(key) or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def merge_results(res, retries, failed):
+    """
+    묶음 응답(res) + 수신자별 재시도 응답들 → 재시도 결과를 반영한 응답 1개.
+      code / message : 남은 실패가 없으면 0 과 접수 응답의 message, 있으면 마지막 실패 응답의 것
+      info           : 재시도 응답들의 scnt / fcnt 합계, 접수된 mid 들(mids)과 그 첫 값(mid)
+      batch          : 처음 묶음 응답의 code / message (거절 이유)
+    """
+    accepted = [r for r in retries if r.get("code") == 0]
+    rejected = [r for r in retries if r.get("code") != 0]
+    mids = list(dict.fromkeys(mid for mid in map(message_id, accepted) if mid))
+    if failed:
+        last = rejected[-1] if rejected else res
+        code, message = last.get("code"), last.get("message")
+    else:
+        code, message = 0, accepted[0].get("message") if accepted else res.get("message")
+    info = {
+        "type": (res.get("info") or {}).get("type") or next(((r.get("info") or {}).get("type") for r in accepted), None),
+        "mid": mids[0] if mids else None,
+        "mids": mids,
+        "scnt": sum(_count(r, "scnt") for r in accepted),
+        "fcnt": sum(_count(r, "fcnt") for r in accepted) + len(rejected),
+    }
+    return {"code": code, "message": message, "info": info,
+            "batch": {"code": res.get("code"), "message": res.get("message")}}
+
+
+def retry_groups(chunk, failed):
+    """실패한 key 들을 수신자별 묶음으로 (건별 재시도용)"""
+    failed_keys = set(failed)
+    return group_by_recipient([(key, phone) for key, phone in chunk if key in failed_keys])
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+비동기 실행 모드.
+
+모든 (계정, 판매처) 조회를 동시에 진행하고, 조회된 주문을 발송 대기열(outbox) 하나로 모아 발송 단계로 넘깁니다.
+발송 단계는 대기열에서 묶음을 꺼내 ALIGO_SEND_CONCURRENCY 개 묶음까지 동시에 보냅니다.
+판매처별 요청은 플러그인의 fetch_async(naver / coupang 모듈)가, 정규화·필터·발송 기록은
+marketplace / aligo / pipeline 모듈의 함수가 그대로 맡으므로 문제가 있으면 `python -m autoalim run` 으로 동기 실행하면 됩니다.
+발송 기록 저장소(SQLite) 호출은 이벤트 루프를 막지 않도록 전용 스레드 1개에서 차례로 실행합니다. (store_call)
+
+    python -m autoalim run --async
+"""
+import asyncio
+import functools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from . import aligo, http_client, log, marketplace, metrics, pipeline, reconcile
+from .accounts import load_accounts
+
+
+ALIGO_SEND_CONCURRENCY = int(os.getenv("ALIGO_SEND_CONCURRENCY", "4"))
+# 조회가 진행 중일 때 꺼낸 묶음이 덜 찼으면 이 시간(초)만큼 더 모았다가 꺼냄
+ALIGO_BATCH_LINGER     = float(os.getenv("ALIGO_BATCH_LINGER", "0.5"))
+
+# 연결 자체를 못 한 오류 (서버에 닿지 않았으므로 POST 도 다시 보냄). ConnectionTimeoutError 는 aiohttp 3.10+
+_CONNECT_ERRORS = (aiohttp.ClientConnectorError, getattr(aiohttp, "ConnectionTimeoutError", aiohttp.ClientConnectorError))
+
+# SentStore 는 연결 하나를 잠금으로 나눠 쓰므로 스레드 1개로 충분하고, 넣은 순서대로 실행됩니다.
+_store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sent-store")
+
+
+def store_call(fn, *args):
+    """fn(*args) (SentStore 를 쓰는 동기 함수)를 저장소 스레드에서 실행하는 future. await 하면 결과가 나옵니다."""
+    return asyncio.get_running_loop().run_in_executor(_store_executor, fn, *args)
+
+
+# ──────────────────────────────────────────────────────────
+# 조회 단계
+def _timeout(endpoint):
+    """http_client 의 엔드포인트별 (connect, read) 타임아웃을 aiohttp 형식으로"""
+    t = http_client.timeout_for(endpoint)
+    connect, read = t if isinstance(t, tuple) else (t, t)
+    return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+
+async def _request(session, method, endpoint, url, read=None, **kwargs):
+    """
+    http_client.request 의 비동기판: 같은 회로 차단기와 속도 제한기를 거치고 429 는 Retry-After 후 다시 보냅니다.
+    연결 오류·5xx 는 동기 모드(JitterRetry)와 같은 규칙으로 다시 보냅니다: GET 은 HTTP_GET_RETRIES 번까지
+    백오프+지터(http_client.backoff_seconds) 후, POST 는 연결 자체가 실패한 경우만. 시도마다 차단기에 기록하고
+    그 사이 차단기가 열리면 더 보내지 않습니다.
+    (status, 본문) 을 돌려줍니다. 본문은 문자열이고, read 를 주면 성공 응답(400 미만)은 await read(resp) 결과입니다.
+    """
+    limiter = http_client.limiter_for(endpoint)
+    breaker = http_client.breaker_for(endpoint)
+    retries = throttled = 0
+    while True:
+        if not breaker.allow():
+            raise http_client.circuit_open_error(breaker, endpoint)
+        wait = limiter.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        started = time.perf_counter()
+        try:
+            # 쿠팡은 쿼리스트링까지 서명하므로 yarl 이 다시 인코딩하지 않도록 그대로 보냅니다.
+            async with session.request(method, URL(url, encoded=True), timeout=_timeout(endpoint), **kwargs) as resp:
+                body = await read(resp) if read is not None and resp.status < 400 else await resp.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            metrics.inc("http_requests_total", endpoint=endpoint, status="error")
+            breaker.record(False)
+            if retries >= http_client.GET_RETRIES or not breaker.ready() \
+                    or not http_client.retryable(method, connected=not isinstance(e, _CONNECT_ERRORS)):
+                raise
+            retries += 1
+            await asyncio.sleep(http_client.backoff_seconds(retries))
+            continue
+        except BaseException:
+            breaker.record(None)   # 취소 등: half-open 시험 자리만 돌려줌
+            raise
+        finally:
+            metrics.observe("http_request_seconds", time.perf_counter() - started, endpoint=endpoint)
+        metrics.inc("http_requests_total", endpoint=endpoint, status=resp.status)
+        breaker.record(http_client.breaker_verdict(resp.status), time.perf_counter() - started)
+        # 503 + Retry-After 는 limiter 가 그만큼 다음 reserve 를 미룹니다.
+        retry_after = limiter.observe(resp.status, resp.headers.get("Retry-After"))
+        if resp.status in http_client.RETRY_STATUSES:
+            if retries < http_client.GET_RETRIES and breaker.ready() and http_client.retryable(method):
+                retries += 1
+                await asyncio.sleep(http_client.backoff_seconds(retries))
+                continue
+            return resp.status, body
+        if retry_after is None or throttled == http_client.RATE_LIMIT_RETRIES:
+            return resp.status, body
+        throttled += 1
+
+
+def _http_error(method, url, status, body):
+    info = aiohttp.RequestInfo(URL(url, encoded=True), method, CIMultiDictProxy(CIMultiDict()))
+    return aiohttp.ClientResponseError(info, (), status=status, message=body[:200])
+
+
+async def fetch_projected(session, method, endpoint, url, projection, **kwargs):
+    """주문 조회 응답 → ([레코드, ...], meta dict) (json_projection). 판매처 플러그인의 fetch_async 가 씁니다."""
+    status, body = await _request(session, method, endpoint, url, read=projection.from_response_async, **kwargs)
+    if status >= 400:
+        raise _http_error(method, url, status, body)
+    return body
+
+
+async def _fetch(session, sent, window, account, provider):
+    """
+    (계정, 판매처) 구간을 조회해 페이지마다 대기열에 넣습니다. (marketplace.fetch_orders 의 비동기판)
+    fetch_async 가 없는 판매처는 동기 fetch() 를 스레드에서 돌립니다.
+    """
+    plugin = marketplace.get(provider)
+    key = account.key(provider)
+    skip = sent.known if marketplace.SKIP_KNOWN in plugin.capabilities else None
+    seen = set()
+
+    def emit(records):
+        pipeline.enqueue_orders(sent, key, marketplace.select(plugin, key, records, seen))
+
+    if marketplace.ASYNC in plugin.capabilities:
+        queued = []   # 페이지별 대기열 INSERT — 구간이 끝나기 전에 모두 기다려야 워터마크를 옮길 수 있음
+
+        def emit_async(records):
+            queued.append(store_call(pipeline.enqueue_orders, sent, key, marketplace.select(plugin, key, records, seen)))
+
+        try:
+            await plugin.fetch_async(session, window, account, emit_async, skip)
+        finally:
+            await asyncio.gather(*queued)
+    else:
+        await asyncio.to_thread(lambda: [emit(records) for records in plugin.fetch(window, account, skip)])
+
+
+async def _ingest(account, provider, session, sent, limit):
+    """
+    계정 1개의 판매처 1개를 조회해 구간을 끝까지 대기열에 넣었으면 워터마크를 옮깁니다.
+    실패하면 오류 문자열, 성공하면 None.
+    """
+    name = account.key(provider)
+    skip = pipeline.circuit_skip(provider)
+    if skip:
+        log.warning("poll_skipped", f"⏭️ {marketplace.label(provider)} 조회 건너뜀 ({account.name}): {skip}",
+                    account=account.name, provider=provider, error=skip)
+        return skip
+    async with limit:
+        plugin = marketplace.get(provider)
+        window = await store_call(functools.partial(pipeline.poll_window, sent, name, lookback=plugin.max_window,
+                                                    incremental=plugin.incremental))
+        started = time.perf_counter()
+        try:
+            await _fetch(session, sent, window, account, provider)
+        except Exception as e:
+            log.error("poll_failed", f"❌ {marketplace.label(provider)} 처리 실패 ({account.name}): {e}",
+                      account=account.name, provider=provider, error=str(e))
+            return str(e)
+        finally:
+            metrics.observe("poll_seconds", time.perf_counter() - started, provider=name)
+        await store_call(sent.set_watermark, name, window[1].timestamp())
+    return None
+
+
+# ──────────────────────────────────────────────────────────
+# 발송 단계
+async def _post_alimtalk(session, data):
+    status, body = await _request(session, "POST", "aligo_send", aligo.ALIGO_SEND_URL, data=_form(data))
+    if status != 200:
+        return {"code": status, "message": body}
+    return json.loads(body)
+
+
+def _form(data):
+    # requests 와 같게 값이 None 인 필드는 보내지 않음
+    return {k: str(v) for k, v in data.items() if v is not None}
+
+
+async def _failed_phones(session, mid):
+    try:
+        data = _form(aligo.aligo_history_data(mid))
+        status, body = await _request(session, "POST", "aligo_history", aligo.ALIGO_HISTORY_URL, data=data)
+        if status != 200:
+            raise _http_error("POST", aligo.ALIGO_HISTORY_URL, status, body)
+        res = json.loads(body)
+    except (aiohttp.ClientError, asyncio.TimeoutError, http_client.CircuitOpenError, ValueError) as e:
+        log.warning("aligo_history_failed", f"⚠️ 알리고 이력 조회 실패: {mid} {e}", mid=mid, error=str(e))
+        return None
+    return aligo.failed_phones_from_history(mid, res)
+
+
+async def send_batch(session, chunk, payload):
+    try:
+        res = await _post_alimtalk(session, aligo.alimtalk_batch_data(chunk, payload))
+    except (aiohttp.ClientError, asyncio.TimeoutError, http_client.CircuitOpenError, ValueError) as e:
+        res = {"code": None, "message": str(e)}
+    failed_phones = None
+    if aligo.needs_history_check(res):
+        failed_phones = await _failed_phones(session, res["info"].get("mid"))
+    ok, failed = aligo.split_batch_result(chunk, res, failed_phones)
+    return ok, failed, res
+
+
+async def _send_claimed(session, batch, sent, payload, limit, budget=None):
+    started = time.perf_counter()
+    try:
+        ok, failed, res = await send_batch(session, batch, payload)
+        mids = dict.fromkeys(ok, aligo.message_id(res))
+        if failed and aligo.recipient_count(batch) > 1 and aligo.aligo_rejected(res):
+            groups = aligo.retry_groups(batch, failed)
+            ok, failed, retries = list(ok), [], []
+            for group in groups:
+                one_ok, one_failed, one_res = await send_batch(session, group, payload)
+                ok += one_ok
+                failed += one_failed
+                retries.append(one_res)
+                mids.update(dict.fromkeys(one_ok, aligo.message_id(one_res)))
+            res = aligo.merge_results(res, retries, failed)
+        metrics.observe("send_batch_seconds", time.perf_counter() - started)
+        await store_call(pipeline.record_batch_result, batch, ok, failed, res, sent, mids)
+        if budget:
+            await store_call(budget.refund, pipeline.failed_recipients(batch, failed))
+    finally:
+        limit.release()
+
+
+async def drain(session, sent, payload, ingest_done, budget=None):
+    """
+    대기열에서 묶음을 꺼내 최대 ALIGO_SEND_CONCURRENCY 개까지 동시에 발송합니다.
+    조회가 모두 끝나고(ingest_done) 대기열과 진행 중인 발송이 비면 종료합니다.
+    budget(pipeline.SendBudget) 이 있으면 하루 한도를 다 쓴 뒤로는 대기열이 빈 것처럼 동작합니다.
+    알리고 차단기가 열려 있으면 꺼내지 않고, 조회가 끝났으면 남은 주문은 대기열에 둔 채 종료합니다.
+    """
+    limit = asyncio.Semaphore(ALIGO_SEND_CONCURRENCY)
+    breaker = http_client.breaker_for("aligo_send")
+    tasks = set()
+    short = False
+    while True:
+        if not breaker.ready():
+            if ingest_done.is_set() and not tasks:
+                return
+            await asyncio.sleep(ALIGO_BATCH_LINGER)
+            continue
+        if short and not ingest_done.is_set():
+            await asyncio.sleep(ALIGO_BATCH_LINGER)
+        await limit.acquire()
+        # take 는 첫 호출과 날짜가 바뀔 때 그날 발송 수를 DB 에서 다시 세므로, 같은 잠금을 쓰는 refund 와 함께 저장소 스레드에서
+        size = await store_call(budget.take, aligo.ALIGO_BATCH_SIZE) if budget else aligo.ALIGO_BATCH_SIZE
+        batch = await store_call(sent.claim, size, pipeline.OUTBOX_LEASE_SECONDS,
+                                 pipeline.hold_seconds(ingest_done)) if size else []
+        if budget:
+            await store_call(budget.refund, size - aligo.recipient_count(batch))
+        short = aligo.recipient_count(batch) < aligo.ALIGO_BATCH_SIZE
+        if batch:
+            task = asyncio.create_task(_send_claimed(session, batch, sent, payload, limit, budget))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            continue
+        limit.release()
+        if ingest_done.is_set() and not tasks:
+            return
+        if tasks:
+            await asyncio.wait(set(tasks), timeout=ALIGO_BATCH_LINGER, return_when=asyncio.FIRST_COMPLETED)
+        else:
+            await asyncio.sleep(ALIGO_BATCH_LINGER)
+
+
+# ──────────────────────────────────────────────────────────
+async def run():
+    started = time.monotonic()
+    sent = pipeline.open_sent_store()
+    payload = aligo.alimtalk_payload()
+    accounts = load_accounts()
+    budget = pipeline.send_budget(sent)
+    ingest_done = asyncio.Event()
+    report = None
+    try:
+        # 호스트별 keep-alive 커넥션 수는 동기 모드와 같은 HTTP_POOL_SIZE
+        connector = aiohttp.TCPConnector(limit_per_host=http_client.POOL_SIZE)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            sender = asyncio.create_task(drain(session, sent, payload, ingest_done, budget))
+            # 동시에 조회하는 (계정, API) 조합 수는 동기 모드와 같은 ACCOUNT_WORKERS
+            limit = asyncio.Semaphore(max(1, pipeline.ACCOUNT_WORKERS))
+            jobs = marketplace.jobs(accounts)
+            # 이전 실행 발송분의 전달 결과 확인(동기 HTTP)은 스레드에서 조회와 동시에
+            checker = asyncio.create_task(asyncio.to_thread(reconcile.reconcile_safely, sent))
+            try:
+                results = await asyncio.gather(*(_ingest(account, provider, session, sent, limit)
+                                                 for account, provider in jobs))
+                await checker
+            finally:
+                ingest_done.set()
+            await sender
+        pipeline.log_limits()
+        errors = {}
+        for (account, provider), error in zip(jobs, results):
+            if error:
+                errors.setdefault(account.name, {})[provider] = error
+        report = pipeline.account_report(accounts, errors)
+        pipeline.print_report(report)
+        await store_call(sent.maintain)
+    finally:
+        pipeline.close_sent_store(sent)
+        pipeline.write_run_summary(started, report)
+
+
+def main():
+    asyncio.run(run())
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+긴 기간 다시 조회(backfill): 휴일·PC 재부팅 등으로 놓친 주문을 한 번에 따라잡습니다.
+
+판매처 주문 조회는 한 번에 max_window(네이버·쿠팡 24시간)까지라서 [시작, 끝) 을 시작 시각부터 그 크기의 구간으로 나누고,
+(계정, 판매처, 구간) 을 BACKFILL_WORKERS 개 스레드에서 동시에 조회합니다.
+조회한 주문은 평소와 같이 제외 지역 필터 → 중복 확인 → 발송 대기열 → 알림톡 발송을 거칩니다.
+
+끝난 구간은 발송 기록 DB(backfill_windows)에 남기므로, 중간에 멈추거나 일부 구간이 실패해도
+같은 시작 시각으로 다시 실행하면 남은 구간만 조회합니다. (--force 면 모두 다시 조회, 발송 중복은 발송 기록으로 막힘)
+평소 실행의 워터마크는 건드리지 않습니다. run / daemon 이 돌고 있으면 실행 잠금(run_lock)이 풀릴 때까지 기다립니다.
+
+    python -m autoalim backfill --start "2024-05-03 00:00" [--end now] [--provider naver] [--account 계정]
+"""
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from . import log, marketplace, metrics, pipeline, run_lock
+from .accounts import load_accounts
+from .config import KST, MAX_LOOKBACK
+
+
+# 동시에 조회할 (계정, API, 구간) 수. 속도 제한은 평소처럼 API 별로 같이 씁니다.
+BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", "4"))
+
+
+def split_windows(start, end, size=MAX_LOOKBACK):
+    """[start, end) → [(시작, 끝), ...] size 단위 구간. 시작 시각에 맞춰 나누므로 끝을 바꿔도 앞 구간은 같습니다."""
+    start = start.replace(second=0, microsecond=0)   # 쿠팡 조회는 분 단위
+    windows = []
+    while start < end:
+        windows.append((start, min(start + size, end)))
+        start += size
+    return windows
+
+
+def backfill_window(sent, account, provider, window):
+    """구간 1개를 조회해 대기열에 넣고 끝난 것으로 기록합니다. 실패하면 오류 문자열, 성공하면 None."""
+    name = account.key(provider)
+    label = f"{window[0]:%m-%d %H:%M} ~ {window[1]:%m-%d %H:%M}"
+    try:
+        with metrics.timer("poll_seconds", provider=name):
+            count = pipeline.enqueue_orders(sent, name,
+                                            marketplace.fetch_orders(account, provider, window, skip=sent.known))
+    except Exception as e:
+        log.error("backfill_window_failed", f"❌ {name} {label} 조회 실패: {e}", name=name,
+                  start=window[0].isoformat(), end=window[1].isoformat(), error=str(e))
+        return str(e)
+    sent.mark_backfill_done(name, window[0].timestamp(), window[1].timestamp(), count)
+    log.info("backfill_window", f"📥 {name} {label}: 신규 {count}건 대기열 추가", name=name,
+             start=window[0].isoformat(), end=window[1].isoformat(), queued=count)
+    return None
+
+
+def plan(sent, accounts, providers, start, end, force=False):
+    """(전체 구간 수, 아직 끝나지 않은 [(account, provider, window), ...])"""
+    windows = {}
+    jobs = []
+    for account, provider in marketplace.jobs(accounts, only=providers):
+        size = marketplace.get(provider).max_window
+        if size not in windows:
+            windows[size] = split_windows(start, end, size)
+        done = set() if force else sent.backfill_done(account.key(provider))
+        jobs += [(account, provider, w) for w in windows[size]
+                 if (w[0].timestamp(), w[1].timestamp()) not in done]
+    return sum(map(len, windows.values())), jobs
+
+
+def backfill_all(sent, jobs):
+    """구간들을 동시에 조회합니다. {계정 이름: {provider: 첫 오류}} (실패한 조회만) 와 실패 구간 수를 돌려줍니다."""
+    errors = {}
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(BACKFILL_WORKERS, len(jobs))),
+                            thread_name_prefix="backfill") as pool:
+        futures = [(account, provider, pool.submit(backfill_window, sent, account, provider, window))
+                   for account, provider, window in jobs]
+        for account, provider, fut in futures:
+            error = fut.result()
+            if error:
+                failed += 1
+                errors.setdefault(account.name, {}).setdefault(provider, error)
+    return errors, failed
+
+
+def run(sent, start, end=None, providers=None, accounts=None, force=False, payload=None):
+    """[start, end) 를 다시 조회하고 대기열이 빌 때까지 발송합니다. 계정별 집계를 돌려줍니다."""
+    end = end or datetime.now(KST)
+    accounts = accounts or load_accounts()
+    windows, jobs = plan(sent, accounts, providers, start, end, force)
+    log.info("backfill_start", f"⏪ 다시 조회: {start:%Y-%m-%d %H:%M} ~ {end:%Y-%m-%d %H:%M} "
+             f"({windows}개 구간, 조회할 (계정, 판매처, 구간) {len(jobs)}개)",
+             start=start.isoformat(), end=end.isoformat(), windows=windows, jobs=len(jobs))
+    errors, failed = {}, 0
+    if jobs:
+        errors, failed = pipeline.send_while(sent, payload, functools.partial(backfill_all, sent, jobs))
+    if failed:
+        log.warning("backfill_incomplete",
+                    f"⚠️ {failed}개 구간 조회 실패 → 같은 --start 로 다시 실행하면 남은 구간만 조회합니다.", failed=failed)
+    return pipeline.finish_run(sent, accounts, errors)
+
+
+def main(start, end=None, providers=None, accounts=None, force=False):
+    # 평소 실행(run / daemon)과 같은 발송 대기열을 쓰므로 잠금이 풀릴 때까지 기다렸다가 시작합니다.
+    lock = run_lock.wait("backfill")
+    started = time.monotonic()
+    report = None
+    try:
+        sent = pipeline.open_sent_store()
+        try:
+            report = run(sent, start, end, providers, accounts, force)
+            sent.maintain()
+        finally:
+            pipeline.close_sent_store(sent)
+            pipeline.write_run_summary(started, report)
+    finally:
+        run_lock.release(lock, "backfill", started, 1)
+    return report
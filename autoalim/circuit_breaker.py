@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+API 묶음(naver / coupang / aligo)별 회로 차단기.
+
+한 API 가 응답하지 않거나 느려지면 요청마다 타임아웃(최대 수십 초)을 다 기다리게 되므로,
+  - 연속 CIRCUIT_FAILURES 번 실패(연결 오류·타임아웃·5xx, 또는 CIRCUIT_SLOW_SECONDS 보다 느린 응답)하면 열고(open)
+  - 열린 동안(CIRCUIT_OPEN_SECONDS)은 요청을 보내지 않고 바로 실패시키며
+  - 시간이 지나면 요청 1건만 시험으로 보내(half-open) 성공하면 닫고, 실패하면 다시 엽니다.
+다른 API 의 차단기와는 무관하므로 네이버가 멈춰도 쿠팡·알리고는 평소 속도로 돕니다.
+상태는 snapshot() / describe() 로 확인할 수 있습니다.
+
+1회 실행(run)은 몇 분마다 새 프로세스로 뜨므로 연속 실패 수와 열린 상태를 발송 기록 DB 에 남겨 두었다가
+다음 실행이 이어받습니다. (export() / restore(), SentStore.save_circuits / load_circuits)
+"""
+import os
+import threading
+import time
+
+from . import log, metrics
+
+
+CIRCUIT_ENABLED      = os.getenv("CIRCUIT_BREAKER", "1") != "0"
+CIRCUIT_FAILURES     = int(os.getenv("CIRCUIT_FAILURES", "5"))
+CIRCUIT_SLOW_SECONDS = float(os.getenv("CIRCUIT_SLOW_SECONDS", "8"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name, failures=CIRCUIT_FAILURES, slow_seconds=CIRCUIT_SLOW_SECONDS,
+                 open_seconds=CIRCUIT_OPEN_SECONDS):
+        self.name = name
+        self.failures = max(1, failures)
+        self.slow_seconds = slow_seconds
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0          # 열린 횟수
+        self.rejected = 0        # 열린 동안 보내지 않은 요청 수
+
+    def _retry_at(self):
+        return self._opened_at + self.open_seconds
+
+    def allow(self):
+        """요청을 보내도 되면 True. 열려 있으면 False (half-open 이면 시험 요청 1건만 True)."""
+        if not CIRCUIT_ENABLED:
+            return True
+        with self._lock:
+            if self.state == OPEN and time.monotonic() >= self._retry_at():
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == CLOSED or (self.state == HALF_OPEN and not self._probing):
+                self._probing = self.state == HALF_OPEN
+                return True
+            self.rejected += 1
+        metrics.inc("circuit_rejected_total", family=self.name)
+        return False
+
+    def ready(self):
+        """allow() 가 True 일 수 있는 상태인지 (시험 요청 자리를 잡지 않고 확인만)"""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() >= self._retry_at()
+            return self.state == CLOSED or not self._probing
+
+    def retry_in(self):
+        """다시 시험해 볼 수 있을 때까지 남은 초 (닫혀 있으면 0)"""
+        with self._lock:
+            return max(0.0, self._retry_at() - time.monotonic()) if self.state == OPEN else 0.0
+
+    def record(self, ok, seconds=0.0):
+        """
+        요청 1건의 결과. 성공이어도 slow_seconds 보다 느리면 실패로 셉니다.
+        ok=None 은 판단하지 않는 응답(429 등)으로, half-open 시험 자리만 돌려줍니다.
+        """
+        if not CIRCUIT_ENABLED:
+            return
+        failed = ok is False or (ok and self.slow_seconds > 0 and seconds > self.slow_seconds)
+        with self._lock:
+            before = self.state
+            if self.state == HALF_OPEN:
+                self._probing = False
+            if ok is None:
+                return
+            if failed:
+                self._consecutive += 1
+                if self.state == HALF_OPEN or (self.state == CLOSED and self._consecutive >= self.failures):
+                    self.state = OPEN
+                    self._opened_at = time.monotonic()
+                    self.opened += 1
+            else:
+                self._consecutive = 0
+                self.state = CLOSED
+            after = self.state
+        if after != before:
+            self._report(before, after)
+
+    def _report(self, before, after):
+        metrics.inc("circuit_transitions_total", family=self.name, state=after)
+        if after == OPEN:
+            log.warning("circuit_open", f"🔌 {self.name} 연속 실패/지연 → {self.open_seconds:g}초 동안 요청 차단",
+                        family=self.name, previous=before, open_seconds=self.open_seconds)
+        elif after == CLOSED:
+            log.info("circuit_closed", f"🔌 {self.name} 시험 요청 성공 → 차단 해제", family=self.name)
+
+    def export(self):
+        """저장용 상태 (state, 연속 실패 수, 다시 시험할 시각 epoch 초). half-open 은 바로 시험할 수 있는 open 으로 남깁니다."""
+        with self._lock:
+            if self.state == CLOSED:
+                return CLOSED, self._consecutive, 0.0
+            wait = max(0.0, self._retry_at() - time.monotonic()) if self.state == OPEN else 0.0
+            return OPEN, self._consecutive, time.time() + wait
+
+    def restore(self, state, failures, retry_at):
+        """export() 로 남긴 상태를 이어받습니다. 남은 차단 시간은 open_seconds 를 넘지 않습니다."""
+        with self._lock:
+            self._consecutive = max(0, int(failures))
+            self._probing = False
+            self.state = OPEN if state == OPEN else CLOSED
+            if self.state == OPEN:
+                wait = min(max(0.0, retry_at - time.time()), self.open_seconds)
+                self._opened_at = time.monotonic() + wait - self.open_seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._consecutive,
+                "retry_in": round(max(0.0, self._retry_at() - time.monotonic()), 3) if self.state == OPEN else 0.0,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(family):
+    br = _breakers.get(family)
+    if br is None:
+        with _breakers_lock:
+            br = _breakers.get(family)
+            if br is None:
+                br = _breakers[family] = CircuitBreaker(family)
+    return br
+
+
+def export():
+    """{family: (state, 연속 실패 수, 다시 시험할 시각)} — 실행을 마칠 때 저장합니다."""
+    return {family: br.export() for family, br in sorted(_breakers.items())}
+
+
+def restore(states):
+    """지난 실행이 저장한 상태를 이어받습니다. (CIRCUIT_BREAKER=0 이면 무시)"""
+    if not CIRCUIT_ENABLED:
+        return
+    for family, (state, failures, retry_at) in states.items():
+        br = breaker(family)
+        br.restore(state, failures, retry_at)
+        if br.state == OPEN:
+            log.warning("circuit_restored", f"🔌 {family} 지난 실행에서 차단됨 → {br.retry_in():.0f}초 후 시험",
+                        family=family, retry_in=round(br.retry_in(), 3))
+
+
+def snapshot():
+    return {family: br.snapshot() for family, br in sorted(_breakers.items())}
+
+
+def describe():
+    """로그용 한 줄 요약: 'naver open(12s 후 시험, 차단 40건)' — 모두 닫혀 있으면 빈 문자열"""
+    return ", ".join(
+        f"{family} {s['state']}" + (f"({s['retry_in']:g}s 후 시험, 차단 {s['rejected']}건)" if s["state"] == OPEN else "")
+        for family, s in snapshot().items() if s["state"] != CLOSED or s["opened"]
+    )
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+명령행 진입점.
+
+    python -m autoalim run [--async]      1회 조회 + 발송 (작업 스케줄러용)
+    python -m autoalim daemon             상주 모드
+    python -m autoalim backfill --start "2024-05-03 00:00" [--end ...]
+                                          놓친 기간을 24시간 구간으로 나눠 다시 조회 + 발송 (이어서 실행 가능)
+    python -m autoalim list-naver         네이버 결제완료 주문 목록 확인 (--account 로 계정 지정)
+    python -m autoalim list-coupang       쿠팡 발주서 목록 확인 (--account 로 계정 지정)
+    python -m autoalim accounts           설정된 계정 목록
+    python -m autoalim test-send 010...   알림톡 1건 시험 발송
+
+run / daemon / backfill 은 한 번에 하나만 돕니다. 이전 실행이 아직 진행 중이면 새 run 은 조회 요청을 넘기고
+바로 종료하고, daemon / backfill 은 끝날 때까지 기다립니다. (run_lock, RUN_OVERLAP)
+실행 기록은 autoalim.log 가 LOG_FILE(JSONL)에 남기고 콘솔에는 요약만 출력합니다.
+list-* 출력의 전화번호는 --show-phone 을 주지 않으면 가립니다.
+
+하위 명령이 실제로 쓰는 모듈만 import 합니다. (--help, list-coupang 은 bcrypt 를, run 은 aiohttp/schedule 을 읽지 않음)
+"""
+import argparse
+import json
+import sys
+
+
+def _run(args):
+    from . import run_lock
+
+    if args.use_async:
+        from . import async_pipeline
+        run_lock.exclusive("run", async_pipeline.main)
+    else:
+        from . import pipeline
+        run_lock.exclusive("run", pipeline.main)
+
+
+def _daemon(args):
+    from . import daemon
+    daemon.main()
+
+
+def _time(value):
+    """'2024-05-03', '2024-05-03 09:30', ISO 형식 → datetime. 시간대가 없으면 KST."""
+    from datetime import datetime
+
+    from .config import KST
+
+    if value == "now":
+        return datetime.now(KST)
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"시각 형식이 아닙니다: {value} (예: 2024-05-03 09:30)")
+    return moment if moment.tzinfo else moment.replace(tzinfo=KST)
+
+
+def _backfill(args):
+    from . import backfill, marketplace
+
+    if args.end <= args.start:
+        sys.exit("❌ --end 는 --start 보다 뒤여야 합니다.")
+    accounts = [_account(args.account)] if args.account else None
+    providers = set(args.provider.split(",")) if args.provider else None
+    unknown = (providers or set()) - set(marketplace.providers())
+    if unknown:
+        sys.exit(f"❌ 알 수 없는 판매처: {', '.join(sorted(unknown))}")
+    backfill.main(args.start, args.end, providers, accounts, force=args.force)
+
+
+def _account(name):
+    """--account 로 고른 계정 (없으면 None → 환경변수 default 계정)"""
+    if name is None:
+        return None
+    from .accounts import load_accounts
+
+    for account in load_accounts():
+        if account.name == name:
+            return account
+    sys.exit(f"❌ 계정을 찾을 수 없습니다: {name}")
+
+
+def _accounts(args):
+    from .accounts import ACCOUNTS_FILE, load_accounts
+
+    source = ACCOUNTS_FILE if ACCOUNTS_FILE.exists() else "환경변수"
+    for account in load_accounts():
+        print(account.name, ", ".join(account.providers()) or "(자격증명 없음)")
+    print(f"✨ 계정 목록 ({source})")
+
+
+def _printer(args):
+    """list-* 출력: --raw 는 한 줄 JSON, --show-phone 이 없으면 전화번호를 가림"""
+    from .log import redact
+
+    def show(*parts):
+        line = " ".join(json.dumps(p, ensure_ascii=False, separators=(",", ":")) if isinstance(p, dict) else str(p)
+                        for p in parts)
+        print(line if args.show_phone else redact(line))
+    return show
+
+
+def _list_naver(args):
+    from datetime import datetime, timedelta
+
+    from .config import KST
+    from .naver import iter_naver_pages, naver_window
+    from .region_filter import default_matcher
+
+    show = _printer(args)
+    end = datetime.now(KST)
+    total = 0
+    for items in iter_naver_pages(*naver_window((end - timedelta(hours=args.hours), end)),
+                                  account=_account(args.account), raw=args.raw):
+        for item in items:
+            total += 1
+            if args.raw:
+                show(item.get("content", {}))
+                continue
+            address = item.address or ""
+            mark = " (제외 지역)" if default_matcher().excluded(address) else ""
+            show(item.product_order_id, item.order_id, item.phone, address + mark)
+    print(f"✨ 네이버 결제완료 주문 {total}건 (지난 {args.hours}시간)")
+
+
+def _list_coupang(args):
+    from datetime import datetime, timedelta
+
+    from .config import KST
+    from .coupang import iter_coupang_ordersheets
+    from .region_filter import default_matcher
+
+    show = _printer(args)
+    # 일 단위 조회 (최대 31일)
+    end = datetime.now(KST)
+    frm = (end - timedelta(days=args.days)).strftime('%Y-%m-%d')
+    to = end.strftime('%Y-%m-%d')
+    total = 0
+    for page in iter_coupang_ordersheets(args.status, frm, to, search_type=None, account=_account(args.account),
+                                         raw=args.raw):
+        for item in page:
+            total += 1
+            if args.raw:
+                show(item)
+                continue
+            address = item.address or ""
+            mark = " (제외 지역)" if default_matcher().excluded(address) else ""
+            show(item.order_id, item.safe_number or item.receiver_number, address + mark)
+    print(f"✨ 쿠팡 {args.status} 발주서 {total}건 ({frm} ~ {to})")
+
+
+def _test_send(args):
+    from .aligo import alimtalk_payload, send_alimtalk
+
+    res = send_alimtalk(args.phone, alimtalk_payload())
+    print("📦 응답 내용:", res)
+    if res.get("code") != 0:
+        sys.exit(1)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="autoalim", description="네이버·쿠팡 신규 주문 알림톡 자동 발송")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="1회 조회 후 대기열이 빌 때까지 발송")
+    p.add_argument("--async", dest="use_async", action="store_true", help="aiohttp 비동기 파이프라인으로 실행")
+    p.set_defaults(func=_run)
+
+    p = sub.add_parser("daemon", help="상주 모드 (POLL_INTERVAL_SECONDS 마다 조회)")
+    p.set_defaults(func=_daemon)
+
+    p = sub.add_parser("backfill", help="지난 기간을 24시간 구간으로 나눠 다시 조회 후 발송")
+    p.add_argument("--start", type=_time, required=True, help="시작 시각 (예: 2024-05-03 또는 '2024-05-03 09:30', KST)")
+    p.add_argument("--end", type=_time, default="now", help="끝 시각 (기본: 지금)")
+    p.add_argument("--provider", help="naver, coupang 등 조회할 판매처 (쉼표로 구분, 기본: 모두)")
+    p.add_argument("--account", help="accounts.json 의 계정 이름 (기본: 모든 계정)")
+    p.add_argument("--force", action="store_true", help="이미 끝난 구간도 다시 조회")
+    p.set_defaults(func=_backfill)
+
+    p = sub.add_parser("list-naver", help="네이버 결제완료 주문 목록 출력")
+    p.add_argument("--hours", type=int, default=24, help="조회 구간 (최대 24시간)")
+    p.add_argument("--account", help="accounts.json 의 계정 이름 (기본: 환경변수 계정)")
+    p.add_argument("--raw", action="store_true", help="응답 JSON 을 한 줄씩 출력")
+    p.add_argument("--show-phone", action="store_true", help="전화번호를 가리지 않고 출력")
+    p.set_defaults(func=_list_naver)
+
+    p = sub.add_parser("list-coupang", help="쿠팡 발주서 목록 출력")
+    p.add_argument("--status", default="INSTRUCT", help="발주서 상태 (기본: INSTRUCT 상품준비중)")
+    p.add_argument("--days", type=int, default=30, help="조회 일수 (최대 31일)")
+    p.add_argument("--account", help="accounts.json 의 계정 이름 (기본: 환경변수 계정)")
+    p.add_argument("--raw", action="store_true", help="응답 JSON 을 한 줄씩 출력")
+    p.add_argument("--show-phone", action="store_true", help="전화번호를 가리지 않고 출력")
+    p.set_defaults(func=_list_coupang)
+
+    p = sub.add_parser("accounts", help="설정된 계정 목록 출력")
+    p.set_defaults(func=_accounts)
+
+    p = sub.add_parser("test-send", help="알림톡 1건 시험 발송 (.env 의 템플릿/본문 사용)")
+    p.add_argument("phone", help="수신 번호")
+    p.set_defaults(func=_test_send)
+    return parser
+
+
+def main(argv=None):
+    # Windows 콘솔/로그 파일에서도 한글·이모지가 깨지지 않도록
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+    args = build_parser().parse_args(argv)
+
+    # 환경변수 상수는 각 모듈 import 시점에 읽히므로 .env 를 가장 먼저 읽습니다.
+    from .config import load_env
+    load_env()
+    from . import log
+    log.setup()
+    try:
+        args.func(args)
+    finally:
+        log.shutdown()
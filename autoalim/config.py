@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+여러 모듈이 같이 쓰는 설정.
+
+각 모듈의 환경변수 상수는 import 시점에 읽히므로, .env 는 다른 autoalim 모듈보다 먼저 load_env() 로 읽어야 합니다.
+(cli.main 이 가장 먼저 호출합니다) 그래서 이 모듈에는 환경변수로 바뀌는 값을 두지 않습니다.
+"""
+from datetime import timedelta, timezone
+from pathlib import Path
+
+
+KST = timezone(timedelta(hours=9))
+
+# 한 번에 조회하는 최대 구간 (네이버/쿠팡 모두 24시간)
+MAX_LOOKBACK = timedelta(days=1)
+
+_env_loaded = False
+
+
+def load_env():
+    """
+    실행 폴더, 없으면 프로젝트 폴더의 .env 를 환경변수로 읽습니다. 이미 설정된 환경변수는 덮어쓰지 않습니다.
+    .env 가 없으면 python-dotenv 도 import 하지 않습니다.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    for path in (Path(".env"), Path(__file__).resolve().parent.parent / ".env"):
+        if path.exists():
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
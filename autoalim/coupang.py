@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+쿠팡 Open API: CEA HmacSHA256 서명과 발주서(ordersheets) 조회.
+
+CoupangProvider 가 marketplace 플러그인으로 발주서를 marketplace.Order 로 바꿉니다.
+
+account 인자를 생략하면 COUPANG_* 환경변수로 만든 default 계정을 씁니다.
+"""
+import hashlib
+import hmac
+import os
+import queue
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from . import http_client, log, metrics
+from .accounts import default_account
+from .config import KST, MAX_LOOKBACK
+from .json_projection import Projection
+from .marketplace import ASYNC, Order, Provider
+
+
+# 계정 자격증명(access_key / secret_key / vendor_id)과 조회 상태는 accounts 모듈에서 읽습니다.
+# COUPANG_STATUSES 에 쉼표로 여러 상태 지정 시 상태별로 동시에 조회 후 병합 (예: "INSTRUCT,ACCEPT")
+COUPANG_PAGE_SIZE   = int(os.getenv("COUPANG_PAGE_SIZE", "50"))
+
+COUPANG_BASE_URL = os.getenv("COUPANG_API_BASE", "https://api-gateway.coupang.com").rstrip("/")
+
+# 발주서 조회 응답에서 쓰는 필드만 뽑은 레코드 (json_projection)
+COUPANG_ORDER = Projection(
+    "CoupangOrder", "data",
+    {
+        "order_id":        "orderId",
+        "safe_number":     "receiver.safeNumber",
+        "receiver_number": "receiver.receiverNumber",
+        "address":         "receiver.addr1",
+        "product":         "orderItems.0.vendorItemName",
+        "paid_at":         "paidAt",
+    },
+    meta={"nextToken": "nextToken"},
+)
+
+
+# ──────────────────────────────────────────────────────────
+# 쿠팡 서명 생성 (CEA HmacSHA256)
+def _credentials(account):
+    account = account or default_account()
+    if not account.coupang:
+        raise RuntimeError(f"쿠팡 자격증명이 없는 계정입니다: {account.name}")
+    return account.coupang
+
+
+def generate_coupang_auth(method, path, query="", account=None):
+    credentials = _credentials(account)
+    timestamp = datetime.utcnow().strftime('%y%m%d') + 'T' + datetime.utcnow().strftime('%H%M%S') + 'Z'
+    message = timestamp + method + path + query
+    signature = hmac.new(
+        credentials["secret_key"].encode('utf-8'),
+        message.encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+    authorization = (
+        f"CEA algorithm=HmacSHA256, access-key={credentials['access_key']}, "
+        f"signed-date={timestamp}, signature={signature}"
+    )
+    return authorization, timestamp, message
+
+
+def coupang_request(status, frm, to, next_token=None, search_type="timeFrame", account=None):
+    """
+    발주서 목록 1페이지 요청의 (url, headers). 쿼리스트링까지 서명합니다.
+    search_type="timeFrame" 은 분 단위(yyyy-MM-ddTHH:mm, 최대 24시간), None 이면 일 단위(yyyy-MM-dd) 조회입니다.
+    """
+    vendor_id = _credentials(account)["vendor_id"]
+    path   = f"/v2/providers/openapi/apis/api/v4/vendors/{vendor_id}/ordersheets"
+    method = "GET"
+    params = {
+        "createdAtFrom": frm,
+        "createdAtTo":   to,
+        "status":        status,
+        "maxPerPage":    str(COUPANG_PAGE_SIZE)
+    }
+    if search_type:
+        params["searchType"] = search_type
+    if next_token:
+        params["nextToken"] = next_token
+
+    query      = urllib.parse.urlencode(params)
+    auth, ts, _ = generate_coupang_auth(method, path, query, account)
+    headers = {
+        "Authorization": auth,
+        "Content-Type":  "application/json",
+        "X-Requested-By": vendor_id,
+    }
+    return f"{COUPANG_BASE_URL}{path}?{query}", headers
+
+
+def coupang_window(window=None):
+    """(시작, 끝) datetime → 쿠팡 timeFrame 조회용 createdAtFrom/To 문자열 (KST). 구간이 없으면 지난 24시간."""
+    start, end = window or (datetime.now(KST) - MAX_LOOKBACK, datetime.now(KST))
+    frm = start.astimezone(KST).strftime('%Y-%m-%dT%H:%M')
+    to  =   end.astimezone(KST).strftime('%Y-%m-%dT%H:%M')
+    return frm, to
+
+
+def normalize_coupang(record):
+    """COUPANG_ORDER 레코드 1건 → Order. 연락처(안심번호 또는 수취인 번호)가 없으면 None."""
+    phone = record.safe_number or record.receiver_number
+    if not phone:
+        return None
+    return Order("coupang", str(record.order_id), phone, record.address, record.product, record.paid_at)
+
+
+def iter_coupang_ordersheets(status, frm, to, search_type="timeFrame", account=None, raw=False):
+    """
+    발주서 목록을 nextToken 을 따라 끝까지 페이지 단위로 yield 합니다. (COUPANG_ORDER 레코드 list, raw=True 면 응답 data 그대로)
+    쿼리스트링이 서명 대상이므로 페이지마다 generate_coupang_auth 로 다시 서명합니다.
+    """
+    next_token = None
+    while True:
+        with metrics.timer("fetch_page_seconds", provider="coupang"):
+            url, headers = coupang_request(status, frm, to, next_token, search_type, account)
+            resp = http_client.get("coupang_orders", url, headers=headers, stream=not raw)
+            resp.raise_for_status()
+            if raw:
+                body = resp.json()
+                items, next_token = body.get("data", []), body.get("nextToken")
+            else:
+                items, meta = COUPANG_ORDER.from_response(resp)
+                next_token = meta.get("nextToken")
+        yield items
+
+        if not next_token:
+            return
+
+
+def _iter_coupang_status(status, frm, to, account):
+    try:
+        yield from iter_coupang_ordersheets(status, frm, to, account=account)
+    except requests.HTTPError as e:
+        log.error("coupang_fetch_failed", f"❌ 쿠팡 주문 조회 오류({status}): {e} {e.response.text}",
+                  status=status, error=str(e))
+        raise
+
+
+def _iter_coupang_pages(statuses, frm, to, account):
+    """
+    상태가 여러 개면 상태별 스레드에서 조회하고, 도착하는 페이지를 순서대로 합쳐 yield 합니다.
+    한 상태가 실패해도 나머지 상태는 끝까지 받은 뒤 그 오류를 다시 올립니다. (조회 구간을 끝난 것으로 보지 않도록)
+    """
+    if len(statuses) == 1:
+        yield from _iter_coupang_status(statuses[0], frm, to, account)
+        return
+
+    pages = queue.Queue()
+    done = object()
+    errors = []
+
+    def worker(status):
+        try:
+            for page in _iter_coupang_status(status, frm, to, account):
+                pages.put(page)
+        except Exception as e:
+            log.error("coupang_fetch_failed", f"❌ 쿠팡 주문 조회 실패({status}): {e}", status=status, error=str(e))
+            errors.append(e)
+        finally:
+            pages.put(done)
+
+    with ThreadPoolExecutor(max_workers=len(statuses)) as pool:
+        for status in statuses:
+            pool.submit(worker, status)
+        remaining = len(statuses)
+        while remaining:
+            page = pages.get()
+            if page is done:
+                remaining -= 1
+            else:
+                yield page
+    if errors:
+        raise errors[0]
+
+
+def account_statuses(account=None):
+    return _credentials(account).get("statuses") or ["INSTRUCT"]
+
+
+class CoupangProvider(Provider):
+    """
+    상태(COUPANG_STATUSES)가 여러 개면 상태별로 동시에 조회합니다. 상태가 겹치는 주문은 공통 루프가 한 번만 넣습니다.
+    조회 구간(createdAtFrom/To)은 주문 생성 시각이고 상태는 현재 값이라, 결제 몇 시간 뒤에 상품준비중(INSTRUCT)이 된
+    주문도 잡도록 워터마크 없이 매번 지난 max_window 를 다시 읽습니다.
+    """
+
+    name = "coupang"
+    label = "쿠팡"
+    capabilities = frozenset({ASYNC})
+
+    def fetch(self, window, account, skip=None):
+        return _iter_coupang_pages(account_statuses(account), *coupang_window(window), account)
+
+    async def fetch_async(self, session, window, account, emit, skip=None):
+        import asyncio
+
+        from .async_pipeline import fetch_projected
+
+        frm, to = coupang_window(window)
+
+        async def status_pages(status):
+            next_token = None
+            while True:
+                started = time.perf_counter()
+                url, headers = coupang_request(status, frm, to, next_token, account=account)
+                records, meta = await fetch_projected(session, "GET", "coupang_orders", url, COUPANG_ORDER,
+                                                      headers=headers)
+                metrics.observe("fetch_page_seconds", time.perf_counter() - started, provider="coupang")
+                emit(records)
+                next_token = meta.get("nextToken")
+                if not next_token:
+                    return
+
+        await asyncio.gather(*(status_pages(status) for status in account_statuses(account)))
+
+    def normalize(self, record):
+        return normalize_coupang(record)
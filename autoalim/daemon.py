@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+상주 실행 모드.
+
+작업 스케줄러로 매번 새 프로세스를 띄우는 대신 한 프로세스가 계속 떠 있으면서
+POLL_INTERVAL_SECONDS 마다 모든 계정의 주문을 조회해 발송 대기열에 넣고(pipeline.poll_all),
+별도의 발송 워커 OUTBOX_WORKERS 개가 대기열을 계속 비웁니다. 알리고가 느려도 조회 주기는 밀리지 않습니다.
+알림톡 전달 결과 확인(reconcile)도 별도 스레드에서 RECONCILE_INTERVAL_SECONDS 마다 돕니다.
+네이버 토큰, HTTP 세션(keep-alive), 발송 기록 인덱스가 메모리에 그대로 남아 있으므로
+1분 미만 주기로 돌려도 시작 비용이 들지 않습니다.
+
+    python -m autoalim daemon
+
+METRICS_PORT(기본 9108, 0 이면 끔)의 http://127.0.0.1:<포트>/metrics 에서 단계별 카운터/지연 히스토그램을
+Prometheus 텍스트 형식으로 볼 수 있습니다.
+
+상주 프로세스는 실행 잠금(run_lock)을 계속 쥐고 있으므로 작업 스케줄러의 run 이 같이 돌지 않고,
+그 run 이 넘긴 조회 요청은 다음 주기를 기다리지 않고 바로 처리합니다.
+
+Ctrl+C / 종료 신호를 받으면 진행 중인 조회와 발송 묶음을 마친 뒤 기록을 정리하고 종료합니다.
+"""
+import os
+import signal
+import threading
+import time
+
+import schedule
+
+from . import circuit_breaker, http_client, log, marketplace, metrics, rate_limit, reconcile, run_lock
+from . import pipeline as app
+from .accounts import load_accounts
+from .aligo import alimtalk_payload
+
+
+POLL_INTERVAL_SECONDS     = int(os.getenv("POLL_INTERVAL_SECONDS", "30"))
+MAINTAIN_INTERVAL_MINUTES = int(os.getenv("MAINTAIN_INTERVAL_MINUTES", "60"))
+METRICS_HOST              = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT              = int(os.getenv("METRICS_PORT", "9108"))
+
+_stop = threading.Event()
+_polls = 0
+
+
+def _request_stop(signum, frame):
+    log.warning("shutdown_requested", f"🛑 종료 신호 수신({signum}) → 현재 회차가 끝나면 종료합니다.", signal=signum)
+    _stop.set()
+
+
+def _install_signal_handlers():
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+    if hasattr(signal, "SIGBREAK"):   # Windows 콘솔 창 닫기 / Ctrl+Break
+        signal.signal(signal.SIGBREAK, _request_stop)
+
+
+def _poll(sent, accounts):
+    global _polls
+    _polls += 1
+    started = time.monotonic()
+    try:
+        app.poll_all(sent, accounts)
+    except Exception as e:
+        # 한 회차가 실패해도 상주 프로세스는 계속 돕니다.
+        log.error("poll_failed", f"❌ 폴링 실패: {e}", error=str(e))
+    seconds = time.monotonic() - started
+    circuits = circuit_breaker.describe()
+    log.info("poll_done", f"⏱️ 폴링 완료 ({seconds:.2f}s) | 🚦 {rate_limit.describe()}"
+             + (f" | 🔌 {circuits}" if circuits else ""), seconds=round(seconds, 3))
+
+
+def main():
+    _install_signal_handlers()
+    lock = run_lock.wait("daemon", _stop)
+    if lock is None:
+        return
+    locked_at = time.monotonic()
+    try:
+        _serve()
+    finally:
+        run_lock.release(lock, "daemon", locked_at, _polls)
+
+
+def _serve():
+    exporter = None
+    if METRICS_PORT:
+        try:
+            exporter = metrics.serve(METRICS_PORT, METRICS_HOST)
+            log.info("metrics_server", f"📊 메트릭: http://{METRICS_HOST}:{METRICS_PORT}/metrics",
+                     host=METRICS_HOST, port=METRICS_PORT)
+        except OSError as e:
+            log.warning("metrics_server_failed", f"⚠️ 메트릭 포트를 열 수 없습니다: {e}", error=str(e))
+    sent = app.open_sent_store()
+    payload = alimtalk_payload()
+    accounts = load_accounts()
+    budget = app.send_budget(sent)
+
+    # 첫 폴링 전에 판매처별 준비(네이버 토큰 발급 등)를 해 둡니다.
+    for account, provider in marketplace.jobs(accounts):
+        marketplace.get(provider).prepare(account)
+
+    workers = [
+        threading.Thread(target=app.send_worker, args=(sent, payload), kwargs={"stop": _stop, "budget": budget},
+                         name=f"send-worker-{n}")
+        for n in range(app.OUTBOX_WORKERS)
+    ]
+    workers.append(threading.Thread(target=reconcile.worker, args=(sent, _stop), name="reconcile"))
+    for worker in workers:
+        worker.start()
+
+    schedule.every(POLL_INTERVAL_SECONDS).seconds.do(_poll, sent, accounts)
+    schedule.every(MAINTAIN_INTERVAL_MINUTES).minutes.do(sent.maintain)
+    log.info("daemon_start", f"🚀 상주 모드 시작: {POLL_INTERVAL_SECONDS}초 간격, 계정 {len(accounts)}개",
+             interval=POLL_INTERVAL_SECONDS, accounts=len(accounts))
+
+    try:
+        run_lock.take_trigger()
+        _poll(sent, accounts)
+        while not _stop.is_set():
+            if run_lock.take_trigger():
+                # 작업 스케줄러의 run 이 넘긴 요청 → 다음 주기를 기다리지 않고 바로 조회
+                log.info("run_handoff", "🔁 넘겨받은 조회 요청 → 바로 조회합니다.", command="daemon")
+                _poll(sent, accounts)
+            schedule.run_pending()
+            idle = schedule.idle_seconds()
+            _stop.wait(max(0.0, min(idle if idle is not None else 1.0, 1.0)))
+    finally:
+        _stop.set()
+        schedule.clear()
+        for worker in workers:
+            worker.join()
+        sent.maintain()
+        app.close_sent_store(sent)
+        http_client.close_all()
+        app.print_report(app.account_report(accounts))
+        if exporter is not None:
+            exporter.shutdown()
+            exporter.server_close()
+        log.info("daemon_stop", "👋 상주 모드 종료 (발송 기록 저장 완료)")
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""프로세스 간 파일 잠금 (Windows: msvcrt, 그 외: fcntl)"""
+import os
+import time
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """
+    잠금 파일을 열어 배타 잠금을 겁니다. 프로세스가 죽으면 OS 가 잠금을 풀어 줍니다.
+
+        with FileLock(".naver_access_token.lock"):
+            ...
+    """
+
+    def __init__(self, path, poll_interval=0.1):
+        self.path = str(path)
+        self.poll_interval = poll_interval
+        self._fd = None
+
+    def _try_lock(self, fd):
+        try:
+            if os.name == "nt":
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self, blocking=True, timeout=None):
+        """잠금을 얻으면 True. blocking=False 이거나 timeout 이 지나면 False."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._try_lock(fd):
+            if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                os.close(fd)
+                return False
+            time.sleep(self.poll_interval)
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if os.name == "nt":
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    @property
+    def locked(self):
+        return self._fd is not None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
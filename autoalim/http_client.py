@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+공용 HTTP 클라이언트.
+
+호스트(api.commerce.naver.com, api-gateway.coupang.com, kakaoapi.aligo.in)마다 keep-alive 세션을 하나씩 두고
+커넥션 풀을 재사용합니다. GET 은 백오프+지터로 재시도하고, POST 는 연결 자체가 실패한 경우만 재시도합니다.
+이 재시도 규칙(retryable / RETRY_STATUSES / backoff_seconds)은 비동기 모드(async_pipeline)도 같이 씁니다.
+모든 요청은 엔드포인트 이름 앞부분(naver/coupang/aligo)별 회로 차단기(circuit_breaker)와 속도 제한(rate_limit)을 거치며,
+(알리고 이력 조회는 실패해도 발송을 막지 않도록 aligo_history 묶음을 따로 씁니다. FAMILIES)
+429 는 속도를 낮추고 Retry-After 만큼 기다린 뒤 RATE_LIMIT_RETRIES 번까지 다시 보냅니다.
+차단기가 열려 있으면 보내지 않고 바로 CircuitOpenError 를 올립니다. 차단기는 urllib3 재시도 1번마다 결과를 셉니다.
+토큰 발급처럼 여러 번 보내도 되는 요청은 hedged() 로 느린 응답을 기다리는 대신 한 번 더 보낼 수 있습니다.
+응답 수와 요청 시간(속도 제한 대기 제외)은 엔드포인트별로 metrics 에 남습니다.
+
+    r = http_client.get("naver_orders", url, headers=headers, params=params)
+"""
+import contextvars
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import takewhile
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+from . import circuit_breaker, metrics, rate_limit
+
+
+POOL_SIZE     = int(os.getenv("HTTP_POOL_SIZE", "10"))         # 호스트당 최대 커넥션 수
+GET_RETRIES   = int(os.getenv("HTTP_GET_RETRIES", "3"))
+BACKOFF       = float(os.getenv("HTTP_BACKOFF", "0.5"))        # 0.5, 1, 2 ... 초
+BACKOFF_JITTER = float(os.getenv("HTTP_BACKOFF_JITTER", "0.5"))  # 백오프에 더하는 0~N초 난수
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", "3"))   # 429 재전송 횟수 (429 는 처리 전 거절이라 POST 도 안전)
+
+RETRY_STATUSES = frozenset({500, 502, 503, 504})   # 다시 보내는 응답 (429 는 request() 에서 속도 제한과 함께 처리)
+RETRY_METHODS  = frozenset({"GET"})                # 응답 실패(5xx·읽기 오류)도 다시 보내는 메서드. 나머지는 연결 실패만
+
+# 엔드포인트별 (connect, read) 타임아웃(초). HTTP_TIMEOUT_<이름 대문자>="3,10" 으로 바꿀 수 있습니다.
+DEFAULT_TIMEOUT = (3, 10)
+TIMEOUTS = {
+    "naver_token":    (3, 10),
+    "naver_orders":   (3, 10),
+    "naver_changes":  (3, 10),
+    "naver_query":    (3, 10),
+    "coupang_orders": (3, 10),
+    "aligo_send":     (3, 10),
+    "aligo_history":  (3, 10),
+}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+# 지금 스레드에서 보내는 요청의 회로 차단기 (urllib3 재시도 1번마다 실패를 기록하려고)
+_attempt_breaker = contextvars.ContextVar("attempt_breaker", default=None)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """회로 차단기가 열려 있어 보내지 않은 요청 (연결 오류와 같게 처리됩니다)"""
+
+
+def circuit_open_error(breaker, endpoint):
+    return CircuitOpenError(f"{breaker.name} API 차단 중 ({breaker.retry_in():.0f}초 후 다시 시도): {endpoint}")
+
+
+class JitterRetry(Retry):
+    """
+    여러 프로세스/스레드가 같은 순간에 다시 몰리지 않도록 백오프에 난수를 더합니다.
+    다시 보내는 실패(연결 오류·5xx)는 1번마다 요청의 회로 차단기에 기록하고, 그 사이 차단기가 열리면 더 보내지 않습니다.
+    (마지막 시도의 결과는 _send 가 기록)
+    """
+
+    def get_backoff_time(self):
+        # urllib3 와 같게 리다이렉트 뒤로 이어진 실패 수만 셉니다.
+        return backoff_seconds(len(list(takewhile(lambda h: h.redirect_location is None, reversed(self.history)))))
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)   # 다 썼으면 MaxRetryError
+        breaker = _attempt_breaker.get()
+        if breaker is not None and (error is not None or (response is not None and response.status >= 500)):
+            breaker.record(False)
+            if not breaker.ready():
+                _attempt_breaker.set(None)   # 이 시도는 기록했으므로 _send 가 다시 세지 않도록
+                raise MaxRetryError(_pool, url, error or ResponseError(f"{breaker.name} API 차단 (재시도 중단)"))
+        return retry
+
+
+def retryable(method, connected=True):
+    """
+    실패한 요청을 다시 보내도 되는지. 연결조차 못 한 요청(connected=False)은 서버에 닿지 않았으므로 POST 도 되고,
+    응답을 받았거나 보내는 중에 끊긴 요청은 RETRY_METHODS(GET) 만 됩니다.
+    """
+    return not connected or method.upper() in RETRY_METHODS
+
+
+def backoff_seconds(retry):
+    """retry 번째(1부터) 재시도 전에 기다릴 초. 첫 재시도는 바로, 그다음부터 BACKOFF × 2^(retry-1) + 0~BACKOFF_JITTER 초."""
+    if retry <= 1 or BACKOFF <= 0:
+        return 0.0
+    return min(BACKOFF * 2 ** (retry - 1), Retry.DEFAULT_BACKOFF_MAX) + random.uniform(0, BACKOFF_JITTER)
+
+
+def timeout_for(endpoint):
+    override = os.getenv(f"HTTP_TIMEOUT_{endpoint.upper()}")
+    if override:
+        parts = [float(x) for x in override.split(",")]
+        return tuple(parts) if len(parts) == 2 else parts[0]
+    return TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+
+
+def _new_session():
+    retry = JitterRetry(
+        total=GET_RETRIES,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,   # 재시도를 다 써도 응답은 그대로 돌려주고 raise_for_status 는 호출하는 쪽에서
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def session_for(url):
+    """URL 의 호스트에 해당하는 공용 세션"""
+    host = urlsplit(url).netloc
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = _sessions[host] = _new_session()
+    return session
+
+
+# 이름 앞부분과 다른 묶음을 쓰는 엔드포인트
+FAMILIES = {"aligo_history": "aligo_history"}
+
+
+def family_of(endpoint):
+    """'naver_orders' → 'naver', 'aligo_history' → 'aligo_history'"""
+    return FAMILIES.get(endpoint) or endpoint.split("_", 1)[0]
+
+
+def limiter_for(endpoint):
+    return rate_limit.limiter(family_of(endpoint))
+
+
+def breaker_for(endpoint):
+    return circuit_breaker.breaker(family_of(endpoint))
+
+
+def breaker_verdict(status):
+    """응답 상태 → 차단기에 넘길 결과 (5xx 실패, 429 판단 안 함, 나머지 성공)"""
+    if status == 429:
+        return None
+    return status < 500
+
+
+def _send(session, method, endpoint, url, breaker, **kwargs):
+    started = time.perf_counter()
+    token = _attempt_breaker.set(breaker)
+    try:
+        resp = session.request(method, url, **kwargs)
+    except requests.RequestException:
+        metrics.inc("http_requests_total", endpoint=endpoint, status="error")
+        if _attempt_breaker.get() is breaker:
+            breaker.record(False)
+        raise
+    except BaseException:
+        breaker.record(None)   # half-open 시험 자리만 돌려줌
+        raise
+    finally:
+        recorded = _attempt_breaker.get() is not breaker   # 재시도를 멈춘 JitterRetry 가 이미 기록함
+        _attempt_breaker.reset(token)
+        metrics.observe("http_request_seconds", time.perf_counter() - started, endpoint=endpoint)
+    metrics.inc("http_requests_total", endpoint=endpoint, status=resp.status_code)
+    if not recorded:
+        breaker.record(breaker_verdict(resp.status_code), time.perf_counter() - started)
+    return resp
+
+
+def request(method, endpoint, url, **kwargs):
+    kwargs.setdefault("timeout", timeout_for(endpoint))
+    limiter = limiter_for(endpoint)
+    breaker = breaker_for(endpoint)
+    session = session_for(url)
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        if not breaker.allow():
+            raise circuit_open_error(breaker, endpoint)
+        limiter.acquire()
+        resp = _send(session, method, endpoint, url, breaker, **kwargs)
+        retry_after = limiter.observe(resp.status_code, resp.headers.get("Retry-After"))
+        if retry_after is None or attempt == RATE_LIMIT_RETRIES:
+            return resp
+        # 429: 대기는 limiter 가 다음 acquire 에서 처리합니다.
+        resp.close()
+    return resp
+
+
+def get(endpoint, url, **kwargs):
+    return request("GET", endpoint, url, **kwargs)
+
+
+def post(endpoint, url, **kwargs):
+    return request("POST", endpoint, url, **kwargs)
+
+
+def hedged(method, endpoint, url, delay, **kwargs):
+    """
+    여러 번 보내도 되는 요청용: delay 초 안에 응답이 없으면 같은 요청을 하나 더 보내고 먼저 온 응답을 씁니다.
+    늦게 온 응답은 닫고, 둘 다 실패하면 먼저 실패한 쪽의 오류를 올립니다. delay 가 0 이하이면 request() 와 같습니다.
+    """
+    if delay <= 0:
+        return request(method, endpoint, url, **kwargs)
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"hedge-{endpoint}")
+    try:
+        first = pool.submit(request, method, endpoint, url, **kwargs)
+        pending = {first}
+        done, _ = wait(pending, timeout=delay)
+        hedge = not done
+        if hedge:
+            pending.add(pool.submit(request, method, endpoint, url, **kwargs))
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    resp = fut.result()
+                except requests.RequestException as e:
+                    error = error or e
+                    continue
+                if hedge:
+                    metrics.inc("http_hedged_total", endpoint=endpoint, winner="first" if fut is first else "hedge")
+                for other in pending | (done - {fut}):
+                    other.add_done_callback(_close_response)
+                return resp
+        raise error
+    finally:
+        pool.shutdown(wait=False)
+
+
+def _close_response(fut):
+    if not fut.cancelled() and fut.exception() is None:
+        fut.result().close()
+
+
+def close_all():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
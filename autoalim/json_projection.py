@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+주문 조회 응답에서 필요한 필드만 뽑아 작은 레코드(namedtuple)로 만드는 파서.
+
+응답 1페이지에는 상품·클레임·배송 정보가 모두 들어 있지만 알림톡 발송에는 주문번호, 연락처, 주소만 쓰입니다.
+Projection 은 "목록 위치 + 항목별 필드 경로"를 선언해 두고 응답을 바로 레코드 list 로 바꿉니다.
+
+  - 본문이 JSON_STREAM_THRESHOLD 바이트 이하이면 C 구현 json.loads 로 한 번에 파싱하고 (가장 빠름)
+    필요한 필드만 꺼낸 뒤 나머지 트리는 바로 버립니다.
+  - 그보다 크거나 Content-Length 가 없으면(chunked) ijson 으로 소켓에서 읽으면서 필드만 골라 담으므로
+    본문 전체나 트리를 메모리에 올리지 않습니다. ijson 이 없으면 항상 json.loads 를 씁니다.
+
+    NAVER_ORDER = Projection("NaverOrder", "data.contents",
+                             {"order_id": "content.order.orderId", ...},
+                             meta={"totalPages": "data.pagination.totalPages"})
+    records, meta = NAVER_ORDER.from_response(resp)
+"""
+import json
+import os
+from collections import namedtuple
+
+
+# 0 이면 ijson 이 있을 때 항상 스트리밍, -1 이면 항상 json.loads
+JSON_STREAM_THRESHOLD = int(os.getenv("JSON_STREAM_THRESHOLD", str(4 * 1024 * 1024)))
+STREAM_CHUNK_SIZE     = 64 * 1024
+
+_CONTAINER_EVENTS = frozenset({"start_map", "end_map", "start_array", "end_array", "map_key"})
+
+_ijson = None
+
+
+def _load_ijson():
+    """ijson 이 설치돼 있으면 모듈, 아니면 False (처음 한 번만 import 시도)"""
+    global _ijson
+    if _ijson is None:
+        try:
+            import ijson
+            _ijson = ijson
+        except ImportError:
+            _ijson = False
+    return _ijson
+
+
+def _getter(path):
+    """
+    "a.b.c" → obj["a"]["b"]["c"] 를 꺼내는 함수. 중간에 없거나 null 이면 None.
+    숫자 칸은 목록의 위치입니다. ("orderItems.0.vendorItemName" = 첫 상품의 이름)
+    """
+    keys = [int(key) if key.isdigit() else key for key in path.split(".")]
+
+    def get(obj):
+        try:
+            for key in keys:
+                obj = obj[key]
+            return obj
+        except (KeyError, TypeError, IndexError):
+            return None
+    return get
+
+
+def _ijson_field(prefix, path):
+    """
+    항목 안의 경로 → (ijson prefix, [(목록 원소 prefix, 위치), ...], {목록 prefix: 원소 prefix}).
+    ijson 은 목록 원소를 위치와 관계없이 "item" 으로 적으므로 숫자 칸은 원소 순서를 세어 맞춥니다.
+    """
+    positions, arrays = [], {}
+    for key in path.split("."):
+        if key.isdigit():
+            arrays[prefix] = prefix + ".item"
+            prefix += ".item"
+            positions.append((prefix, int(key)))
+        else:
+            prefix += "." + key
+    return prefix, tuple(positions), arrays
+
+
+class Projection:
+    def __init__(self, name, items, fields, meta=None):
+        """
+        items  : 항목 목록의 경로 ("data.contents")
+        fields : {레코드 필드: 항목 안의 경로} — 선언 순서대로 namedtuple 이 됩니다.
+                 숫자 칸은 항목 안의 목록 위치입니다. ("orderItems.0.vendorItemName" = 첫 상품의 이름)
+        meta   : {이름: 응답 최상위부터의 경로} — 페이지 정보 등 목록 밖의 값
+        """
+        self.items = items
+        self.record = namedtuple(name, list(fields))
+        self._get_items = _getter(items)
+        self._get_fields = [_getter(path) for path in fields.values()]
+        self._get_meta = {key: _getter(path) for key, path in (meta or {}).items()}
+        # ijson 의 prefix 형식: 배열 원소는 "item"
+        self._item_prefix = items + ".item"
+        self._field_prefixes = {}   # ijson prefix → 필드 위치
+        self._indexed_prefixes = {}  # 숫자 칸이 있는 경로: ijson prefix → ((필드 위치, ((목록 원소 prefix, 위치), ...)), ...)
+        self._arrays = {}           # 위치를 세는 항목 안의 목록 prefix → 원소 prefix
+        for i, path in enumerate(fields.values()):
+            prefix, positions, arrays = _ijson_field(self._item_prefix, path)
+            if positions:
+                self._indexed_prefixes[prefix] = self._indexed_prefixes.get(prefix, ()) + ((i, positions),)
+                self._arrays.update(arrays)
+            else:
+                self._field_prefixes[prefix] = i
+        self._meta_prefixes = {path: key for key, path in (meta or {}).items()}
+
+    # ── 이미 파싱된 응답 / 바이트 ───────────────────────────
+    def from_obj(self, obj):
+        """파싱된 응답 dict → ([레코드, ...], meta dict)"""
+        items = self._get_items(obj) or []
+        make, getters = self.record._make, self._get_fields
+        records = [make([get(item) for get in getters]) for item in items]
+        meta = {key: get(obj) for key, get in self._get_meta.items()}
+        return records, meta
+
+    def from_bytes(self, data):
+        return self.from_obj(json.loads(data))
+
+    # ── 스트리밍 ───────────────────────────────────────────
+    def from_stream(self, fp):
+        """read(n) 으로 바이트를 주는 파일 객체에서 읽으면서 레코드만 모읍니다. (ijson 필요)"""
+        collector = _Collector(self)
+        collector.feed(_load_ijson().parse(fp, use_float=True, buf_size=STREAM_CHUNK_SIZE))
+        return collector.records, collector.meta
+
+    async def from_stream_async(self, reader):
+        """aiohttp StreamReader 처럼 비동기 read(n) 을 가진 객체에서 읽습니다. (ijson 필요)"""
+        collector = _Collector(self)
+        events = []
+        async for event in _load_ijson().parse_async(reader, use_float=True, buf_size=STREAM_CHUNK_SIZE):
+            events.append(event)
+            if len(events) >= 1024:
+                collector.feed(events)
+                events.clear()
+        collector.feed(events)
+        return collector.records, collector.meta
+
+    # ── HTTP 응답 ──────────────────────────────────────────
+    def from_response(self, resp):
+        """
+        requests 응답(stream=True 로 받은 것) → ([레코드, ...], meta dict).
+        크기가 작으면 본문을 한 번에 읽어 파싱하고, 크거나 모르면 소켓에서 스트리밍합니다.
+        """
+        if not should_stream(resp.headers.get("Content-Length")):
+            return self.from_bytes(resp.content)
+        resp.raw.decode_content = True   # gzip 등은 urllib3 가 풀어서 줌
+        try:
+            return self.from_stream(resp.raw)
+        finally:
+            resp.close()
+
+    async def from_response_async(self, resp):
+        """aiohttp 응답 → ([레코드, ...], meta dict)"""
+        if not should_stream(resp.headers.get("Content-Length")):
+            return self.from_bytes(await resp.read())
+        return await self.from_stream_async(resp.content)
+
+
+class _Collector:
+    """ijson (prefix, event, value) 이벤트 → 레코드. 이벤트를 여러 번에 나눠 넣어도 됩니다."""
+
+    def __init__(self, projection):
+        self.projection = projection
+        self.records = []
+        self.meta = {}
+        self._current = None
+        # 항목 안의 목록 원소 prefix → 지금 읽고 있는 원소의 위치 (목록이 시작되면 -1)
+        self._positions = dict.fromkeys(projection._arrays.values(), -1)
+
+    def feed(self, events):
+        p = self.projection
+        item_prefix, fields, meta_prefixes = p._item_prefix, p._field_prefixes, p._meta_prefixes
+        indexed, arrays = p._indexed_prefixes, p._arrays
+        make, width = p.record._make, len(p.record._fields)
+        records, meta, current, positions = self.records, self.meta, self._current, self._positions
+        for prefix, event, value in events:
+            if prefix == item_prefix:
+                if event == "start_map":
+                    current = [None] * width
+                elif event == "end_map" and current is not None:
+                    records.append(make(current))
+                    current = None
+                continue
+            if arrays:
+                if event == "start_array" and prefix in arrays:
+                    positions[arrays[prefix]] = -1
+                elif prefix in positions and event not in ("end_map", "end_array", "map_key"):
+                    positions[prefix] += 1      # 원소 하나가 시작됨 (map / 목록 / 값)
+            if event in _CONTAINER_EVENTS:
+                continue
+            index = fields.get(prefix)
+            if index is not None:
+                if current is not None and current[index] is None:
+                    current[index] = value
+            elif indexed and prefix in indexed:
+                if current is not None:
+                    for index, wanted in indexed[prefix]:
+                        if current[index] is None and all(positions[at] == n for at, n in wanted):
+                            current[index] = value
+            elif prefix in meta_prefixes:
+                meta[meta_prefixes[prefix]] = value
+        self._current = current
+
+
+def should_stream(content_length):
+    if JSON_STREAM_THRESHOLD < 0 or not _load_ijson():
+        return False
+    if content_length is None:
+        return True
+    try:
+        return int(content_length) > JSON_STREAM_THRESHOLD
+    except ValueError:
+        return True
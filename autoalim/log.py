@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+구조화 로그 (JSONL).
+
+이벤트 1건을 한 줄 JSON 으로 LOG_FILE 에 남깁니다. 기록은 큐에 넣고 백그라운드 스레드가 파일에 쓰므로
+조회·발송 스레드는 디스크를 기다리지 않고, 파일은 LOG_FLUSH_SECONDS 마다 한 번만 flush 합니다.
+파일은 크기(LOG_MAX_BYTES) 또는 시각(LOG_ROTATE=time, LOG_ROTATE_WHEN)으로 돌려 LOG_BACKUPS 개만 남깁니다.
+전화번호는 파일과 콘솔 모두 가운데 자리를 가립니다. (010-****-5678)
+
+주문 1건 단위 로그는 sample() 로 남기며 LOG_DEBUG_SAMPLE 비율(기본 0 = 안 남김)만 기록합니다.
+그래서 로그 양은 주문 수가 아니라 실행·묶음 수에 비례합니다.
+
+    log.info("send_batch", f"📨 알림톡 묶음 발송: {n}건 성공", ok=n, failed=0)
+    log.sample("order_sent", provider="naver", order_id=..., phone=...)
+
+setup() 전(벤치마크 등에서 모듈만 import 한 경우)에는 INFO 이상 메시지를 print 합니다.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+LOG_FILE          = Path(os.getenv("LOG_FILE", "autoalim.jsonl"))
+LOG_LEVEL         = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_ROTATE        = os.getenv("LOG_ROTATE", "size").lower()       # size | time
+LOG_MAX_BYTES     = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_ROTATE_WHEN   = os.getenv("LOG_ROTATE_WHEN", "midnight")      # LOG_ROTATE=time 일 때 (TimedRotatingFileHandler)
+LOG_BACKUPS       = int(os.getenv("LOG_BACKUPS", "5"))
+LOG_FLUSH_SECONDS = float(os.getenv("LOG_FLUSH_SECONDS", "1"))
+LOG_CONSOLE       = os.getenv("LOG_CONSOLE", "1") != "0"          # 0 이면 콘솔 출력 없이 파일에만
+# 주문 단위 debug 이벤트를 남길 비율 (0~1). 지정하지 않으면 LOG_LEVEL=DEBUG 일 때 전부, 아니면 안 남김
+LOG_DEBUG_SAMPLE  = float(os.getenv("LOG_DEBUG_SAMPLE", "1" if LOG_LEVEL == "DEBUG" else "0"))
+
+# 010-1234-5678, 01012345678, +82 10-1234-5678, 0505-123-4567(안심번호), 02-123-4567, 070-1234-5678 등.
+# 실제 국번(휴대폰 01x, 안심번호 050x, 인터넷전화 070, 지역번호)으로 시작하고 자릿수가 맞을 때만 가립니다.
+# 82 는 + 나 구분자가 붙은 국가번호만 보고, 앞뒤가 글자/숫자면 주문번호 등의 일부로 보고 건드리지 않습니다.
+_PHONE = re.compile(
+    r"(?<![\w+])(\+82[- ]?|82[- ]|0)"
+    r"(1[016789]|50[2-8]|70|2|[3-6][1-5])"
+    r"([-. ]?)(\d{3,4})\3(\d{4})(?!\d)"
+)
+
+_logger = logging.getLogger("autoalim")
+_listener = None
+_flusher = None
+_stop_flush = threading.Event()
+
+
+def redact(text):
+    """문자열 안의 전화번호 가운데 자리를 가립니다."""
+    return _PHONE.sub(lambda m: f"{m.group(1)}{m.group(2)}-****-{m.group(5)}", text)
+
+
+def _redact_value(value):
+    if isinstance(value, str):
+        return redact(value)
+    if isinstance(value, dict):
+        return {k: _redact_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_redact_value(v) for v in value]
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+    """{"ts", "level", "event", "msg", ...필드} 한 줄"""
+
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created).astimezone().isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "event": getattr(record, "event", record.name),
+        }
+        message = record.getMessage()
+        if message:
+            data["msg"] = message
+        data.update(getattr(record, "fields", {}))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(_redact_value(data), ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    def format(self, record):
+        return redact(super().format(record))
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    기본 QueueHandler.prepare 는 traceback 을 메시지에 붙이고 exc_info 를 지워 JsonFormatter 가 "exc" 로 남길 수 없으므로,
+    메시지는 그대로 두고 traceback 은 문자열(exc_text)로 만들어 넘깁니다.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.message = record.getMessage()
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+class _BufferedFlush:
+    """emit 마다 부르는 flush 는 LOG_FLUSH_SECONDS 에 한 번만 (나머지는 백그라운드 flusher 가)"""
+
+    _flushed = 0.0
+
+    def flush(self):
+        now = time.monotonic()
+        if now - self._flushed >= LOG_FLUSH_SECONDS:
+            self.flush_now()
+
+    def flush_now(self):
+        self.acquire()
+        try:
+            self._flushed = time.monotonic()
+            if self.stream:
+                self.stream.flush()
+        finally:
+            self.release()
+
+
+class BufferedRotatingFileHandler(_BufferedFlush, logging.handlers.RotatingFileHandler):
+    pass
+
+
+class BufferedTimedRotatingFileHandler(_BufferedFlush, logging.handlers.TimedRotatingFileHandler):
+    pass
+
+
+def _file_handler(path):
+    path = Path(path)
+    if path.parent != Path("."):
+        path.parent.mkdir(parents=True, exist_ok=True)
+    if LOG_ROTATE == "time":
+        handler = BufferedTimedRotatingFileHandler(path, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUPS,
+                                                   encoding="utf-8", delay=True)
+    else:
+        handler = BufferedRotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                              encoding="utf-8", delay=True)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def setup(path=None):
+    """파일(JSONL) + 콘솔 출력을 설정합니다. 한 번만 호출하면 되고, 종료 시 남은 기록을 써 줍니다."""
+    global _listener, _flusher
+    if _listener is not None:
+        return
+    _stop_flush.clear()   # shutdown() 뒤에 다시 설정하는 경우
+    level = logging.DEBUG if LOG_DEBUG_SAMPLE > 0 else getattr(logging, LOG_LEVEL, logging.INFO)
+    file_handler = _file_handler(path or LOG_FILE)
+    file_handler.setLevel(level)
+    handlers = [file_handler]
+    if LOG_CONSOLE:
+        console = logging.StreamHandler(sys.stdout)
+        console.setLevel(max(level, logging.INFO))   # 주문 단위 이벤트는 파일에만
+        console.setFormatter(ConsoleFormatter("%(message)s"))
+        handlers.append(console)
+
+    log_queue = queue.SimpleQueue()
+    _logger.setLevel(level)
+    _logger.propagate = False
+    _logger.addHandler(_QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    def flush_loop():
+        while not _stop_flush.wait(LOG_FLUSH_SECONDS):
+            file_handler.flush_now()
+
+    _flusher = threading.Thread(target=flush_loop, name="log-flush", daemon=True)
+    _flusher.start()
+    atexit.register(shutdown)
+
+
+def shutdown():
+    """큐에 남은 기록을 모두 쓰고 파일을 닫습니다."""
+    global _listener
+    if _listener is None:
+        return
+    _stop_flush.set()
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _logger.handlers.clear()
+    _listener = None
+
+
+def _emit(level, event, message, exc_info, fields):
+    if _listener is None:
+        if level >= logging.INFO:
+            print(message)
+        return
+    _logger.log(level, message, exc_info=exc_info, extra={"event": event, "fields": fields})
+
+
+def debug(event, message="", **fields):
+    _emit(logging.DEBUG, event, message, None, fields)
+
+
+def info(event, message="", **fields):
+    _emit(logging.INFO, event, message, None, fields)
+
+
+def warning(event, message="", **fields):
+    _emit(logging.WARNING, event, message, None, fields)
+
+
+def error(event, message="", exc_info=None, **fields):
+    _emit(logging.ERROR, event, message, exc_info, fields)
+
+
+def sample(event, message="", **fields):
+    """주문 단위 debug 이벤트. LOG_DEBUG_SAMPLE 비율만 기록합니다."""
+    if LOG_DEBUG_SAMPLE > 0 and (LOG_DEBUG_SAMPLE >= 1 or random.random() < LOG_DEBUG_SAMPLE):
+        _emit(logging.DEBUG, event, message, None, fields)
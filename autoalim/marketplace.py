@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+판매처(provider) 플러그인과 정규화된 주문(Order).
+
+판매처마다 응답 모양은 달라도 발송에 필요한 값은 같으므로, 조회 결과는 판매처의 normalize() 로
+작은 Order 하나가 됩니다. 조회 → 정규화 → 같은 주문 제거 → 제외 지역 필터 → 발송 대기열 순서는
+공통 루프(fetch_orders / select)가 처리하고, 1회 실행·상주 모드·backfill·비동기 모드가 모두 이 루프를 씁니다.
+
+새 판매처는 Provider 를 상속해 fetch() 와 normalize() 만 구현하고 register() 하면 되고,
+accounts.json 의 계정 항목에 같은 이름(name)의 자격증명 섹션을 적으면 조회 대상이 됩니다.
+
+    class ElevenStProvider(Provider):
+        name, label = "11st", "11번가"
+
+        def fetch(self, window, account, skip=None):
+            for body in iter_pages(window, account.credentials["11st"]):
+                yield ELEVENST_ORDER.from_obj(body)[0]
+
+        def normalize(self, record):
+            return Order("11st", record.order_id, record.phone, record.address, record.product, record.paid_at)
+
+    marketplace.register(ElevenStProvider())
+
+네이버·쿠팡 플러그인은 처음 쓸 때 import 합니다. (list-coupang 이 네이버 모듈을 읽지 않도록)
+"""
+from . import log, metrics
+from .config import MAX_LOOKBACK
+from .region_filter import filter_page
+
+
+# Provider.capabilities
+ASYNC      = "async"        # fetch_async() 구현 (없으면 비동기 모드는 fetch() 를 스레드에서 돌림)
+SKIP_KNOWN = "skip_known"   # fetch() 가 skip(key, 주문번호 list) 으로 이미 처리한 주문의 상세 조회를 건너뜀
+
+
+class Order:
+    """
+    정규화된 주문 1건. 주문이 많아도 메모리가 적게 들도록 __slots__ 만 씁니다.
+    ordered_at 은 판매처가 준 결제(주문) 시각 문자열 그대로이고, 값이 없는 필드는 None 입니다.
+    """
+
+    __slots__ = ("provider", "order_id", "phone", "address", "product", "ordered_at")
+
+    def __init__(self, provider, order_id, phone, address=None, product=None, ordered_at=None):
+        self.provider = provider
+        self.order_id = order_id
+        self.phone = phone
+        self.address = address
+        self.product = product
+        self.ordered_at = ordered_at
+
+    def __repr__(self):
+        return f"Order({self.provider!r}, {self.order_id!r}, product={self.product!r})"
+
+
+class Provider:
+    """
+    판매처 플러그인.
+      name         : 판매처 이름 = accounts.json 자격증명 섹션 이름 = 발송 기록 이름(Account.key)
+      label        : 출력용 이름
+      max_window   : 조회 1번에 받을 수 있는 최대 구간 (평소 조회와 backfill 구간 크기)
+      incremental  : True 면 평소 조회를 워터마크(지난 조회 끝 - WATERMARK_OVERLAP)부터 합니다.
+                     조회 구간이 '지금 상태가 된 시각'(결제 시각 등)으로 걸러질 때만 켭니다. 주문 생성 시각으로
+                     거르고 상태는 현재 값으로 보는 API 는 나중에 그 상태가 된 옛 주문을 놓치므로
+                     False(기본)로 두고 매번 max_window 전체를 다시 읽습니다. (중복은 발송 기록이 막음)
+      capabilities : ASYNC, SKIP_KNOWN 중 지원하는 것
+    """
+
+    name = None
+    label = None
+    max_window = MAX_LOOKBACK
+    incremental = False
+    capabilities = frozenset()
+
+    def fetch(self, window, account, skip=None):
+        """(시작, 끝) 구간의 주문을 페이지(레코드 list) 단위로 yield 합니다."""
+        raise NotImplementedError
+
+    async def fetch_async(self, session, window, account, emit, skip=None):
+        """fetch() 의 비동기판. 페이지를 받을 때마다 emit(레코드 list) 를 호출합니다. (aiohttp session)"""
+        raise NotImplementedError
+
+    def normalize(self, record):
+        """레코드 1건 → Order. 연락처가 없어 보낼 수 없으면 None."""
+        raise NotImplementedError
+
+    def prepare(self, account):
+        """상주 모드 시작 시 한 번 호출됩니다. (토큰 미리 받기 등)"""
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+
+_registry = None
+
+
+def providers():
+    """{이름: Provider} (등록 순서대로)"""
+    global _registry
+    if _registry is None:
+        from .coupang import CoupangProvider
+        from .naver import NaverProvider
+
+        _registry = {}
+        for provider in (NaverProvider(), CoupangProvider()):
+            _registry[provider.name] = provider
+    return _registry
+
+
+def register(provider):
+    """판매처를 추가합니다. 같은 이름이 있으면 바꿉니다."""
+    providers()[provider.name] = provider
+    return provider
+
+
+def get(name):
+    return providers()[name]
+
+
+def label(name):
+    provider = providers().get(name)
+    return provider.label if provider and provider.label else name
+
+
+def jobs(accounts, only=None):
+    """[(account, 판매처 이름), ...]. 등록되지 않은 판매처 섹션은 경고만 하고 건너뜁니다. only 가 있으면 그 판매처만."""
+    registered = providers()
+    out = []
+    for account in accounts:
+        for name in account.providers():
+            if name not in registered:
+                log.warning("unknown_provider", f"⚠️ 알 수 없는 판매처 {name!r} ({account.name}) → 건너뜁니다.",
+                            account=account.name, provider=name)
+            elif not only or name in only:
+                out.append((account, name))
+    return out
+
+
+def select(provider, key, records, seen):
+    """
+    페이지 1개 → 대기열에 넣을 [Order, ...].
+    이번 조회에서 이미 나온 주문번호(seen, 여기서 갱신)는 빼고, 연락처가 없거나 제외 지역인 주문은 건수만 남깁니다.
+    """
+    with metrics.timer("filter_seconds", provider=key):
+        fresh = []
+        for record in records:
+            order = provider.normalize(record)
+            if order is None:
+                fresh.append(None)
+            elif order.order_id not in seen:
+                seen.add(order.order_id)
+                fresh.append(order)
+        return filter_page(key, fresh)
+
+
+def fetch_orders(account, name, window, skip=None):
+    """(계정, 판매처) 의 구간을 조회해 대기열에 넣을 Order 를 하나씩 yield 합니다. (동기 공통 루프)"""
+    provider = get(name)
+    key = account.key(name)
+    skip = skip if SKIP_KNOWN in provider.capabilities else None
+    seen = set()
+    for records in provider.fetch(window, account, skip):
+        yield from select(provider, key, records, seen)
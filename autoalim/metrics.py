@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+단계별 카운터 / 지연 히스토그램.
+
+토큰 발급(bcrypt 서명 포함), 조회 페이지, 제외 지역 필터, 알림톡 발송, 발송 기록 저장에 걸린 시간을
+이름 + 라벨 단위로 모읍니다.
+  - 상주 모드: serve(port) 로 Prometheus 텍스트 형식(/metrics)을 내보냅니다.
+  - 1회 실행: 끝날 때 write_summary() 로 JSON 요약(METRICS_SUMMARY_FILE)을 남깁니다.
+
+    with metrics.timer("fetch_page_seconds", provider="naver"):
+        ...
+    metrics.inc("orders_total", 3, provider="naver", result="queued")
+"""
+import functools
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+
+PREFIX = "autoalim_"
+METRICS_SUMMARY_FILE = Path(os.getenv("METRICS_SUMMARY_FILE", "metrics_summary.json"))
+
+# 지연 히스토그램 구간 상한(초)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    "http_requests_total":    "HTTP 응답 수 (엔드포인트, 상태 코드별)",
+    "http_request_seconds":   "HTTP 요청 1건(속도 제한 대기 제외)에 걸린 시간",
+    "http_hedged_total":      "응답이 늦어 같은 요청을 한 번 더 보낸 수 (winner: 먼저 응답한 쪽 first / hedge)",
+    "circuit_rejected_total": "회로 차단기가 열려 있어 보내지 않은 요청 수 (API 묶음별)",
+    "circuit_transitions_total": "회로 차단기 상태 변화 수 (open / closed)",
+    "naver_token_seconds":    "네이버 토큰 발급 단계별 시간 (sign: bcrypt 서명, request: 발급 요청)",
+    "fetch_page_seconds":     "주문 조회 페이지 1개를 받아 오는 데 걸린 시간",
+    "filter_seconds":         "조회 페이지 1개의 정규화 + 제외 지역 판별 시간",
+    "orders_total":           "조회된 주문 수 (queued: 대기열 추가, duplicate: 이미 발송/대기, excluded: 제외 지역/연락처 없음)",
+    "send_batch_seconds":     "알림톡 묶음 1개 발송(이력 확인, 건별 재시도 포함) 시간",
+    "alimtalk_total":         "알림톡 발송 결과 수 (계정·provider 별 ok / failed)",
+    "alimtalk_coalesced_total": "같은 수신자의 다른 주문과 합쳐져 따로 보내지 않은 주문 수",
+    "alimtalk_delivery_total": "이력 조회로 확인한 알림톡 전달 결과 수 (delivered / fallback / failed / unknown)",
+    "reconcile_seconds":      "전달 결과 확인 1회(이력 조회 + 기록) 시간",
+    "store_seconds":          "발송 기록 저장소 작업 시간",
+    "poll_seconds":           "API 별 조회 1회(대기열 추가까지) 시간",
+    "run_lock_held_seconds":  "실행 잠금을 보유한 시간 (run: 넘겨받은 요청까지 처리한 시간, daemon: 상주 시간)",
+    "run_overlap_total":      "이전 실행이 진행 중이어서 잠금을 못 잡은 실행 수 (action: handoff / exit)",
+}
+
+_lock = threading.Lock()
+_counters = {}     # (이름, 라벨 tuple) → 값
+_histograms = {}   # (이름, 라벨 tuple) → [구간별 개수..., +Inf 개수], 합계, 개수
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    key = _key(name, labels)
+    slot = bisect_left(BUCKETS, seconds)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        hist[0][slot] += 1
+        hist[1] += seconds
+        hist[2] += 1
+
+
+class timer:
+    """with 블록 / 데코레이터로 걸린 시간을 observe 합니다."""
+
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self._started, **self.labels)
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(self.name, **self.labels):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def counter_values(name):
+    """이름이 name 인 카운터들 [(라벨 dict, 값), ...]"""
+    with _lock:
+        return [(dict(labels), value) for (n, labels), value in _counters.items() if n == name]
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+# ──────────────────────────────────────────────────────────
+# 내보내기
+def _quantile(buckets, count, q):
+    """히스토그램 구간으로 추정한 분위수 (해당 구간의 상한)"""
+    if not count:
+        return None
+    rank = math.ceil(q * count)
+    seen = 0
+    for bound, n in zip(BUCKETS + (math.inf,), buckets):
+        seen += n
+        if seen >= rank:
+            return bound
+    return math.inf
+
+
+def summary():
+    """{"counters": {...}, "histograms": {...}} — 키는 'name{label="v"}' 형식"""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: (list(v[0]), v[1], v[2]) for k, v in _histograms.items()}
+    out = {"counters": {}, "histograms": {}}
+    for (name, labels), value in sorted(counters.items()):
+        out["counters"][_series(name, labels)] = value
+    for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+        p99 = _quantile(buckets, count, 0.99)
+        out["histograms"][_series(name, labels)] = {
+            "count": count,
+            "sum": round(total, 6),
+            "mean": round(total / count, 6) if count else None,
+            "p50_le": _quantile(buckets, count, 0.50),
+            "p99_le": None if p99 == math.inf else p99,
+        }
+    return out
+
+
+def _series(name, labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return PREFIX + name
+    body = ",".join(f'{k}="{str(v)}"' for k, v in pairs)
+    return f"{PREFIX}{name}{{{body}}}"
+
+
+def _bound(value):
+    return "+Inf" if value == math.inf else f"{value:g}"
+
+
+def render_prometheus():
+    """Prometheus 텍스트 노출 형식 (version 0.0.4)"""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: (list(v[0]), v[1], v[2]) for k, v in _histograms.items()}
+    lines = []
+    for kind, series in (("counter", counters), ("histogram", histograms)):
+        for name in sorted({name for name, _ in series}):
+            if name in HELP:
+                lines.append(f"# HELP {PREFIX}{name} {HELP[name]}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+            for (n, labels), value in sorted(series.items()):
+                if n != name:
+                    continue
+                if kind == "counter":
+                    lines.append(f"{_series(name, labels)} {value}")
+                    continue
+                buckets, total, count = value
+                cumulative = 0
+                for bound, n_in in zip(BUCKETS + (math.inf,), buckets):
+                    cumulative += n_in
+                    lines.append(f"{_series(name + '_bucket', labels, [('le', _bound(bound))])} {cumulative}")
+                lines.append(f"{_series(name + '_sum', labels)} {total:.6f}")
+                lines.append(f"{_series(name + '_count', labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def write_summary(path=METRICS_SUMMARY_FILE, **extra):
+    """1회 실행 요약을 JSON 으로 저장합니다. extra 는 그대로 최상위에 넣습니다."""
+    data = {"finished_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"), **extra, **summary()}
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def serve(port, host="127.0.0.1"):
+    """/metrics 를 백그라운드 스레드에서 제공합니다. 돌려받은 서버는 종료 시 shutdown() 하세요."""
+    # http.server 는 import 비용이 커서(1회 실행에서는 쓰지 않음) 여기서 불러옵니다.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,553 @@
+# -*- coding: utf-8 -*-
+"""
+네이버 커머스 API: 토큰 발급/캐시와 결제완료 주문 조회.
+
+결제완료 주문은 두 가지 방식으로 가져옵니다. (NAVER_INGEST_MODE)
+  - orders  : 조회 구간의 결제완료 상품주문을 내용까지 전부 페이지로 받기 (기본)
+  - changes : 변경 상태 목록(last-changed-statuses)에서 구간 안에 결제된 상품주문 ID 만 받고,
+              발송 기록/대기열에 없는 주문만 상세 조회(query)로 NAVER_QUERY_BATCH 개씩 묶어 가져오기.
+              이미 처리한 주문의 내용을 매번 다시 받지 않아 주문이 많을수록 전송량과 조회 시간이 줄어듭니다.
+
+NaverProvider 가 marketplace 플러그인으로 두 방식을 감싸고, 레코드를 marketplace.Order 로 바꿉니다.
+
+토큰은 계정별 .naver_access_token[.<계정>] 파일에 만료 시각과 함께 저장해 여러 프로세스가 같이 쓰고,
+만료가 가까우면 백그라운드에서 미리 갱신합니다. bcrypt/pybase64 는 실제로 발급할 때만 import 합니다.
+account 인자를 생략하면 NAVER_* 환경변수로 만든 default 계정을 씁니다.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import requests
+
+from . import http_client, log, metrics
+from .accounts import DEFAULT_ACCOUNT, default_account
+from .config import KST, MAX_LOOKBACK
+from .file_lock import FileLock
+from .json_projection import Projection
+from .marketplace import ASYNC, SKIP_KNOWN, Order, Provider
+
+
+NAVER_API_BASE   = os.getenv("NAVER_API_BASE", "https://api.commerce.naver.com").rstrip("/")
+NAVER_TOKEN_URL  = f"{NAVER_API_BASE}/external/v1/oauth2/token"
+NAVER_ORDERS_URL = f"{NAVER_API_BASE}/external/v1/pay-order/seller/product-orders"
+NAVER_CHANGES_URL = f"{NAVER_ORDERS_URL}/last-changed-statuses"
+NAVER_QUERY_URL  = f"{NAVER_ORDERS_URL}/query"
+
+NAVER_PAGE_SIZE     = int(os.getenv("NAVER_PAGE_SIZE", "100"))
+NAVER_FETCH_WORKERS = int(os.getenv("NAVER_FETCH_WORKERS", "4"))   # 2페이지 이후 / 상세 묶음 동시 조회 수
+
+NAVER_INGEST_MODE   = os.getenv("NAVER_INGEST_MODE", "orders").lower()   # orders | changes
+NAVER_CHANGES_LIMIT = int(os.getenv("NAVER_CHANGES_LIMIT", "300"))   # 변경 상태 목록 1회 최대 건수 (limitCount)
+NAVER_QUERY_BATCH   = int(os.getenv("NAVER_QUERY_BATCH", "300"))     # 상세 조회 1회 최대 상품주문 수
+
+# 주문 조회 응답에서 쓰는 필드만 뽑은 레코드 (json_projection)
+NAVER_ORDER = Projection(
+    "NaverOrder", "data.contents",
+    {
+        "order_id":         "content.order.orderId",
+        "phone":            "content.order.ordererTel",
+        "address":          "content.productOrder.shippingAddress.baseAddress",
+        "product_order_id": "content.productOrder.productOrderId",
+        "product":          "content.productOrder.productName",
+        "paid_at":          "content.order.paymentDate",
+    },
+    meta={
+        "totalPages":    "data.pagination.totalPages",
+        "totalElements": "data.pagination.totalElements",
+        "hasNext":       "data.pagination.hasNext",
+    },
+)
+
+# 변경 상태 목록 1건. more 가 있으면 moreFrom / moreSequence 로 이어서 조회합니다.
+NAVER_CHANGE = Projection(
+    "NaverChange", "data.lastChangeStatuses",
+    {
+        "product_order_id": "productOrderId",
+        "order_id":         "orderId",
+        "status":           "productOrderStatus",
+    },
+    meta={
+        "moreFrom":     "data.more.moreFrom",
+        "moreSequence": "data.more.moreSequence",
+    },
+)
+
+# 상세 조회(query) 응답 1건 → NAVER_ORDER 와 같은 필드
+NAVER_DETAIL = Projection(
+    "NaverOrder", "data",
+    {
+        "order_id":         "order.orderId",
+        "phone":            "order.ordererTel",
+        "address":          "productOrder.shippingAddress.baseAddress",
+        "product_order_id": "productOrder.productOrderId",
+        "product":          "productOrder.productName",
+        "paid_at":          "order.paymentDate",
+    },
+)
+
+# 토큰 캐시 파일: {"access_token": ..., "expires_at": epoch초, "account_id": ...}
+# default 계정은 .naver_access_token, 그 외 계정은 .naver_access_token.<계정 이름>
+TOKEN_FILE = ".naver_access_token"
+
+# 만료 이만큼 전부터는 백그라운드에서 미리 갱신합니다.
+# (네이버는 남은 유효시간이 30분 이상이면 기존 토큰을 그대로 돌려주므로 30분보다 짧게 잡습니다)
+REFRESH_MARGIN = int(os.getenv("NAVER_TOKEN_REFRESH_MARGIN", "1200"))
+# 남은 시간이 이보다 짧으면 만료된 것으로 보고 동기 발급합니다.
+MIN_VALID_SECONDS = 60
+# 발급 요청이 이 시간(초) 안에 응답하지 않으면 같은 요청을 한 번 더 보내 먼저 온 응답을 씁니다. 0 이면 끔
+NAVER_TOKEN_HEDGE_SECONDS = float(os.getenv("NAVER_TOKEN_HEDGE_SECONDS", "0"))
+
+
+# ──────────────────────────────────────────────────────────
+# 토큰
+def generate_signature(client_id, client_secret, timestamp):
+    import bcrypt
+    import pybase64
+
+    password = f"{client_id}_{timestamp}".encode("utf-8")
+    salt = client_secret.encode("utf-8")
+    hashed = bcrypt.hashpw(password, salt)
+    return pybase64.standard_b64encode(hashed).decode("utf-8")
+
+def _request_token(credentials):
+    """토큰을 새로 발급받아 캐시 항목(dict)으로 돌려줍니다. 실패 시 None."""
+    client_id = credentials.get("client_id")
+    client_secret = credentials.get("client_secret")
+    account_id = credentials.get("account_id")
+    token_type = credentials.get("type", "SELLER")
+    timestamp = str(int(time.time() * 1000))
+
+    if not all([client_id, client_secret, account_id]):
+        log.error("naver_token_failed", "❌ 네이버 client_id, client_secret 또는 account_id가 설정되지 않았습니다.")
+        return None
+
+    with metrics.timer("naver_token_seconds", step="sign"):
+        signature = generate_signature(client_id, client_secret, timestamp)
+
+    headers = {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "Accept": "application/json"
+    }
+
+    data = {
+        "client_id": client_id,
+        "grant_type": "client_credentials",
+        "timestamp": timestamp,
+        "client_secret_sign": signature,
+        "type": token_type,
+        "account_id": account_id
+    }
+
+    try:
+        with metrics.timer("naver_token_seconds", step="request"):
+            response = http_client.hedged("POST", "naver_token", NAVER_TOKEN_URL, NAVER_TOKEN_HEDGE_SECONDS,
+                                          headers=headers, data=data)
+        response.raise_for_status()
+        token_data = response.json()
+        access_token = token_data.get("access_token")
+        if not access_token:
+            log.error("naver_token_failed", "❌ 발급된 access_token이 없습니다.")
+            return None
+        return {
+            "access_token": access_token,
+            "expires_at": time.time() + int(token_data.get("expires_in", 10800)),
+            "account_id": account_id,
+        }
+    except requests.exceptions.RequestException as e:
+        body = e.response.text if e.response is not None else None
+        log.error("naver_token_failed", f"❌ NAVER ACCESS TOKEN 발급 실패: {e}" + (f"\n📦 응답 본문: {body}" if body else ""),
+                  error=str(e))
+        return None
+
+def _remaining(entry):
+    return entry["expires_at"] - time.time() if entry else 0
+
+
+class TokenCache:
+    """
+    계정 1개의 토큰 캐시. 파일에 만료 시각과 함께 저장해 여러 프로세스가 같이 쓰고,
+    만료가 가까우면 백그라운드에서 미리 갱신합니다.
+    """
+
+    def __init__(self, account):
+        self.account = account
+        self.path = TOKEN_FILE if account.name == DEFAULT_ACCOUNT else f"{TOKEN_FILE}.{account.name}"
+        self.lock_path = self.path + ".lock"
+        self._cached = None
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+
+    def _read_file(self):
+        """캐시 파일을 읽습니다. 예전 형식(토큰 문자열만 저장)은 만료 시각을 알 수 없으므로 무시합니다."""
+        try:
+            with open(self.path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("account_id") != (self.account.naver or {}).get("account_id"):
+            return None
+        return entry
+
+    def _write_file(self, entry):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, self.path)
+
+    def refresh(self, force=False):
+        """
+        파일 잠금을 잡고 토큰을 갱신합니다.
+        잠금을 기다리는 동안 다른 프로세스가 이미 갱신했다면 그 토큰을 그대로 씁니다.
+        """
+        with FileLock(self.lock_path):
+            entry = self._read_file()
+            if force or _remaining(entry) < REFRESH_MARGIN:
+                entry = _request_token(self.account.naver or {})
+                if entry is None:
+                    return None
+                self._write_file(entry)
+                log.info("naver_token", f"✅ NAVER ACCESS TOKEN 발급 및 저장 완료 ({self.account.name})",
+                         account=self.account.name)
+        with self._lock:
+            self._cached = entry
+        return entry
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self.refresh, name=f"naver-token-refresh-{self.account.name}",
+                                                    daemon=True)
+            self._refresh_thread.start()
+
+    def get(self):
+        """
+        캐시된 토큰을 돌려줍니다.
+        만료가 가까우면 백그라운드 갱신만 걸어두고 현재 토큰을 바로 돌려주고,
+        쓸 수 있는 토큰이 없을 때만 발급을 기다립니다.
+        """
+        entry = self._cached
+        if _remaining(entry) < MIN_VALID_SECONDS:
+            entry = self._read_file()
+            with self._lock:
+                self._cached = entry
+
+        remaining = _remaining(entry)
+        if remaining >= MIN_VALID_SECONDS:
+            if remaining < REFRESH_MARGIN:
+                self._refresh_in_background()
+            return entry["access_token"]
+
+        entry = self.refresh()
+        return entry["access_token"] if entry else None
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def token_cache(account=None):
+    """계정별 TokenCache (계정 이름 기준으로 프로세스 안에서 하나씩)"""
+    account = account or default_account()
+    with _caches_lock:
+        cache = _caches.get(account.name)
+        if cache is None:
+            cache = _caches[account.name] = TokenCache(account)
+    return cache
+
+def fetch_naver_access_token(account=None):
+    """캐시와 관계없이 새 토큰을 발급받아 저장합니다."""
+    entry = token_cache(account).refresh(force=True)
+    return entry["access_token"] if entry else None
+
+def get_naver_access_token(account=None):
+    return token_cache(account).get()
+
+
+# ──────────────────────────────────────────────────────────
+# 주문 조회
+@metrics.timer("fetch_page_seconds", provider="naver")
+def _fetch_naver_page(headers, params, page, raw=False):
+    """
+    1페이지 → (항목 list, pagination dict).
+    항목은 NAVER_ORDER 레코드이고, raw=True 면 응답의 contents 를 그대로 돌려줍니다.
+    """
+    r = http_client.get("naver_orders", NAVER_ORDERS_URL, headers=headers, params={**params, "page": page},
+                        stream=not raw)
+    r.raise_for_status()
+    if raw:
+        data = r.json().get("data", {})
+        return data.get("contents", []), data.get("pagination") or {}
+    return NAVER_ORDER.from_response(r)
+
+
+def _naver_total_pages(pagination, page_size):
+    """pagination 으로 전체 페이지 수 계산. hasNext 만 있으면 None."""
+    pagination = pagination or {}
+    if pagination.get("totalPages") is not None:
+        return int(pagination["totalPages"])
+    if pagination.get("totalElements") is not None:
+        return -(-int(pagination["totalElements"]) // page_size)
+    return None
+
+
+def naver_headers(account=None):
+    token = get_naver_access_token(account)
+    if not token:
+        raise RuntimeError("네이버 토큰 발급 실패")
+    return {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+
+
+def naver_request(frm, to, account=None):
+    """주문 조회용 (headers, params). page 는 호출하는 쪽에서 붙입니다."""
+    params = {
+        "from": frm, "to": to,
+        "rangeType": "PAYED_DATETIME",
+        "productOrderStatuses": "PAYED",
+        "placeOrderStatusType": "OK",
+        "pageSize": NAVER_PAGE_SIZE
+    }
+    return naver_headers(account), params
+
+
+def naver_window(window=None):
+    """(시작, 끝) datetime → 네이버 from/to 문자열 (KST). 구간이 없으면 지난 24시간."""
+    start, end = window or (datetime.now(KST) - MAX_LOOKBACK, datetime.now(KST))
+    frm = start.astimezone(KST).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + "+09:00"
+    to  =   end.astimezone(KST).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + "+09:00"
+    return frm, to
+
+
+def normalize_naver(record):
+    """NAVER_ORDER / NAVER_DETAIL 레코드 1건 → Order. 연락처가 없으면 None."""
+    if not record.phone:
+        return None
+    return Order("naver", str(record.order_id), record.phone, record.address, record.product, record.paid_at)
+
+
+def iter_naver_pages(frm, to, account=None, raw=False):
+    """
+    네이버 주문 목록을 페이지 단위로 흘려보냅니다.
+    1페이지로 전체 페이지 수를 확인한 뒤 나머지는 NAVER_FETCH_WORKERS 개까지 동시에 조회하고,
+    도착하는 순서대로 NAVER_ORDER 레코드 list 를 yield 합니다. (raw=True 면 응답 contents 그대로)
+    """
+    headers, params = naver_request(frm, to, account)
+    items, pagination = _fetch_naver_page(headers, params, 1, raw)
+    yield items
+
+    total_pages = _naver_total_pages(pagination, NAVER_PAGE_SIZE)
+    if total_pages is None:
+        # 전체 건수를 주지 않는 응답 → hasNext 를 따라 순차 조회
+        page = 1
+        while pagination.get("hasNext"):
+            page += 1
+            items, pagination = _fetch_naver_page(headers, params, page, raw)
+            yield items
+        return
+    if total_pages <= 1:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(NAVER_FETCH_WORKERS, total_pages - 1)))
+    futures = [pool.submit(_fetch_naver_page, headers, params, p, raw) for p in range(2, total_pages + 1)]
+    try:
+        for fut in as_completed(futures):
+            yield fut.result()[0]
+    finally:
+        # 소비자가 중간에 멈추거나 오류가 나면 남은 요청은 취소
+        for fut in futures:
+            fut.cancel()
+        pool.shutdown(wait=False)
+
+
+# ──────────────────────────────────────────────────────────
+# 변경 상태 목록 + 상세 일괄 조회 (NAVER_INGEST_MODE=changes)
+def naver_changes_params(frm, to):
+    return {"lastChangedFrom": frm, "lastChangedTo": to, "lastChangedType": "PAYED",
+            "limitCount": NAVER_CHANGES_LIMIT}
+
+
+def next_changes_params(params, more):
+    """응답의 more 로 다음 요청 params. 더 없으면 None."""
+    if not more.get("moreFrom"):
+        return None
+    params = {**params, "lastChangedFrom": more["moreFrom"]}
+    if more.get("moreSequence"):
+        params["moreSequence"] = more["moreSequence"]
+    return params
+
+
+@metrics.timer("fetch_page_seconds", provider="naver", request="changes")
+def _fetch_naver_changes(headers, params):
+    """변경 상태 목록 1회 → (NAVER_CHANGE 레코드 list, more dict)"""
+    r = http_client.get("naver_changes", NAVER_CHANGES_URL, headers=headers, params=params, stream=True)
+    r.raise_for_status()
+    return NAVER_CHANGE.from_response(r)
+
+
+def iter_naver_changes(frm, to, headers):
+    """구간 안에 결제(PAYED)로 바뀐 상품주문을 more 를 따라가며 페이지 단위로 yield 합니다."""
+    params = naver_changes_params(frm, to)
+    while params:
+        records, more = _fetch_naver_changes(headers, params)
+        yield records
+        params = next_changes_params(params, more)
+
+
+def pick_new_orders(key, changes, seen, skip=None):
+    """
+    변경 상태 레코드 → 상세 조회할 상품주문 ID list.
+    아직 결제완료(PAYED)인 것 중 주문번호마다 하나만, 그리고 skip(key, 주문번호들) 이 돌려준 주문(이미 발송/대기)은 뺍니다.
+    seen 은 이번 조회에서 이미 본 주문번호 set 이고 여기서 갱신됩니다.
+    """
+    fresh = {}
+    for change in changes:
+        order_id = str(change.order_id)
+        if change.status not in (None, "PAYED") or order_id in seen:
+            continue
+        seen.add(order_id)
+        fresh[order_id] = change.product_order_id
+    known = skip(key, list(fresh)) if skip and fresh else set()
+    metrics.inc("orders_total", len(known), provider=key, result="duplicate")
+    return [product_order_id for order_id, product_order_id in fresh.items() if order_id not in known]
+
+
+@metrics.timer("fetch_page_seconds", provider="naver", request="query")
+def _query_naver_details(headers, product_order_ids):
+    """상세 조회 1회 → NAVER_DETAIL 레코드 list"""
+    r = http_client.post("naver_query", NAVER_QUERY_URL, headers=headers,
+                         json={"productOrderIds": product_order_ids}, stream=True)
+    r.raise_for_status()
+    return NAVER_DETAIL.from_response(r)[0]
+
+
+def iter_naver_details(product_order_ids, headers):
+    """상품주문 ID 를 NAVER_QUERY_BATCH 개씩 NAVER_FETCH_WORKERS 개까지 동시에 상세 조회해 도착 순서대로 yield 합니다."""
+    batches = [product_order_ids[i:i + NAVER_QUERY_BATCH]
+               for i in range(0, len(product_order_ids), NAVER_QUERY_BATCH)]
+    if not batches:
+        return
+    pool = ThreadPoolExecutor(max_workers=max(1, min(NAVER_FETCH_WORKERS, len(batches))))
+    futures = [pool.submit(_query_naver_details, headers, batch) for batch in batches]
+    try:
+        for fut in as_completed(futures):
+            yield fut.result()
+    finally:
+        for fut in futures:
+            fut.cancel()
+        pool.shutdown(wait=False)
+
+
+def iter_naver_changed_pages(window=None, account=None, skip=None):
+    """
+    iter_naver_pages 와 같은 주문을 변경 상태 목록 + 상세 일괄 조회로 가져와 NAVER_DETAIL 레코드 list 로 yield 합니다.
+    skip(key, 주문번호 list) 는 이미 발송했거나 대기 중인 주문번호 set 을 돌려주는 함수입니다. (SentStore.known)
+    """
+    key = (account or default_account()).key("naver")
+    frm, to = naver_window(window)
+    headers = naver_headers(account)
+    seen, pending = set(), []
+    for changes in iter_naver_changes(frm, to, headers):
+        pending += pick_new_orders(key, changes, seen, skip)
+    yield from iter_naver_details(pending, headers)
+
+
+# ──────────────────────────────────────────────────────────
+# 판매처 플러그인
+class NaverProvider(Provider):
+    name = "naver"
+    label = "네이버"
+    incremental = True    # 두 조회 방식 모두 결제(PAYED) 시각으로 거르므로 워터마크부터 조회해도 빠지는 주문이 없음
+    capabilities = frozenset({ASYNC, SKIP_KNOWN} if NAVER_INGEST_MODE == "changes" else {ASYNC})
+
+    def fetch(self, window, account, skip=None):
+        if NAVER_INGEST_MODE == "changes":
+            return iter_naver_changed_pages(window, account, skip)
+        return iter_naver_pages(*naver_window(window), account=account)
+
+    async def fetch_async(self, session, window, account, emit, skip=None):
+        if NAVER_INGEST_MODE == "changes":
+            await _fetch_changed_async(session, window, account, emit, skip)
+        else:
+            await _fetch_orders_async(session, window, account, emit)
+
+    def normalize(self, record):
+        return normalize_naver(record)
+
+    def prepare(self, account):
+        # 첫 폴링 전에 토큰을 받아 둡니다. 이후 갱신은 만료 전에 백그라운드로 처리됩니다.
+        get_naver_access_token(account)
+
+
+async def _fetch_orders_async(session, window, account, emit):
+    """iter_naver_pages 의 비동기판: 1페이지로 전체 페이지 수를 본 뒤 나머지를 NAVER_FETCH_WORKERS 개까지 동시에"""
+    import asyncio
+
+    from .async_pipeline import fetch_projected
+
+    frm, to = naver_window(window)
+    # 토큰 캐시가 파일 잠금/발급을 할 수 있으므로 이벤트 루프 밖에서 호출
+    headers, params = await asyncio.to_thread(naver_request, frm, to, account)
+
+    async def page(n):
+        started = time.perf_counter()
+        records, pagination = await fetch_projected(session, "GET", "naver_orders", NAVER_ORDERS_URL, NAVER_ORDER,
+                                                    headers=headers, params={**params, "page": n})
+        metrics.observe("fetch_page_seconds", time.perf_counter() - started, provider="naver")
+        emit(records)
+        return pagination
+
+    pagination = await page(1)
+    total_pages = _naver_total_pages(pagination, NAVER_PAGE_SIZE)
+    if total_pages is None:
+        n = 1
+        while pagination.get("hasNext"):
+            n += 1
+            pagination = await page(n)
+        return
+
+    limit = asyncio.Semaphore(NAVER_FETCH_WORKERS)
+
+    async def bounded(n):
+        async with limit:
+            await page(n)
+
+    await asyncio.gather(*(bounded(n) for n in range(2, total_pages + 1)))
+
+
+async def _fetch_changed_async(session, window, account, emit, skip=None):
+    """iter_naver_changed_pages 의 비동기판"""
+    import asyncio
+
+    from .async_pipeline import fetch_projected, store_call
+
+    key = account.key("naver")
+    frm, to = naver_window(window)
+    headers = await asyncio.to_thread(naver_headers, account)
+
+    seen, pending = set(), []
+    params = naver_changes_params(frm, to)
+    while params:
+        started = time.perf_counter()
+        changes, more = await fetch_projected(session, "GET", "naver_changes", NAVER_CHANGES_URL, NAVER_CHANGE,
+                                              headers=headers, params=params)
+        metrics.observe("fetch_page_seconds", time.perf_counter() - started, provider="naver", request="changes")
+        # skip(SentStore.known) 은 DB 를 조회하므로 저장소 스레드에서
+        pending += await store_call(pick_new_orders, key, changes, seen, skip)
+        params = next_changes_params(params, more)
+
+    limit = asyncio.Semaphore(NAVER_FETCH_WORKERS)
+
+    async def details(batch):
+        async with limit:
+            started = time.perf_counter()
+            records, _ = await fetch_projected(session, "POST", "naver_query", NAVER_QUERY_URL, NAVER_DETAIL,
+                                               headers=headers, json={"productOrderIds": batch})
+            metrics.observe("fetch_page_seconds", time.perf_counter() - started, provider="naver", request="query")
+        emit(records)
+
+    size = NAVER_QUERY_BATCH
+    await asyncio.gather(*(details(pending[i:i + size]) for i in range(0, len(pending), size)))
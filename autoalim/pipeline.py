@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+"""
+1회 실행 파이프라인: 판매처(네이버·쿠팡 등 marketplace 플러그인) 조회 → 발송 대기열(outbox) → 알림톡 묶음 발송.
+
+(계정, 판매처) 조합마다 ACCOUNT_WORKERS 개 스레드에서 동시에 조회합니다.
+모든 계정이 발송 대기열 하나, 알리고 속도 제한, 하루 발송 한도(ALIGO_DAILY_LIMIT)를 같이 씁니다.
+
+    python -m autoalim run
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from . import circuit_breaker, http_client, log, marketplace, metrics, rate_limit, reconcile
+from .accounts import load_accounts
+from .aligo import ALIGO_BATCH_SIZE, alimtalk_payload, normalize_phone, recipient_count, send_chunk
+from .config import KST, MAX_LOOKBACK
+from .sent_store import SentStore
+
+
+# 늦게 잡히는 주문을 위해 워터마크보다 이만큼 앞에서부터 다시 조회
+WATERMARK_OVERLAP   = timedelta(minutes=int(os.getenv("WATERMARK_OVERLAP_MINUTES", "10")))
+
+SENT_RECORD_FILE    = Path("sent_records.json")          # 예전 형식 (1회 이관용)
+SENT_DB_FILE        = Path(os.getenv("SENT_DB_FILE", "sent_records.db"))
+SENT_RETENTION_DAYS = int(os.getenv("SENT_RETENTION_DAYS", "90"))
+
+# 발송 대기열(outbox): 조회와 발송을 분리해 발송 중 중단돼도 다음 실행에서 이어서 보냅니다.
+OUTBOX_WORKERS       = int(os.getenv("OUTBOX_WORKERS", "2"))
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", "120"))
+OUTBOX_MAX_ATTEMPTS  = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+# 같은 수신자의 주문을 알림톡 1건으로 합치려고 대기열에서 기다리는 시간(초).
+# 0 이어도 꺼낼 때 이미 대기열에 있는 같은 번호의 주문은 합쳐집니다. 1회 실행은 조회가 끝나면 기다리지 않습니다.
+COALESCE_WINDOW_SECONDS = float(os.getenv("COALESCE_WINDOW_SECONDS", "10"))
+
+# 동시에 조회할 (계정, API) 조합 수
+ACCOUNT_WORKERS     = int(os.getenv("ACCOUNT_WORKERS", "4"))
+# 모든 계정을 합친 하루(KST) 알림톡 발송 한도. 0 이면 제한 없음
+ALIGO_DAILY_LIMIT   = int(os.getenv("ALIGO_DAILY_LIMIT", "0"))
+
+def open_sent_store():
+    store = SentStore(SENT_DB_FILE, retention_days=SENT_RETENTION_DAYS, max_attempts=OUTBOX_MAX_ATTEMPTS)
+    migrated = store.migrate_json(SENT_RECORD_FILE)
+    if migrated:
+        log.info("sent_migrated", f"📦 {SENT_RECORD_FILE} → {SENT_DB_FILE} 이관 완료 ({migrated}건)", count=migrated)
+    circuit_breaker.restore(store.load_circuits())
+    return store
+
+
+def close_sent_store(store):
+    """회로 차단기 상태를 다음 실행을 위해 남기고 닫습니다."""
+    try:
+        store.save_circuits(circuit_breaker.export())
+    finally:
+        store.close()
+
+
+def poll_window(sent, name, now=None, lookback=MAX_LOOKBACK, incremental=True):
+    """
+    (시작, 끝) datetime. 워터마크 - WATERMARK_OVERLAP 부터, 단 lookback(판매처 max_window) 보다 과거로는 가지 않습니다.
+    incremental=False(Provider.incremental) 면 워터마크와 관계없이 지난 lookback 전체입니다.
+    """
+    now = now or datetime.now(KST)
+    start = now - lookback
+    mark = sent.get_watermark(name) if incremental else None
+    if mark is not None:
+        start = max(start, datetime.fromtimestamp(mark, KST) - WATERMARK_OVERLAP)
+    return start, now
+
+
+# ──────────────────────────────────────────────────────────
+# 대기열 → 알림톡 발송
+class SendBudget:
+    """
+    모든 계정이 같이 쓰는 하루 발송 한도.
+    워커가 묶음을 꺼내기 전에 take() 로 자리를 잡고, 못 쓴 자리(덜 찬 묶음, 발송 실패)는 refund() 로 돌려줍니다.
+    날짜가 바뀌면 그날 발송 기록 수로 다시 셉니다.
+    """
+
+    def __init__(self, sent, limit):
+        self.sent = sent
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._day = None
+        self._used = 0
+        self._exhausted = False
+
+    def _roll_over(self):
+        today = datetime.now(KST).date()
+        if today != self._day:
+            midnight = datetime.combine(today, datetime.min.time(), KST)
+            self._day = today
+            self._used = self.sent.count_sent_since(midnight.timestamp())
+            self._exhausted = False
+
+    def take(self, n):
+        """최대 n 건까지 발송 자리를 잡고 잡은 수를 돌려줍니다. 한도를 다 쓰면 0."""
+        with self._lock:
+            self._roll_over()
+            granted = max(0, min(n, self.limit - self._used))
+            self._used += granted
+            if not granted and not self._exhausted:
+                self._exhausted = True
+                log.warning("daily_limit_reached",
+                            f"⛔ 오늘 알림톡 발송 한도({self.limit}건) 도달 → 남은 주문은 대기열에 두고 내일 발송합니다.",
+                            limit=self.limit)
+            return granted
+
+    def refund(self, n):
+        if n:
+            with self._lock:
+                self._used = max(0, self._used - n)
+
+    def remaining(self):
+        with self._lock:
+            self._roll_over()
+            return max(0, self.limit - self._used)
+
+
+def send_budget(sent):
+    """ALIGO_DAILY_LIMIT 가 설정돼 있으면 SendBudget, 아니면 None"""
+    return SendBudget(sent, ALIGO_DAILY_LIMIT) if ALIGO_DAILY_LIMIT > 0 else None
+
+
+def record_batch_result(chunk, ok, failed, res, sent, mids=None):
+    """
+    성공분은 발송 기록으로 옮기고(ack), 실패분은 건별로 대기열에 되돌립니다(nack).
+    mids({key: mid}) 가 있으면 발송 기록에 남겨 나중에 실제 전달 결과를 확인합니다(reconcile).
+    """
+    sent.ack(ok, mids=mids, phones=dict(chunk))
+    sent.nack(failed, error=str(res.get("message")))
+    metrics.inc("alimtalk_coalesced_total", len(chunk) - recipient_count(chunk))
+    for keys, result in ((ok, "ok"), (failed, "failed")):
+        counts = {}
+        for provider, _ in keys:
+            counts[provider] = counts.get(provider, 0) + 1
+        for provider, n in counts.items():
+            metrics.inc("alimtalk_total", n, provider=provider, result=result)
+    phones = dict(chunk)
+    for event, keys in (("order_sent", ok), ("order_failed", failed)):
+        for provider, order_id in keys:
+            log.sample(event, provider=provider, order_id=order_id, phone=phones[(provider, order_id)],
+                       mid=(mids or {}).get((provider, order_id)))
+    message = f"📨 알림톡 묶음 발송: {len(ok)}건 성공 / {len(failed)}건 실패"
+    if res.get("code") != 0:
+        message += f" (code {res.get('code')}: {res.get('message')})"
+    if res.get("batch"):
+        message += f" — 묶음 거절(code {res['batch'].get('code')}) 후 수신자별 재시도"
+    log.info("send_batch", message, ok=len(ok), failed=len(failed), code=res.get("code"),
+             error=None if res.get("code") == 0 else res.get("message"), info=res.get("info"), batch=res.get("batch"))
+
+
+def send_worker(sent, payload, drain_until=None, stop=None, idle_seconds=0.5, budget=None):
+    """
+    대기열에서 ALIGO_BATCH_SIZE 건씩 꺼내 발송하는 워커.
+    - drain_until 이 설정된 뒤 대기열이 비면 종료 (1회 실행)
+    - stop 이 설정되면 하던 묶음만 마치고 종료 (상주 모드)
+    - budget(SendBudget) 이 있으면 하루 한도를 다 쓴 뒤로는 대기열이 빈 것처럼 동작
+    - 조회가 진행 중인 동안은 COALESCE_WINDOW_SECONDS 가 지난 주문만 꺼냄 (같은 수신자 주문 합치기)
+    - 알리고 차단기가 열려 있으면 꺼내지 않음 (재시도 횟수를 쓰지 않도록). 1회 실행은 조회가 끝났으면 종료
+    """
+    breaker = http_client.breaker_for("aligo_send")
+    while not (stop and stop.is_set()):
+        if not breaker.ready():
+            if drain_until is not None and drain_until.is_set():
+                return
+            (stop or drain_until).wait(idle_seconds)
+            continue
+        size = budget.take(ALIGO_BATCH_SIZE) if budget else ALIGO_BATCH_SIZE
+        batch = sent.claim(size, OUTBOX_LEASE_SECONDS, hold_seconds(drain_until)) if size else []
+        if budget:
+            budget.refund(size - recipient_count(batch))
+        if batch:
+            ok, failed, res, mids = send_chunk(batch, payload)
+            record_batch_result(batch, ok, failed, res, sent, mids)
+            if budget:
+                budget.refund(failed_recipients(batch, failed))
+        elif drain_until is not None and drain_until.is_set():
+            return
+        else:
+            (stop or drain_until).wait(idle_seconds)
+
+
+def hold_seconds(ingest_done=None):
+    """조회가 끝난 1회 실행은 더 들어올 주문이 없으므로 기다리지 않습니다."""
+    return 0 if ingest_done is not None and ingest_done.is_set() else COALESCE_WINDOW_SECONDS
+
+
+def failed_recipients(batch, failed):
+    phones = dict(batch)
+    return recipient_count([(key, phones[key]) for key in failed])
+
+
+# ──────────────────────────────────────────────────────────
+# 조회 → 대기열
+def enqueue_orders(sent, provider, orders):
+    """Order 들을 provider(Account.key) 이름으로 대기열에 넣고 새로 넣은 건수를 돌려줍니다. 이미 있거나 보낸 주문은 중복."""
+    queued = duplicate = 0
+    for order in orders:
+        if sent.enqueue(provider, order.order_id, order.phone, normalize_phone(order.phone)):
+            queued += 1
+            log.sample("order_queued", provider=provider, order_id=order.order_id, phone=order.phone,
+                       product=order.product, ordered_at=order.ordered_at)
+        else:
+            duplicate += 1
+    metrics.inc("orders_total", queued, provider=provider, result="queued")
+    metrics.inc("orders_total", duplicate, provider=provider, result="duplicate")
+    return queued
+
+
+def ingest(sent, account, provider):
+    """
+    (계정, 판매처) 의 조회 구간 주문을 대기열에 넣고 워터마크를 옮깁니다. 워터마크/발송 기록 이름은 Account.key 입니다.
+    주문이 대기열에 남아 있으므로 발송 성공 여부와 관계없이 구간은 끝난 것으로 봅니다.
+    """
+    name = account.key(provider)
+    plugin = marketplace.get(provider)
+    window = poll_window(sent, name, lookback=plugin.max_window, incremental=plugin.incremental)
+    with metrics.timer("poll_seconds", provider=name):
+        count = enqueue_orders(sent, name, marketplace.fetch_orders(account, provider, window, skip=sent.known))
+    sent.set_watermark(name, window[1].timestamp())
+    log.info("ingest", f"📥 {name}: 신규 {count}건 대기열 추가", name=name, queued=count,
+             start=window[0].isoformat(), end=window[1].isoformat())
+    return count
+
+
+def circuit_skip(provider):
+    """판매처 API 의 차단기가 열려 있으면 조회를 건너뛸 이유(문자열), 아니면 None"""
+    breaker = circuit_breaker.breaker(provider)
+    if breaker.ready():
+        return None
+    return f"API 차단 중 ({breaker.retry_in():.0f}초 후 다시 시도)"
+
+
+def poll_account(sent, account, provider):
+    """
+    계정 1개의 판매처 1개를 조회합니다. 실패하면 오류 문자열, 성공하면 None.
+    판매처 API 차단기가 열려 있으면 요청 없이 바로 건너뜁니다. (워터마크는 그대로라 다음 조회에서 이어 받음)
+    """
+    skip = circuit_skip(provider)
+    if skip:
+        log.warning("poll_skipped", f"⏭️ {marketplace.label(provider)} 조회 건너뜀 ({account.name}): {skip}",
+                    account=account.name, provider=provider, error=skip)
+        return skip
+    try:
+        ingest(sent, account, provider)
+    except Exception as e:
+        log.error("poll_failed", f"❌ {marketplace.label(provider)} 처리 실패 ({account.name}): {e}",
+                  account=account.name, provider=provider, error=str(e))
+        return str(e)
+    return None
+
+
+def poll_all(sent, accounts=None):
+    """
+    모든 계정의 판매처별 신규 결제 완료 주문을 대기열에 넣습니다.
+    {계정 이름: {provider: 오류 문자열}} (실패한 조회만) 을 돌려줍니다.
+    """
+    accounts = accounts or load_accounts()
+    jobs = marketplace.jobs(accounts)
+    errors = {}
+    if not jobs:
+        log.warning("no_accounts", "⚠️ 조회할 계정이 없습니다. (accounts.json 또는 NAVER_* / COUPANG_* 환경변수 확인)")
+        return errors
+    with ThreadPoolExecutor(max_workers=max(1, min(ACCOUNT_WORKERS, len(jobs))),
+                            thread_name_prefix="poll") as pool:
+        futures = [(account, provider, pool.submit(poll_account, sent, account, provider))
+                   for account, provider in jobs]
+        for account, provider, fut in futures:
+            error = fut.result()
+            if error:
+                errors.setdefault(account.name, {})[provider] = error
+    return errors
+
+
+def account_report(accounts, errors=None):
+    """
+    계정별 집계 {계정: {provider: {"queued", "duplicate", "excluded", "sent", "failed"[, "error"]}}}.
+    metrics 카운터에서 모으므로 상주 모드에서는 시작 이후 누적값입니다.
+    """
+    by_key = {}
+    for name, field_of in (("orders_total", lambda r: r),
+                           ("alimtalk_total", lambda r: "sent" if r == "ok" else r)):
+        for labels, value in metrics.counter_values(name):
+            if "provider" in labels:
+                row = by_key.setdefault(labels["provider"], {})
+                field = field_of(labels["result"])
+                row[field] = row.get(field, 0) + value
+    report = {}
+    registered = marketplace.providers()
+    for account in accounts:
+        for provider in account.providers():
+            if provider not in registered:
+                continue
+            row = {"queued": 0, "duplicate": 0, "excluded": 0, "sent": 0, "failed": 0,
+                   **by_key.get(account.key(provider), {})}
+            error = (errors or {}).get(account.name, {}).get(provider)
+            if error:
+                row["error"] = error
+            report.setdefault(account.name, {})[provider] = row
+    return report
+
+
+def print_report(report):
+    for name, providers in report.items():
+        parts = []
+        for provider, row in providers.items():
+            part = (f"{marketplace.label(provider)} 신규 {row['queued']} / 중복 {row['duplicate']}"
+                    f" / 제외 {row['excluded']} / 발송 {row['sent']} / 실패 {row['failed']}")
+            parts.append(part + (" (조회 실패)" if "error" in row else ""))
+        log.info("account_report", f"🧾 [{name}] " + " | ".join(parts), account=name, providers=providers)
+
+
+# ──────────────────────────────────────────────────────────
+def run_once(sent, payload=None, accounts=None):
+    """
+    한 번 조회하고 대기열이 빌 때까지 발송합니다. 계정별 집계(account_report)를 돌려줍니다.
+    발송 워커는 조회와 동시에 돌기 시작하므로 첫 묶음은 조회가 끝나기 전에 나갑니다.
+    """
+    accounts = accounts or load_accounts()
+    # 이전 실행 발송분의 전달 결과 확인은 조회와 동시에 (실패분은 이번 발송 워커가 다시 보냄)
+    errors = send_while(sent, payload, lambda: reconcile.alongside(sent, lambda: poll_all(sent, accounts)))
+    return finish_run(sent, accounts, errors)
+
+
+def send_while(sent, payload, work):
+    """
+    work() 를 실행하는 동안 OUTBOX_WORKERS 개 발송 워커를 같이 돌리고, work 가 끝나면 대기열이 빌 때까지 발송합니다.
+    work() 의 반환값을 돌려줍니다.
+    """
+    payload = payload or alimtalk_payload()
+    budget = send_budget(sent)
+    ingest_done = threading.Event()
+    with ThreadPoolExecutor(max_workers=OUTBOX_WORKERS) as pool:
+        workers = [pool.submit(send_worker, sent, payload, drain_until=ingest_done, budget=budget)
+                   for _ in range(OUTBOX_WORKERS)]
+        try:
+            result = work()
+        finally:
+            ingest_done.set()
+        for worker in workers:
+            worker.result()
+    return result
+
+
+def finish_run(sent, accounts, errors):
+    """대기열 상태, 속도 제한, 계정별 집계를 출력하고 집계를 돌려줍니다."""
+    stats = sent.outbox_stats()
+    if stats["pending"] or stats["dead"]:
+        log.warning("outbox_backlog", f"📮 대기열: 재시도 대기 {stats['pending']}건 / 재시도 한도 초과 {stats['dead']}건",
+                    **stats)
+    log_limits()
+    report = account_report(accounts, errors)
+    print_report(report)
+    return report
+
+
+def log_limits():
+    """속도 제한과 (열린 적이 있으면) 회로 차단기 상태를 남깁니다."""
+    log.info("rate_limit", f"🚦 속도 제한: {rate_limit.describe()}", limiters=rate_limit.snapshot())
+    circuits = circuit_breaker.describe()
+    if circuits:
+        log.warning("circuit_breaker", f"🔌 차단기: {circuits}", breakers=circuit_breaker.snapshot())
+
+
+def write_run_summary(started, report=None):
+    """1회 실행의 단계별 시간/건수와 계정별 집계를 METRICS_SUMMARY_FILE 에 남깁니다."""
+    try:
+        path = metrics.write_summary(duration_seconds=round(time.monotonic() - started, 3),
+                                     rate_limit=rate_limit.snapshot(),
+                                     circuit_breaker=circuit_breaker.snapshot(),
+                                     accounts=report or {})
+        log.info("run_summary", f"📊 실행 요약: {path}", path=str(path))
+    except OSError as e:
+        log.warning("run_summary_failed", f"⚠️ 실행 요약 저장 실패: {e}", error=str(e))
+
+
+def main():
+    started = time.monotonic()
+    sent = open_sent_store()
+    report = None
+    try:
+        report = run_once(sent)
+        # 발송 기록은 건별로 이미 저장됨 → 보관기간 지난 기록만 정리
+        sent.maintain()
+    finally:
+        close_sent_store(sent)
+        write_run_summary(started, report)
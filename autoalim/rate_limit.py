@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+API 묶음(naver / coupang / aligo)별 적응형 속도 제한.
+
+토큰 버킷(GCRA)으로 초당 요청 수를 맞추고,
+  - HTTP 429 또는 Retry-After 를 받으면 속도를 절반으로 줄이고 Retry-After 동안 요청을 멈추며
+  - 연속 성공이 INCREASE_AFTER 번 쌓이면 설정한 최대 속도까지 조금씩 다시 올립니다.
+현재 속도와 누적 대기 시간은 snapshot() 으로 확인할 수 있습니다.
+"""
+import email.utils
+import os
+import threading
+import time
+
+
+INCREASE_AFTER  = int(os.getenv("RATE_LIMIT_INCREASE_AFTER", "20"))
+DECREASE_FACTOR = 0.5
+INCREASE_RATIO  = 0.1     # 한 번에 올리는 폭 = 최대 속도 × 10%
+MIN_RATIO       = 0.05    # 아무리 줄여도 최대 속도의 5% 까지만
+
+
+def parse_retry_after(value, now=None):
+    """Retry-After 헤더(초 또는 HTTP 날짜) → 대기 초. 없거나 해석할 수 없으면 None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (now or time.time()))
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, name, rate, burst=1, clock=time.monotonic):
+        """clock: 현재 시각(초)을 돌려주는 함수 — 테스트에서 바꿔 넣습니다."""
+        self.name = name
+        self._clock = clock
+        self.max_rate = float(rate)
+        self.min_rate = max(self.max_rate * MIN_RATIO, 0.1)
+        self.burst = max(1, int(burst))
+        self._lock = threading.Lock()
+        self._set_rate(self.max_rate)
+        self._tat = 0.0              # 다음 요청의 이론상 도착 시각 (clock 기준)
+        self._blocked_until = 0.0
+        self._successes = 0
+        self.requests = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+
+    def _set_rate(self, rate):
+        self.rate = rate
+        self._interval = 1.0 / rate
+        self._tolerance = (self.burst - 1) * self._interval
+
+    def reserve(self):
+        """요청 1건 자리를 잡고, 보내기 전에 기다려야 할 초를 돌려줍니다."""
+        with self._lock:
+            now = self._clock()
+            tat = max(self._tat, now)
+            wait = max(0.0, tat - self._tolerance - now, self._blocked_until - now)
+            self._tat = max(tat, now + wait) + self._interval
+            self.requests += 1
+            self.total_wait += wait
+        return wait
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self._successes += 1
+            if self._successes >= INCREASE_AFTER and self.rate < self.max_rate:
+                self._set_rate(min(self.max_rate, self.rate + self.max_rate * INCREASE_RATIO))
+                self._successes = 0
+
+    def on_throttle(self, retry_after=None):
+        with self._lock:
+            self.throttled += 1
+            self._successes = 0
+            self._set_rate(max(self.min_rate, self.rate * DECREASE_FACTOR))
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, self._clock() + retry_after)
+
+    def observe(self, status, retry_after_header=None):
+        """응답 상태/Retry-After 로 속도를 조정합니다. 재시도가 필요하면(429) 대기 초를, 아니면 None."""
+        retry_after = parse_retry_after(retry_after_header)
+        if status == 429:
+            self.on_throttle(retry_after)
+            return retry_after or 0.0
+        if retry_after is not None:       # 503 + Retry-After 등
+            self.on_throttle(retry_after)
+        elif status < 500:
+            self.on_success()
+        return None
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "rate": round(self.rate, 3),
+                "max_rate": self.max_rate,
+                "blocked_for": round(max(0.0, self._blocked_until - self._clock()), 3),
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "total_wait": round(self.total_wait, 3),
+            }
+
+
+# ──────────────────────────────────────────────────────────
+# API 묶음별 기본 속도(초당 요청 수). RATE_LIMIT_<NAVER|COUPANG|ALIGO|ALIGO_HISTORY> 로 바꿀 수 있습니다.
+DEFAULT_RATES = {"naver": 5, "coupang": 5, "aligo": 5, "aligo_history": 5}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter(family):
+    lim = _limiters.get(family)
+    if lim is None:
+        with _limiters_lock:
+            lim = _limiters.get(family)
+            if lim is None:
+                rate = float(os.getenv(f"RATE_LIMIT_{family.upper()}", DEFAULT_RATES.get(family, 5)))
+                burst = int(os.getenv(f"RATE_LIMIT_{family.upper()}_BURST", "2"))
+                lim = _limiters[family] = AdaptiveRateLimiter(family, rate, burst)
+    return lim
+
+
+def snapshot():
+    return {family: lim.snapshot() for family, lim in sorted(_limiters.items())}
+
+
+def describe():
+    """로그용 한 줄 요약: 'aligo 2.5/5.0/s 429×1 대기 1.4s'"""
+    return ", ".join(
+        f"{family} {s['rate']:g}/{s['max_rate']:g}/s 429×{s['throttled']} 대기 {s['total_wait']:g}s"
+        + (f" (차단 {s['blocked_for']:g}s 남음)" if s["blocked_for"] else "")
+        for family, s in snapshot().items()
+    )
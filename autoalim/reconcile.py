@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+알림톡 전달 결과 확인(reconcile).
+
+알리고 발송 응답(code 0)은 "접수"일 뿐이라, 접수 후 카카오 전달에 실패하거나 대체 문자로 나간 건은 알 수 없습니다.
+발송할 때 받은 mid 를 발송 기록에 남겨 두고(state = accepted), 발송과 별도로 이력 상세를 mid 단위로
+(묶음 1개 = 최대 ALIGO_BATCH_SIZE 명을 요청 1번에) 조회해 주문별 state 를 바꿉니다.
+  - delivered : 알림톡 전달
+  - fallback  : 대체 문자(SMS/LMS)로 전달 → 다시 보내지 않음
+  - failed    : 전달 실패 → RECONCILE_MAX_RESENDS 번까지 다시 발송 대기열로
+  - unknown   : RECONCILE_MAX_AGE_HOURS 가 지나도록 결과가 없음
+
+발송 응답의 일부 실패(fcnt > 0)도 발송 워커가 이력을 조회하지 않고 여기서 failed 로 찾아 다시 보냅니다.
+발송 워커는 기다리지 않습니다. 1회 실행은 조회와 동시에 이전 실행의 발송분을, 상주 모드는 별도 스레드에서
+RECONCILE_INTERVAL_SECONDS 마다 확인합니다.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import log, metrics
+from .aligo import aligo_history, delivery_state, normalize_phone
+
+
+RECONCILE_ENABLED          = os.getenv("ALIGO_RECONCILE", "1") != "0"
+RECONCILE_DELAY_SECONDS    = int(os.getenv("RECONCILE_DELAY_SECONDS", "60"))      # 발송 후 이만큼 지나야 확인
+RECONCILE_MAX_AGE_HOURS    = float(os.getenv("RECONCILE_MAX_AGE_HOURS", "24"))
+RECONCILE_MAX_RESENDS      = int(os.getenv("RECONCILE_MAX_RESENDS", "1"))
+RECONCILE_WORKERS          = int(os.getenv("RECONCILE_WORKERS", "4"))             # 동시에 조회할 mid 수
+RECONCILE_BATCH            = int(os.getenv("RECONCILE_BATCH", "5000"))            # 한 번에 확인할 최대 주문 수
+RECONCILE_INTERVAL_SECONDS = int(os.getenv("RECONCILE_INTERVAL_SECONDS", "300"))  # 상주 모드 확인 주기
+
+
+def classify(rows, res, now=None):
+    """
+    mid 1개의 이력 응답 → {state: [row, ...]} (결과 대기 중인 주문은 빠짐).
+    rows: SentStore.accepted_by_mid 의 [(key, phone, sent_at, resends), ...]
+    """
+    if res is None or res.get("code") != 0:
+        return {}
+    by_phone = {normalize_phone(item.get("phone")): delivery_state(item) for item in res.get("list", [])}
+    expired = (now or time.time()) - RECONCILE_MAX_AGE_HOURS * 3600
+    states = {}
+    for row in rows:
+        _, phone, sent_at, _ = row
+        state = by_phone.get(normalize_phone(phone))
+        if state is None:
+            if sent_at >= expired:
+                continue
+            state = "unknown"
+        states.setdefault(state, []).append(row)
+    return states
+
+
+def reconcile_mid(sent, mid, rows):
+    """mid 1개를 확인해 state 를 기록하고 실패분은 다시 대기열에 넣습니다. {state: 건수} 를 돌려줍니다."""
+    res = aligo_history(mid)
+    if res is not None and res.get("code") != 0:
+        log.warning("aligo_history_failed", f"⚠️ 알리고 이력 조회 실패: {mid} {res.get('message')}",
+                    mid=mid, error=res.get("message"))
+    counts = {}
+    for state, group in classify(rows, res).items():
+        if state == "failed":
+            resend = [row for row in group if row[3] < RECONCILE_MAX_RESENDS]
+            sent.requeue([(key, phone, normalize_phone(phone)) for key, phone, _, _ in resend],
+                         error=f"전달 실패 (mid {mid})")
+            sent.set_state([row[0] for row in group if row[3] >= RECONCILE_MAX_RESENDS], "failed")
+            counts["requeued"] = counts.get("requeued", 0) + len(resend)
+        else:
+            sent.set_state([row[0] for row in group], state)
+        counts[state] = counts.get(state, 0) + len(group)
+        by_provider = {}
+        for (provider, _), _, _, _ in group:
+            by_provider[provider] = by_provider.get(provider, 0) + 1
+        for provider, n in by_provider.items():
+            metrics.inc("alimtalk_delivery_total", n, provider=provider, state=state)
+    return counts
+
+
+def reconcile(sent, now=None):
+    """발송 후 RECONCILE_DELAY_SECONDS 가 지난 결과 미확인 주문을 확인합니다. {state: 건수, "requeued": 건수}"""
+    now = now or time.time()
+    by_mid = sent.accepted_by_mid(now - RECONCILE_DELAY_SECONDS, RECONCILE_BATCH)
+    totals = {}
+    if not by_mid:
+        return totals
+    with metrics.timer("reconcile_seconds"):
+        with ThreadPoolExecutor(max_workers=max(1, min(RECONCILE_WORKERS, len(by_mid))),
+                                thread_name_prefix="reconcile") as pool:
+            futures = [pool.submit(reconcile_mid, sent, mid, rows) for mid, rows in by_mid.items()]
+            for fut in futures:
+                for state, n in fut.result().items():
+                    totals[state] = totals.get(state, 0) + n
+    if totals:
+        log.info("reconcile", "📬 알림톡 전달 결과 확인: " + ", ".join(f"{state} {n}" for state, n in sorted(totals.items())),
+                 **totals)
+    return totals
+
+
+def reconcile_safely(sent):
+    """조회·발송을 막지 않도록 오류는 출력만 합니다."""
+    if not RECONCILE_ENABLED:
+        return {}
+    try:
+        return reconcile(sent)
+    except Exception as e:
+        log.error("reconcile_failed", f"⚠️ 전달 결과 확인 실패: {e}", error=str(e))
+        return {}
+
+
+def alongside(sent, work):
+    """work() 와 동시에 전달 결과를 확인하고 work() 의 반환값을 돌려줍니다. (1회 실행용)"""
+    checker = threading.Thread(target=reconcile_safely, args=(sent,), name="reconcile", daemon=True)
+    checker.start()
+    try:
+        return work()
+    finally:
+        checker.join()
+
+
+def worker(sent, stop, interval=None):
+    """상주 모드: stop 이 설정될 때까지 interval 초마다 확인합니다."""
+    interval = interval or RECONCILE_INTERVAL_SECONDS
+    while not stop.wait(interval):
+        reconcile_safely(sent)
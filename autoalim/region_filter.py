@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+제외 지역 판별.
+
+주소 앞부분의 시/도, 시/군/구 토큰을 표준 표기로 바꾼 뒤 (시/도 → 시/군/구) 2단계 사전에서 찾습니다.
+"충남 보령시", "충청남도 보령시", "충남 보령" 이 모두 같은 규칙 "충남 보령시" 에 걸리므로
+규칙 파일에 표기별로 따로 적을 필요가 없습니다.
+시/도 없이 시/군부터 적힌 주소("제주시 연동")는 PROVINCE_CITIES 로 시/도를 찾아 같은 규칙을 적용하고,
+앞에 붙은 우편번호("12345", "[12345]")는 건너뜁니다.
+
+규칙 파일(exclude_regions.json) 예:
+    {"exclude": ["강원", "충남 보령시", "제주"]}
+  - "강원"        → 시/도 전체 제외
+  - "충남 보령시" → 해당 시/군/구만 제외
+"""
+import json
+import os
+from pathlib import Path
+
+from . import metrics
+
+
+# 기본값은 패키지 바깥(실행 폴더 최상위)의 exclude_regions.json
+EXCLUDE_REGIONS_FILE = Path(os.getenv("EXCLUDE_REGIONS_FILE", Path(__file__).resolve().parent.parent / "exclude_regions.json"))
+
+# 규칙 파일이 없을 때 쓰는 기본값
+DEFAULT_RULES = [
+    "강원", "전북", "제주",
+    "충남 보령시", "충남 논산시",
+    "충북 보은군", "충북 음성군", "충북 진천군",
+    "경기 이천시",
+    "전남 목포시", "전남 무안군",
+]
+
+# 시/도 표기 → 표준 약칭
+PROVINCE_ALIASES = {
+    "서울": ("서울특별시", "서울시"),
+    "부산": ("부산광역시", "부산시"),
+    "대구": ("대구광역시", "대구시"),
+    "인천": ("인천광역시", "인천시"),
+    "광주": ("광주광역시", "광주시"),
+    "대전": ("대전광역시", "대전시"),
+    "울산": ("울산광역시", "울산시"),
+    "세종": ("세종특별자치시", "세종시"),
+    "경기": ("경기도",),
+    "강원": ("강원도", "강원특별자치도"),
+    "충북": ("충청북도",),
+    "충남": ("충청남도",),
+    "전북": ("전라북도", "전북특별자치도"),
+    "전남": ("전라남도",),
+    "경북": ("경상북도",),
+    "경남": ("경상남도",),
+    "제주": ("제주도", "제주특별자치도"),
+}
+_PROVINCES = {alias: canon for canon, aliases in PROVINCE_ALIASES.items() for alias in (canon, *aliases)}
+
+# 시/도별 시/군 (시·군 글자를 뺀 이름). 시/도 없이 시/군부터 적힌 주소에 시/도 전체 규칙을 적용할 때 씁니다.
+# 광역시의 구(중구, 남구 등)는 여러 시에 같은 이름이 있어 넣지 않습니다.
+PROVINCE_CITIES = {
+    "부산": ("기장",),
+    "대구": ("달성", "군위"),
+    "인천": ("강화", "옹진"),
+    "울산": ("울주",),
+    "경기": ("수원", "성남", "의정부", "안양", "부천", "광명", "평택", "동두천", "안산", "고양", "과천", "구리",
+             "남양주", "오산", "시흥", "군포", "의왕", "하남", "용인", "파주", "이천", "안성", "김포", "화성",
+             "광주", "양주", "포천", "여주", "연천", "가평", "양평"),
+    "강원": ("춘천", "원주", "강릉", "동해", "태백", "속초", "삼척", "홍천", "횡성", "영월", "평창", "정선",
+             "철원", "화천", "양구", "인제", "고성", "양양"),
+    "충북": ("청주", "충주", "제천", "보은", "옥천", "영동", "증평", "진천", "괴산", "음성", "단양"),
+    "충남": ("천안", "공주", "보령", "아산", "서산", "논산", "계룡", "당진", "금산", "부여", "서천", "청양",
+             "홍성", "예산", "태안"),
+    "전북": ("전주", "군산", "익산", "정읍", "남원", "김제", "완주", "진안", "무주", "장수", "임실", "순창",
+             "고창", "부안"),
+    "전남": ("목포", "여수", "순천", "나주", "광양", "담양", "곡성", "구례", "고흥", "보성", "화순", "장흥",
+             "강진", "해남", "영암", "무안", "함평", "영광", "장성", "완도", "진도", "신안"),
+    "경북": ("포항", "경주", "김천", "안동", "구미", "영주", "영천", "상주", "문경", "경산", "의성", "청송",
+             "영양", "영덕", "청도", "고령", "성주", "칠곡", "예천", "봉화", "울진", "울릉"),
+    "경남": ("창원", "진주", "통영", "사천", "김해", "밀양", "거제", "양산", "의령", "함안", "창녕", "고성",
+             "남해", "하동", "산청", "함양", "거창", "합천"),
+    "제주": ("제주", "서귀포"),
+}
+_CITY_PROVINCES = {}   # 시/군 → 그 이름이 있는 시/도 set (고성: 강원, 경남)
+for _province, _cities in PROVINCE_CITIES.items():
+    for _name in _cities:
+        _CITY_PROVINCES.setdefault(_name, set()).add(_province)
+
+
+def _is_postcode(token):
+    """'12345', '(12345)', '[123-456]' 같은 우편번호"""
+    return token.strip("()[]").replace("-", "").isdigit()
+
+
+def _city(token):
+    """'보령시' / '보령' → '보령'. '중구' 처럼 짧은 이름은 그대로 둡니다."""
+    if len(token) > 2 and token[-1] in "시군구":
+        return token[:-1]
+    return token
+
+
+class RegionMatcher:
+    """규칙을 한 번 컴파일해 두고 주소마다 사전 조회 두세 번으로 판별합니다."""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._whole = set()   # 전체 제외 시/도
+        self._cities = {}     # 시/도 → 제외 시/군/구 set
+        self._city_any = set()  # 시/도 없이 시/군/구부터 시작하는 주소용
+        for rule in self.rules:
+            tokens = rule.split()
+            province = _PROVINCES.get(tokens[0]) if tokens else None
+            if province is None:
+                raise ValueError(f"알 수 없는 시/도: {rule!r}")
+            if len(tokens) == 1:
+                self._whole.add(province)
+            else:
+                city = _city(tokens[1])
+                self._cities.setdefault(province, set()).add(city)
+                self._city_any.add(city)
+        # 시/도 전체 제외: 그 시/도의 시/군도 시/도 없이 적힌 주소에서 찾을 수 있게 (이름이 같은 다른 시/도가 있으면
+        # 그 시/도도 모두 제외일 때만)
+        for city, provinces in _CITY_PROVINCES.items():
+            if provinces <= self._whole:
+                self._city_any.add(city)
+
+    def excluded(self, address):
+        if not address:
+            return False
+        tokens = address.split(None, 2)
+        if not tokens:
+            return False
+        if tokens[0][0] in "0123456789([" and _is_postcode(tokens[0]):
+            tokens = address.split(None, 3)[1:]
+            if not tokens:
+                return False
+        province = _PROVINCES.get(tokens[0])
+        if province is None:
+            return _city(tokens[0]) in self._city_any
+        if province in self._whole:
+            return True
+        return len(tokens) > 1 and _city(tokens[1]) in self._cities.get(province, ())
+
+
+def load_rules(path=EXCLUDE_REGIONS_FILE):
+    path = Path(path)
+    if not path.exists():
+        return DEFAULT_RULES
+    return json.loads(path.read_text(encoding="utf-8"))["exclude"]
+
+
+def load_matcher(path=EXCLUDE_REGIONS_FILE):
+    return RegionMatcher(load_rules(path))
+
+
+_default_matcher = None
+
+
+def default_matcher():
+    """EXCLUDE_REGIONS_FILE 로 만든 공용 matcher (처음 쓸 때 한 번만 컴파일)"""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = load_matcher()
+    return _default_matcher
+
+
+def filter_page(provider, orders, matcher=None):
+    """
+    정규화된 주문 페이지 1개(marketplace.Order, 보낼 수 없는 건은 None) → 제외 지역이 아닌 [Order, ...].
+    뺀 건수를 metrics 에 남깁니다.
+    """
+    excluded = (matcher or default_matcher()).excluded
+    kept = [order for order in orders if order is not None and not excluded(order.address or "")]
+    if len(orders) > len(kept):
+        metrics.inc("orders_total", len(orders) - len(kept), provider=provider, result="excluded")
+    return kept
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+실행 중복 방지 잠금.
+
+작업 스케줄러가 이전 실행(느린 알리고 묶음 등)이 끝나기 전에 다음 실행을 띄우면 두 프로세스가 같은 주문을
+조회하고 발송 대기열을 두고 다투게 되므로, run / daemon / backfill 은 RUN_LOCK_FILE 을 잡은 프로세스 하나만 돕니다.
+잠금을 못 잡은 실행은 RUN_OVERLAP 에 따라
+  - handoff (기본): RUN_TRIGGER_FILE 을 남기고 바로 종료합니다. 잠금을 가진 실행이 이번 회차를 마친 뒤
+                   한 번 더 조회하므로(상주 모드는 다음 주기를 기다리지 않고 바로) 요청이 버려지지 않습니다.
+                   그 사이에 여러 번 들어온 요청은 한 번으로 합쳐집니다.
+  - exit          : 아무것도 남기지 않고 종료합니다.
+daemon 과 backfill 은 잠금이 풀릴 때까지 기다렸다가 시작합니다. (wait)
+잠금을 보유한 시간은 run_lock_held 로그와 run_lock_held_seconds 히스토그램에 남습니다.
+
+    run_lock.exclusive("run", pipeline.main)
+"""
+import os
+import time
+from pathlib import Path
+
+from . import log, metrics
+from .file_lock import FileLock
+
+
+RUN_LOCK_FILE    = Path(os.getenv("RUN_LOCK_FILE", "autoalim.run.lock"))
+RUN_TRIGGER_FILE = Path(os.getenv("RUN_TRIGGER_FILE", str(RUN_LOCK_FILE.with_suffix(".trigger"))))
+RUN_OVERLAP      = os.getenv("RUN_OVERLAP", "handoff").lower()    # handoff | exit
+
+
+def request_run():
+    """잠금을 가진 실행에게 한 번 더 조회해 달라고 남깁니다."""
+    with open(RUN_TRIGGER_FILE, "a", encoding="utf-8") as f:
+        f.write(f"{os.getpid()} {time.time():.3f}\n")
+
+
+def take_trigger():
+    """넘겨받은 요청이 있으면 지우고 True. (Windows 에서 요청을 쓰는 중이면 다음 확인 때 가져감)"""
+    try:
+        os.remove(RUN_TRIGGER_FILE)
+        return True
+    except OSError:
+        return False
+
+
+def pending():
+    return RUN_TRIGGER_FILE.exists()
+
+
+def _overlap(command):
+    """잠금을 못 잡았을 때. handoff 면 요청을 남긴 뒤 그 사이 잠금이 풀렸는지 한 번 더 봅니다."""
+    lock = FileLock(RUN_LOCK_FILE)
+    if RUN_OVERLAP == "handoff":
+        request_run()
+        # 잠금을 가진 실행이 요청을 보기 직전에 끝났다면 이쪽이 대신 돕니다.
+        if lock.acquire(blocking=False):
+            return lock
+        message = "⏭️ 이전 실행이 아직 진행 중 → 조회 요청을 넘기고 종료합니다."
+    else:
+        message = "⏭️ 이전 실행이 아직 진행 중 → 이번 실행은 건너뜁니다."
+    metrics.inc("run_overlap_total", command=command, action=RUN_OVERLAP)
+    log.warning("run_overlap", message, command=command, action=RUN_OVERLAP, lock=str(RUN_LOCK_FILE))
+    return None
+
+
+def acquire(command):
+    """잠금을 잡으면 FileLock, 다른 실행이 잡고 있으면 RUN_OVERLAP 대로 처리하고 None."""
+    lock = FileLock(RUN_LOCK_FILE)
+    if lock.acquire(blocking=False):
+        return lock
+    return _overlap(command)
+
+
+def wait(command, stop=None, poll_interval=1.0):
+    """잠금이 풀릴 때까지 기다려 잡습니다. (상주 모드·backfill 시작용) stop 이 set 되면 None."""
+    lock = FileLock(RUN_LOCK_FILE)
+    if lock.acquire(blocking=False):
+        return lock
+    log.warning("run_lock_wait", "⏳ 다른 실행(run / daemon / backfill)이 진행 중 → 끝날 때까지 기다립니다.",
+                command=command, lock=str(RUN_LOCK_FILE))
+    while stop is None or not stop.is_set():
+        if lock.acquire(timeout=poll_interval):
+            return lock
+    return None
+
+
+def release(lock, command, acquired_at, rounds):
+    """잠금을 풀고 보유 시간을 남깁니다."""
+    lock.release()
+    held = time.monotonic() - acquired_at
+    metrics.observe("run_lock_held_seconds", held, command=command)
+    log.info("run_lock_held", f"🔒 실행 잠금 {held:.2f}s 보유 ({rounds}회 실행)",
+             command=command, seconds=round(held, 3), rounds=rounds)
+
+
+def exclusive(command, work):
+    """
+    잠금을 잡고 work() 를 실행합니다. 실행 중 넘겨받은 요청이 있으면 잠금을 쥔 채 work() 를 다시 돌리고,
+    잠금을 푼 직후 들어온 요청도 다시 잠금을 잡아 처리합니다. 실행한 횟수를 돌려줍니다. (못 잡았으면 0)
+    """
+    total = 0
+    lock = acquire(command)
+    while lock is not None:
+        acquired_at = time.monotonic()
+        rounds = 0
+        try:
+            while True:
+                take_trigger()       # 지금 시작하는 회차가 밀린 요청을 대신합니다.
+                work()
+                rounds += 1
+                if not pending():
+                    break
+                log.info("run_handoff", "🔁 실행 중 넘겨받은 조회 요청 → 한 번 더 실행합니다.", command=command)
+        finally:
+            release(lock, command, acquired_at, rounds)
+        total += rounds
+        lock = FileLock(RUN_LOCK_FILE)
+        if not (pending() and lock.acquire(blocking=False)):
+            lock = None
+    return total
@@ -0,0 +1,441 @@
+# -*- coding: utf-8 -*-
+"""
+발송 기록 저장소 + 발송 대기열(outbox).
+
+sent_records.json 을 매번 통째로 다시 쓰는 대신 SQLite 에 주문 1건당 1행씩만 기록합니다.
+중복 확인은 메모리의 set 인덱스로 O(1) 에 처리하고, 보관기간이 지난 기록은 정리합니다.
+인덱스에 없는 주문도 대기열에 넣을 때 sent 테이블을 한 번 더 확인하므로, 같은 파일을 여러 프로세스가 써도
+다른 프로세스가 이미 보낸 주문이 다시 들어오지 않습니다.
+
+조회 단계는 주문을 outbox 에 넣기만 하고(enqueue), 발송 워커가 꺼내서(claim) 보낸 뒤
+성공분은 sent 로 옮기고(ack) 실패분은 뒤로 미룹니다(nack).
+꺼낸 주문은 lease 시간 동안만 잡혀 있으므로 발송 중 프로세스가 죽어도 lease 가 끝나면 다시 발송됩니다(at-least-once).
+sent 에 있는 주문은 다시 들어오지 않으므로 같은 주문이 두 번 기록되지는 않습니다.
+
+대기열의 recipient(숫자만 남긴 수신번호)가 같은 주문은 claim 때 함께 꺼내므로
+발송 단계에서 수신자 1명당 알림톡 1건으로 합칠 수 있습니다.
+
+sent 의 state 는 알리고가 접수(accepted)한 뒤 이력 조회로 확인한 실제 전달 결과입니다. (reconcile 모듈)
+  accepted → delivered / fallback(대체 문자) / failed(다시 대기열로) / unknown(결과를 끝내 못 받음)
+mid 없이 기록된 예전 행은 state 가 NULL 이고 확인하지 않습니다.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from . import metrics
+
+
+# 정리된 행이 이 개수를 넘으면 VACUUM 으로 파일 크기도 줄입니다.
+COMPACT_THRESHOLD = 1000
+
+# 발송 실패 시 재시도 간격: RETRY_BASE * 2^시도횟수, 최대 RETRY_MAX 초
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+
+class SentStore:
+    """(provider, order_id) 단위 발송 기록. 예: ("naver", "2024010112345")"""
+
+    def __init__(self, path, retention_days=90, max_attempts=10):
+        self.path = Path(path)
+        self.retention_seconds = retention_days * 86400
+        self.max_attempts = max_attempts
+        # 발송 워커 스레드들이 연결 하나를 같이 쓰므로 모든 접근은 _lock 안에서 합니다.
+        self._lock = threading.RLock()
+        # isolation_level=None: 각 INSERT 가 바로 커밋되어 중간에 죽어도 기록이 남습니다.
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sent ("
+            " provider TEXT NOT NULL,"
+            " order_id TEXT NOT NULL,"
+            " sent_at  REAL NOT NULL,"
+            " PRIMARY KEY (provider, order_id)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sent_sent_at ON sent (sent_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS watermarks (name TEXT PRIMARY KEY, value REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " provider     TEXT NOT NULL,"
+            " order_id     TEXT NOT NULL,"
+            " phone        TEXT NOT NULL,"
+            " recipient    TEXT,"
+            " enqueued_at  REAL NOT NULL,"
+            " available_at REAL NOT NULL,"
+            " lease_until  REAL,"
+            " attempts     INTEGER NOT NULL DEFAULT 0,"
+            " last_error   TEXT,"
+            " PRIMARY KEY (provider, order_id)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_available ON outbox (available_at)")
+        # 백필(backfill) 진행 기록: 끝낸 조회 구간은 다시 실행할 때 건너뜁니다.
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS backfill_windows ("
+            " name    TEXT NOT NULL,"
+            " start   REAL NOT NULL,"
+            " end     REAL NOT NULL,"
+            " queued  INTEGER NOT NULL,"
+            " done_at REAL NOT NULL,"
+            " PRIMARY KEY (name, start, end)"
+            ") WITHOUT ROWID"
+        )
+        # 회로 차단기 상태: 1회 실행끼리 연속 실패 수와 차단 상태를 이어받습니다. (circuit_breaker 모듈)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS circuit_breakers ("
+            " family     TEXT PRIMARY KEY,"
+            " state      TEXT NOT NULL,"
+            " failures   INTEGER NOT NULL,"
+            " retry_at   REAL NOT NULL,"
+            " updated_at REAL NOT NULL"
+            ")"
+        )
+        self._add_recipient_column()
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_recipient ON outbox (recipient)")
+        self._add_delivery_columns()
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sent_accepted ON sent (sent_at) WHERE state = 'accepted'")
+        self._index = {}
+        self._load_index()
+
+    def _add_recipient_column(self):
+        """recipient 열이 없던 예전 대기열 파일: 열을 추가하고 '-', 공백을 뺀 번호로 채웁니다."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+        if "recipient" in columns:
+            return
+        self._conn.execute("ALTER TABLE outbox ADD COLUMN recipient TEXT")
+        self._conn.execute("UPDATE outbox SET recipient = REPLACE(REPLACE(phone, '-', ''), ' ', '')")
+
+    def _add_delivery_columns(self):
+        """
+        전달 결과 확인용 열(phone, mid, state, resends)과 발송 한도 계산용 recipient 열이 없던
+        예전 발송 기록 파일에 열을 추가합니다.
+        """
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sent)")}
+        for name, decl in (("phone", "TEXT"), ("mid", "TEXT"), ("state", "TEXT"),
+                           ("resends", "INTEGER NOT NULL DEFAULT 0"), ("recipient", "TEXT")):
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE sent ADD COLUMN {name} {decl}")
+
+    def _load_index(self):
+        self._index = {}
+        for provider, order_id in self._conn.execute("SELECT provider, order_id FROM sent"):
+            self._index.setdefault(provider, set()).add(order_id)
+
+    def contains(self, provider, order_id):
+        return order_id in self._index.get(provider, ())
+
+    @metrics.timer("store_seconds", op="known")
+    def known(self, provider, order_ids):
+        """order_ids 중 이미 발송했거나 대기열에 있는 것 set (상세 조회 전에 걸러내는 용도)"""
+        ids = {str(order_id) for order_id in order_ids}
+        with self._lock:
+            found = ids & self._index.get(provider, set())
+            rest = list(ids - found)
+            for i in range(0, len(rest), 500):
+                part = rest[i:i + 500]
+                marks = ",".join("?" * len(part))
+                found.update(row[0] for row in self._conn.execute(
+                    f"SELECT order_id FROM outbox WHERE provider = ? AND order_id IN ({marks})"
+                    f" UNION SELECT order_id FROM sent WHERE provider = ? AND order_id IN ({marks})",
+                    (provider, *part, provider, *part),
+                ))
+        return found
+
+    def __len__(self):
+        return sum(len(ids) for ids in self._index.values())
+
+    # ──────────────────────────────────────────────────────
+    # 조회 워터마크: 마지막으로 처리를 끝낸 조회 구간의 끝 시각 (epoch 초)
+    def get_watermark(self, name):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM watermarks WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    @metrics.timer("store_seconds", op="set_watermark")
+    def set_watermark(self, name, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO watermarks (name, value) VALUES (?, ?)"
+                " ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+                (name, value),
+            )
+
+    def backfill_done(self, name):
+        """name(Account.key) 의 끝낸 백필 구간 {(start, end), ...} (epoch 초)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT start, end FROM backfill_windows WHERE name = ?", (name,)).fetchall()
+        return set(rows)
+
+    def mark_backfill_done(self, name, start, end, queued):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO backfill_windows (name, start, end, queued, done_at) VALUES (?, ?, ?, ?, ?)",
+                (name, start, end, queued, time.time()),
+            )
+
+    def load_circuits(self):
+        """{family: (state, 연속 실패 수, 다시 시험할 시각 epoch 초)}"""
+        with self._lock:
+            rows = self._conn.execute("SELECT family, state, failures, retry_at FROM circuit_breakers").fetchall()
+        return {family: (state, failures, retry_at) for family, state, failures, retry_at in rows}
+
+    def save_circuits(self, states):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO circuit_breakers (family, state, failures, retry_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(family, state, failures, retry_at, now) for family, (state, failures, retry_at) in states.items()],
+            )
+
+    # ──────────────────────────────────────────────────────
+    # 발송 대기열 (outbox)
+    @metrics.timer("store_seconds", op="enqueue")
+    def enqueue(self, provider, order_id, phone, recipient=None):
+        """
+        미발송 주문을 대기열에 넣습니다. 이미 발송했거나 대기 중이면 False.
+        recipient 는 같은 수신자를 묶는 키(정규화한 번호)이고, 없으면 phone 을 그대로 씁니다.
+        """
+        order_id = str(order_id)
+        now = time.time()
+        with self._lock:
+            if self.contains(provider, order_id):
+                return False
+            # 메모리 인덱스에는 이 프로세스가 보낸 주문만 있으므로, 같은 파일을 쓰는 다른 프로세스가
+            # 보낸 주문은 sent 테이블을 직접 확인해 다시 넣지 않습니다.
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (provider, order_id, phone, recipient, enqueued_at, available_at)"
+                " SELECT ?, ?, ?, ?, ?, ?"
+                " WHERE NOT EXISTS (SELECT 1 FROM sent WHERE provider = ? AND order_id = ?)",
+                (provider, order_id, phone, recipient or phone, now, now, provider, order_id),
+            )
+            return cur.rowcount > 0
+
+    @metrics.timer("store_seconds", op="claim")
+    def claim(self, limit, lease_seconds=120, hold_seconds=0):
+        """
+        발송할 주문을 수신자 최대 limit 명 분량만큼 꺼내 lease 를 겁니다. [((provider, order_id), phone), ...]
+        lease 가 끝나도록 ack/nack 이 없으면 (프로세스 중단 등) 다시 꺼낼 수 있습니다.
+
+        - 대기열에 들어온 지 hold_seconds 가 지나지 않은 주문은 꺼내지 않습니다. (같은 수신자의 다음 주문을 기다림)
+        - 꺼낸 주문과 수신자가 같은 주문은 hold / 재시도 대기 중이어도 함께 꺼냅니다.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                seeds = self._conn.execute(
+                    "SELECT provider, order_id, phone, recipient FROM outbox"
+                    " WHERE available_at <= ? AND enqueued_at <= ? AND (lease_until IS NULL OR lease_until < ?)"
+                    " AND attempts < ? ORDER BY available_at LIMIT ?",
+                    (now, now - hold_seconds, now, self.max_attempts, limit),
+                ).fetchall()
+                rows = {(p, o): (p, o, phone) for p, o, phone, _ in seeds}
+                recipients = list({r for _, _, _, r in seeds})
+                for i in range(0, len(recipients), 500):
+                    part = recipients[i:i + 500]
+                    siblings = self._conn.execute(
+                        "SELECT provider, order_id, phone FROM outbox"
+                        f" WHERE recipient IN ({','.join('?' * len(part))})"
+                        " AND (lease_until IS NULL OR lease_until < ?) AND attempts < ?",
+                        (*part, now, self.max_attempts),
+                    ).fetchall()
+                    for p, o, phone in siblings:
+                        rows.setdefault((p, o), (p, o, phone))
+                rows = list(rows.values())
+                self._conn.executemany(
+                    "UPDATE outbox SET lease_until = ? WHERE provider = ? AND order_id = ?",
+                    [(now + lease_seconds, p, o) for p, o, _ in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [((p, o), phone) for p, o, phone in rows]
+
+    @metrics.timer("store_seconds", op="ack")
+    def ack(self, keys, sent_at=None, mids=None, phones=None):
+        """
+        발송 성공: 대기열에서 빼고 발송 기록에 남깁니다. 같은 key 를 여러 번 ack 해도 안전합니다.
+        mids({key: mid}) 에 mid 가 있는 주문은 전달 결과 확인 대상(accepted)이 되고, phones 는 다시 보낼 때 씁니다.
+        대기열의 recipient 도 함께 옮겨 두어 한 번에 ack 한 같은 수신자의 주문을 알림톡 1건으로 셀 수 있게 합니다.
+        """
+        if not keys:
+            return
+        sent_at = sent_at or time.time()
+        mids, phones = mids or {}, phones or {}
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 전달 실패로 다시 보낸 주문은 이미 행이 있으므로 새 발송 결과로 덮어씁니다.
+                self._conn.executemany(
+                    "INSERT INTO sent (provider, order_id, sent_at, phone, mid, state, recipient)"
+                    " VALUES (?, ?, ?, ?, ?, ?, (SELECT recipient FROM outbox WHERE provider = ? AND order_id = ?))"
+                    " ON CONFLICT (provider, order_id) DO UPDATE SET sent_at = excluded.sent_at,"
+                    " phone = excluded.phone, mid = excluded.mid, state = excluded.state,"
+                    " recipient = excluded.recipient",
+                    [(p, o, sent_at, phones.get((p, o)), mids.get((p, o)), "accepted" if mids.get((p, o)) else None, p, o)
+                     for p, o in keys],
+                )
+                self._conn.executemany(
+                    "DELETE FROM outbox WHERE provider = ? AND order_id = ?", list(keys)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            for provider, order_id in keys:
+                self._index.setdefault(provider, set()).add(order_id)
+
+    @metrics.timer("store_seconds", op="nack")
+    def nack(self, keys, error=None):
+        """발송 실패: lease 를 풀고 시도 횟수에 따라 뒤로 미룹니다."""
+        if not keys:
+            return
+        now = time.time()
+        with self._lock:
+            for provider, order_id in keys:
+                self._conn.execute(
+                    "UPDATE outbox SET lease_until = NULL, attempts = attempts + 1, last_error = ?,"
+                    " available_at = ? + MIN(?, ? * (1 << MIN(attempts, 20)))"
+                    " WHERE provider = ? AND order_id = ?",
+                    (error, now, RETRY_MAX_SECONDS, RETRY_BASE_SECONDS, provider, order_id),
+                )
+
+    # ──────────────────────────────────────────────────────
+    # 전달 결과 확인 (reconcile)
+    def accepted_by_mid(self, sent_before, limit=None):
+        """
+        sent_before(epoch초) 전에 접수된 결과 미확인 주문 (오래된 것부터)
+        {mid: [(key, phone, sent_at, 다시 보낸 횟수), ...]}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT provider, order_id, phone, mid, sent_at, resends FROM sent"
+                " WHERE state = 'accepted' AND sent_at < ? ORDER BY sent_at LIMIT ?",
+                (sent_before, -1 if limit is None else limit),
+            ).fetchall()
+        by_mid = {}
+        for provider, order_id, phone, mid, sent_at, resends in rows:
+            by_mid.setdefault(mid, []).append(((provider, order_id), phone, sent_at, resends))
+        return by_mid
+
+    @metrics.timer("store_seconds", op="set_state")
+    def set_state(self, keys, state):
+        if not keys:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE sent SET state = ? WHERE provider = ? AND order_id = ?",
+                [(state, p, o) for p, o in keys],
+            )
+
+    @metrics.timer("store_seconds", op="requeue")
+    def requeue(self, orders, error=None):
+        """
+        전달 실패한 주문을 다시 발송 대기열에 넣습니다. orders: [(key, phone, recipient), ...]
+        발송 기록은 state = 'failed' 로 남겨 두므로 조회 단계에서 같은 주문이 다시 들어오지는 않습니다.
+        """
+        if not orders:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "UPDATE sent SET state = 'failed', resends = resends + 1 WHERE provider = ? AND order_id = ?",
+                    [key for key, _, _ in orders],
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO outbox (provider, order_id, phone, recipient, enqueued_at, available_at,"
+                    " last_error) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(p, o, phone, recipient or phone, now, now, error) for (p, o), phone, recipient in orders],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def count_sent_since(self, since):
+        """
+        since(epoch초) 이후 보낸 알림톡 수. 발송 단계가 같은 수신자의 주문을 1건으로 합쳐 보내므로
+        같이 ack 된(sent_at 이 같은) 같은 수신자의 주문은 1건으로 셉니다. recipient 가 없는 예전 행은 주문마다 1건.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM (SELECT DISTINCT sent_at, COALESCE(recipient, provider || ':' || order_id)"
+                " FROM sent WHERE sent_at >= ?)",
+                (since,),
+            ).fetchone()[0]
+
+    def outbox_stats(self):
+        """{"pending": 발송 대기, "dead": 재시도 한도 초과} (lease 중인 건은 pending 에 포함)"""
+        with self._lock:
+            pending, dead = self._conn.execute(
+                "SELECT COALESCE(SUM(attempts < ?), 0), COALESCE(SUM(attempts >= ?), 0) FROM outbox",
+                (self.max_attempts, self.max_attempts),
+            ).fetchone()
+        return {"pending": pending, "dead": dead}
+
+    # ──────────────────────────────────────────────────────
+    # 보관기간 정리 / 압축
+    def prune(self, now=None):
+        """보관기간이 지난 기록을 지우고 지운 행 수를 돌려줍니다."""
+        cutoff = (now or time.time()) - self.retention_seconds
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM sent WHERE sent_at < ?", (cutoff,)).rowcount
+            self._conn.execute("DELETE FROM backfill_windows WHERE done_at < ?", (cutoff,))
+            if deleted:
+                self._load_index()
+        return deleted
+
+    def compact(self):
+        with self._lock:
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    @metrics.timer("store_seconds", op="maintain")
+    def maintain(self):
+        deleted = self.prune()
+        if deleted >= COMPACT_THRESHOLD:
+            self.compact()
+        return deleted
+
+    # ──────────────────────────────────────────────────────
+    # 기존 sent_records.json 1회 이관
+    def migrate_json(self, json_path):
+        """
+        예전 {"naver": [...], "coupang": [...]} 파일을 가져온 뒤 *.migrated 로 이름을 바꿉니다.
+        발송 시각이 없으므로 파일 수정 시각을 sent_at 으로 사용합니다.
+        """
+        json_path = Path(json_path)
+        if not json_path.exists():
+            return 0
+        records = json.loads(json_path.read_text(encoding="utf-8"))
+        sent_at = json_path.stat().st_mtime
+        rows = [
+            (provider, str(order_id), sent_at)
+            for provider, ids in records.items()
+            for order_id in ids
+        ]
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sent (provider, order_id, sent_at) VALUES (?, ?, ?)", rows
+            )
+        json_path.replace(json_path.with_name(json_path.name + ".migrated"))
+        self._load_index()
+        return len(rows)
+
+    def close(self):
+        """WAL 내용을 본 파일에 반영하고 닫습니다. (기록 자체는 ack 등에서 이미 커밋됨)"""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.close()
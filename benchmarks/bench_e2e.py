@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+전체 흐름(조회 → 대기열 → 알림톡 발송) 처리량 벤치마크.
+
+benchmarks/mock_servers.py 대역 서버를 띄우고 `python -m autoalim run [--async]` 를 새 프로세스로 1회 실행해
+  - 처리량       : 알리고까지 도착한 수신번호 수 / 실행 시간 (같은 번호의 주문은 1건으로 합쳐짐, --repeat-rate)
+  - 지연 p50/p99 : 주문 공개 시점부터 알리고 수신까지
+  - 최대 RSS     : 자식 프로세스의 ru_maxrss (os.wait4, Windows 에서는 표시하지 않음)
+을 주문 수별로 보여줍니다. 실행마다 임시 폴더에서 빈 발송 기록/토큰 캐시로 시작합니다.
+
+    python benchmarks/bench_e2e.py                          # 1k, 10k, 100k
+    python benchmarks/bench_e2e.py --sizes 1000 --async --latency 0.05 --throttle-rate 0.02
+
+실제 API 의 속도 제한은 결과를 그 제한값으로 만들어 버리므로 기본값으로 RATE_LIMIT_* 를 --rate-limit 로 올려 둡니다.
+"""
+import argparse
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from mock_servers import MockMarket, MockServer, add_config_arguments, config_from_args  # noqa: E402
+from autoalim.region_filter import load_matcher  # noqa: E402
+
+
+def percentile(values, q):
+    """정렬된 list 의 q 분위수 (nearest-rank)"""
+    if not values:
+        return float("nan")
+    return values[min(len(values), max(1, math.ceil(q * len(values)))) - 1]
+
+
+def expected_deliveries(market):
+    """알리고까지 가야 하는 수신번호 수 (같은 번호의 여러 주문은 알림톡 1건으로 합쳐짐)"""
+    matcher = load_matcher()
+    naver = {o["content"]["order"]["ordererTel"] for o in market.naver
+             if not matcher.excluded(o["content"]["productOrder"]["shippingAddress"]["baseAddress"])}
+    coupang = {o["receiver"]["safeNumber"] for o in market.coupang if not matcher.excluded(o["receiver"]["addr1"])}
+    return len(naver) + len(coupang)
+
+
+def run_child(cmd, env, cwd, timeout):
+    """자식 프로세스를 실행하고 (종료 코드, 최대 RSS MB 또는 None) 을 돌려줍니다."""
+    with open(Path(cwd) / "log.txt", "wb") as log:
+        proc = subprocess.Popen(cmd, env=env, cwd=cwd, stdout=log, stderr=subprocess.STDOUT)
+        if not hasattr(os, "wait4"):
+            return proc.wait(timeout=timeout), None
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    # Linux 는 KB, macOS 는 바이트 단위
+    rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return proc.returncode, rss
+
+
+def bench(size, args):
+    market = MockMarket(size // 2, size - size // 2, seed=args.seed, repeat_rate=args.repeat_rate)
+    expected = expected_deliveries(market)
+    with MockServer(market, config_from_args(args)) as server, tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, **server.env(), "PYTHONIOENCODING": "utf-8", "PYTHONPATH": str(ROOT),
+               "SENT_DB_FILE": str(Path(tmp) / "sent.db")}
+        for family in ("NAVER", "COUPANG", "ALIGO"):
+            env.setdefault(f"RATE_LIMIT_{family}", str(args.rate_limit))
+            env.setdefault(f"RATE_LIMIT_{family}_BURST", str(max(2, int(args.rate_limit // 10))))
+
+        market.publish()
+        started = time.monotonic()
+        cmd = [sys.executable, "-m", "autoalim", "run"] + (["--async"] if args.use_async else [])
+        code, rss = run_child(cmd, env, tmp, args.timeout)
+        elapsed = time.monotonic() - started
+        if code != 0:
+            tail = (Path(tmp) / "log.txt").read_text(encoding="utf-8", errors="replace")[-2000:]
+            print(f"⚠️ {' '.join(cmd[1:])} 종료 코드 {code}\n{tail}")
+
+    latencies = market.latencies()
+    delivered = len(latencies)
+    return {
+        "orders": size,
+        "expected": expected,
+        "delivered": delivered,
+        "duplicates": market.duplicates,
+        "seconds": elapsed,
+        "orders_per_sec": delivered / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "rss_mb": rss,
+        "requests": dict(market.requests),
+        "response_kb": {k: round(v / 1024) for k, v in market.response_bytes.items() if k},
+        "injected": dict(market.injected),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="조회 → 발송 전체 흐름 처리량 벤치마크 (로컬 대역 서버 사용)")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="쉼표로 구분한 주문 수 목록")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="비동기 파이프라인(run --async)으로 실행")
+    parser.add_argument("--rate-limit", type=float, default=1000.0, help="RATE_LIMIT_* 기본값(초당 요청 수)")
+    parser.add_argument("--repeat-rate", type=float, default=0.0, help="같은 번호로 다시 주문한 비율 (0~1)")
+    parser.add_argument("--timeout", type=float, default=1800.0, help="Windows 에서 자식 프로세스 대기 한도(초)")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    print(f"{'주문':>8} {'발송/대상':>13} {'중복':>4} {'시간(s)':>8} {'건/s':>9} {'p50(s)':>7} {'p99(s)':>7} {'RSS(MB)':>8}")
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        r = bench(size, args)
+        rss = f"{r['rss_mb']:8.1f}" if r["rss_mb"] is not None else f"{'-':>8}"
+        print(f"{r['orders']:>8} {r['delivered']:>6}/{r['expected']:<6} {r['duplicates']:>4} {r['seconds']:8.2f} "
+              f"{r['orders_per_sec']:9.0f} {r['p50']:7.2f} {r['p99']:7.2f} {rss}")
+        print(f"{'':>8} 요청 {r['requests']} 주입 {r['injected']}")
+        print(f"{'':>8} 응답(KB) {r['response_kb']}")
+
+
+if __name__ == "__main__":
+    main()
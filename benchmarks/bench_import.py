@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+시작 비용(import 시간) 벤치마크.
+
+작업 스케줄러가 매분 새 프로세스를 띄우므로 import 시간이 그대로 매 실행의 고정 비용이 됩니다.
+하위 명령별로 실제 import 하는 모듈만 새 프로세스에서 불러와 걸린 시간(중앙값)을 비교하고,
+"예전 방식" 은 패키지 분리 전 main.py 처럼 bcrypt / pybase64 / python-dotenv / http.server(메트릭 서버)까지
+처음에 모두 불러오는 경우입니다.
+
+    python benchmarks/bench_import.py [반복 횟수, 기본 15]
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CASES = [
+    ("python 자체 (-c pass)",          "pass"),
+    ("예전 방식: 전부 즉시 import",     "import bcrypt, pybase64, dotenv, requests, http.server; import autoalim.pipeline"),
+    ("autoalim --help",                 "import autoalim.cli"),
+    ("run (토큰 캐시 있음)",             "import autoalim.cli, autoalim.pipeline"),
+    ("run --async",                     "import autoalim.cli, autoalim.async_pipeline"),
+    ("daemon",                          "import autoalim.cli, autoalim.daemon"),
+    ("list-coupang",                    "import autoalim.cli, autoalim.coupang"),
+]
+
+
+def wall_time(code, env):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], env=env, cwd=ROOT, check=True)
+    return time.perf_counter() - started
+
+
+def slowest_imports(code, env, top=10):
+    """-X importtime 의 누적 시간 기준 상위 모듈 [(모듈, ms), ...] (autoalim 모듈이 직접 부른 것까지)"""
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env, cwd=ROOT,
+                       capture_output=True, text=True, check=True)
+    rows = []
+    for line in r.stderr.splitlines():
+        m = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", line)
+        if m and 2 <= len(m.group(2)) <= 5:   # 최상위(-c 가 부른 모듈) 바로 아래 두 단계
+            rows.append((m.group(3), int(m.group(1)) / 1000))
+    return sorted(rows, key=lambda r: -r[1])[:top]
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    for _, code in CASES:        # 디스크 캐시 / .pyc 생성
+        wall_time(code, env)
+
+    base = None
+    print(f"{'경우':<28} {'중앙값(ms)':>10} {'최소(ms)':>9} {'python 제외(ms)':>15}")
+    for name, code in CASES:
+        times = [wall_time(code, env) * 1000 for _ in range(repeat)]
+        median = statistics.median(times)
+        if base is None:
+            base = median
+        print(f"{name:<28} {median:10.1f} {min(times):9.1f} {median - base:15.1f}")
+
+    print("\nrun 경로에서 오래 걸리는 import (누적 ms):")
+    for module, ms in slowest_imports(CASES[3][1], env):
+        print(f"  {module:<30} {ms:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
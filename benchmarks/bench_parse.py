@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+주문 조회 응답 파싱 벤치마크.
+
+실제 네이버 응답처럼 주문·상품·배송 필드를 모두 채운 페이지를 만들어
+  - 예전 방식  : 본문 → str 디코드 → json.loads 전체 트리 → 필드 꺼내기 (requests 의 r.json())
+  - projection : json.loads(bytes) 후 NAVER_ORDER 필드만 레코드로 (JSON_STREAM_THRESHOLD 이하 기본 경로)
+  - streaming  : ijson 으로 읽으면서 필드만 레코드로 (큰 응답 / Content-Length 없음)
+의 1페이지 파싱 시간(중앙값)과 파싱 중 최대 추가 메모리(tracemalloc)를 비교합니다.
+
+    python benchmarks/bench_parse.py [항목 수 ...]      # 기본 100 300 3000
+"""
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from autoalim.json_projection import _load_ijson  # noqa: E402
+from autoalim.naver import NAVER_ORDER  # noqa: E402
+
+
+def naver_item(i):
+    return {"productOrderId": str(i), "content": {
+        "order": {
+            "orderId": str(2024010100000000 + i), "ordererTel": f"010-1234-{i % 10000:04d}",
+            "ordererName": "홍길동", "ordererId": "abc***", "ordererNo": "123456",
+            "orderDate": "2024-01-01T10:00:00.000+09:00", "paymentDate": "2024-01-01T10:00:01.000+09:00",
+            "paymentMeans": "신용카드", "payLocationType": "MOBILE", "orderDiscountAmount": 0,
+            "generalPaymentAmount": 15000, "naverMileagePaymentAmount": 0, "chargeAmountPaymentAmount": 0,
+            "payLaterPaymentAmount": 0, "isDeliveryMemoParticularInput": "false",
+        },
+        "productOrder": {
+            "productOrderId": str(i), "productName": "국내산 햇사과 5kg 가정용 (중과)", "productOption": "크기: 중과 / 수량: 1",
+            "quantity": 1, "unitPrice": 12000, "totalPaymentAmount": 15000, "productOrderStatus": "PAYED",
+            "placeOrderStatus": "OK", "deliveryFeeAmount": 3000, "sellerProductCode": f"SKU-{i}",
+            "optionCode": "OPT-1", "commissionRatingType": "결제수수료", "paymentCommission": 300,
+            "saleCommission": 0, "expectedSettlementAmount": 14700, "inflowPath": "검색>네이버쇼핑",
+            "itemNo": "1", "mallId": "ncp_1", "productClass": "단일상품", "productDiscountAmount": 0,
+            "shippingDueDate": "2024-01-03T23:59:59.000+09:00", "claimStatus": None, "freeGift": None,
+            "shippingAddress": {
+                "addressType": "DOMESTIC", "baseAddress": f"서울특별시 강남구 테헤란로 {i % 500}",
+                "detailedAddress": "101동 1001호", "zipCode": "06234", "name": "홍길동",
+                "tel1": "010-1234-5678", "tel2": "", "isRoadNameAddress": True,
+            },
+        },
+        "delivery": None, "cancel": None, "return": None, "exchange": None,
+    }}
+
+
+def naver_page(n):
+    body = {"timestamp": "2024-01-01T10:00:00.000+09:00", "traceId": "bench",
+            "data": {"contents": [naver_item(i) for i in range(n)],
+                     "pagination": {"page": 1, "size": n, "hasNext": False, "totalPages": 1, "totalElements": n}}}
+    return json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+
+def legacy(body):
+    data = json.loads(body.decode("utf-8"))["data"]
+    return [(c["content"]["order"]["orderId"], c["content"]["order"]["ordererTel"],
+             c["content"]["productOrder"]["shippingAddress"]["baseAddress"]) for c in data["contents"]]
+
+
+def projected(body):
+    return NAVER_ORDER.from_bytes(body)[0]
+
+
+def streamed(body):
+    return NAVER_ORDER.from_stream(io.BytesIO(body))[0]
+
+
+def measure(fn, body, repeat):
+    fn(body)   # 첫 호출 비용(메모리 할당기 준비 등) 제외
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(body)
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    result = fn(body)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    assert len(result) == body.count(b'"productOrderId"') // 2
+    return statistics.median(times) * 1000, peak / (1024 * 1024)
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [100, 300, 3000]
+    cases = [("예전 방식 (r.json())", legacy), ("projection (json)", projected)]
+    if _load_ijson():
+        cases.append(("streaming (ijson)", streamed))
+    else:
+        print("ijson 이 설치되지 않아 streaming 은 건너뜁니다.")
+
+    print(f"{'항목 수':>7} {'본문(KB)':>9}  {'방식':<22} {'시간(ms)':>9} {'추가 메모리(MB)':>15}")
+    for n in sizes:
+        body = naver_page(n)
+        repeat = max(3, 3000 // n)
+        for name, fn in cases:
+            ms, peak = measure(fn, body, repeat)
+            print(f"{n:7d} {len(body) / 1024:9.0f}  {name:<22} {ms:9.2f} {peak:15.2f}")
+
+
+if __name__ == "__main__":
+    main()
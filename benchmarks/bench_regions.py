@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+제외 지역 판별 벤치마크: 예전 부분문자열 선형 탐색 vs region_filter.RegionMatcher
+
+    python benchmarks/bench_regions.py [주소 수, 기본 100000]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from autoalim.region_filter import PROVINCE_ALIASES, load_matcher  # noqa: E402
+
+
+# main.py 에 있던 예전 목록 (표기마다 따로 나열)
+LEGACY_EXCLUDE_REGIONS = [
+    "강원도", "강원특별자치도",
+    "전북", "전북특별자치도",
+    "충남 보령시", "충청남도 보령시",
+    "충남 논산시", "충청남도 논산시",
+    "충북 보은군", "충청북도 보은군",
+    "충북 음성군", "충청북도 음성군",
+    "충북 진천군", "충청북도 진천군",
+    "경기도 이천시", "경기 이천시",
+    "전남 목포시", "전라남도 목포시",
+    "전남 무안군", "전라남도 무안군",
+    "제주도", "제주"
+]
+
+CITIES = {
+    "서울": ["강남구", "마포구", "중구"],
+    "부산": ["해운대구", "수영구"],
+    "경기": ["수원시", "이천시", "성남시", "광주시"],
+    "강원": ["춘천시", "원주시"],
+    "충북": ["청주시", "보은군", "음성군", "진천군"],
+    "충남": ["천안시", "보령시", "논산시"],
+    "전북": ["전주시", "군산시"],
+    "전남": ["목포시", "무안군", "여수시"],
+    "경북": ["포항시", "경주시"],
+    "경남": ["창원시", "김해시"],
+    "제주": ["제주시", "서귀포시"],
+    "세종": ["한누리대로"],
+}
+
+
+def make_addresses(n, seed=1):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        canon = rng.choice(list(CITIES))
+        province = rng.choice((canon, *PROVINCE_ALIASES[canon]))
+        city = rng.choice(CITIES[canon])
+        out.append(f"{province} {city} 테스트로{rng.randint(1, 999)}번길 {rng.randint(1, 99)}")
+    return out
+
+
+def legacy_excluded(address):
+    return any(ex in address for ex in LEGACY_EXCLUDE_REGIONS)
+
+
+def bench(name, fn, addresses):
+    started = time.perf_counter()
+    hits = sum(1 for a in addresses if fn(a))
+    elapsed = time.perf_counter() - started
+    print(f"{name:<10} {elapsed * 1000:8.1f} ms  {elapsed / len(addresses) * 1e9:7.0f} ns/주소  제외 {hits}건")
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    addresses = make_addresses(n)
+
+    started = time.perf_counter()
+    matcher = load_matcher()
+    print(f"규칙 컴파일 {(time.perf_counter() - started) * 1000:.2f} ms ({len(matcher.rules)}개 규칙), 주소 {n}건")
+
+    legacy = bench("legacy", legacy_excluded, addresses)
+    compiled = bench("compiled", matcher.excluded, addresses)
+    print(f"속도 {legacy / compiled:.1f}배")
+
+    # 예전 목록은 "강원", "전라북도" 처럼 나열하지 않은 표기를 놓치므로 결과가 다른 주소를 보여줍니다.
+    diff = [a for a in addresses if legacy_excluded(a) != matcher.excluded(a)]
+    print(f"판별이 다른 주소 {len(diff)}건", *sorted(set(" ".join(a.split()[:2]) for a in diff))[:10], sep="\n  ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+네이버 / 쿠팡 / 알리고 로컬 대역 서버.
+
+실제 API 대신 `python -m autoalim run / daemon` 을 오프라인으로 돌려볼 수 있도록
+아래 엔드포인트를 한 포트에서 흉내 냅니다.
+  - 네이버  POST /external/v1/oauth2/token                       (bcrypt 서명 확인)
+            GET  /external/v1/pay-order/seller/product-orders    (page / pageSize, Bearer 토큰 확인)
+            GET  .../product-orders/last-changed-statuses        (limitCount, more.moreSequence)
+            POST .../product-orders/query                        (productOrderIds, 최대 300개)
+  - 쿠팡    GET  /v2/providers/openapi/apis/api/v4/vendors/<id>/ordersheets  (nextToken, HMAC 서명 확인)
+  - 알리고  POST /akv10/alimtalk/send/, /akv10/history/detail/
+
+응답 지연(latency + 0~jitter 초), 5xx 비율(error_rate), 429 비율(throttle_rate, Retry-After)을 바꿀 수 있고,
+알리고가 받은 수신번호마다 첫 수신 시각을 기록해 주문 공개(publish) 시점부터의 지연을 계산합니다.
+
+단독 실행:
+    python benchmarks/mock_servers.py --orders 1000 --port 8099
+출력되는 환경변수를 설정한 뒤 `python -m autoalim run` 을 실행하면 됩니다.
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, parse_qsl, urlsplit
+
+import bcrypt
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_regions import make_addresses  # noqa: E402
+
+
+MOCK_NAVER_CLIENT_ID     = "mock-naver-client"
+MOCK_NAVER_CLIENT_SECRET = "$2b$04$D5fOp24ClmhPqqQCgVg6yO"   # bcrypt salt 형식이어야 서명이 만들어집니다
+MOCK_NAVER_ACCOUNT_ID    = "mock-naver-account"
+MOCK_COUPANG_ACCESS_KEY  = "mock-coupang-access"
+MOCK_COUPANG_SECRET_KEY  = "mock-coupang-secret"
+MOCK_COUPANG_VENDOR_ID   = "A00000000"
+MOCK_COUPANG_STATUS      = "INSTRUCT"
+MOCK_ALIGO_API_KEY       = "mock-aligo-key"
+
+NAVER_ORDERS_PATH  = "/external/v1/pay-order/seller/product-orders"
+NAVER_CHANGES_PATH = NAVER_ORDERS_PATH + "/last-changed-statuses"
+NAVER_QUERY_PATH   = NAVER_ORDERS_PATH + "/query"
+COUPANG_PATH = re.compile(r"^/v2/providers/openapi/apis/api/v4/vendors/([^/]+)/ordersheets$")
+COUPANG_AUTH = re.compile(r"(\S+?)=([^,\s]+)")
+
+
+class MockConfig:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, retry_after=1, seed=1,
+                 undelivered_rate=0.0, fallback_rate=0.0, down=()):
+        """
+        undelivered_rate / fallback_rate: 알리고가 접수한 뒤 이력 조회에서 전달 실패 / 대체 문자로 나오는 비율
+        down: 장애 중인 API 묶음 ("naver", "coupang", "aligo") — 지연 후 항상 503
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        self.undelivered_rate = undelivered_rate
+        self.fallback_rate = fallback_rate
+        self.down = set(down)
+
+
+class MockMarket:
+    """가짜 주문 데이터와 알리고 수신 기록"""
+
+    def __init__(self, naver_orders, coupang_orders, seed=1, repeat_rate=0.0):
+        """repeat_rate: 앞선 주문과 같은 번호로 다시 주문한 비율 (같은 고객의 여러 건 주문, 0~1)"""
+        addresses = make_addresses(naver_orders + coupang_orders, seed=seed)
+        rng = random.Random(seed)
+
+        def phones(count, fmt):
+            out = []
+            for n in range(count):
+                out.append(rng.choice(out) if out and rng.random() < repeat_rate else fmt.format(n))
+            return out
+
+        naver_phones = phones(naver_orders, "0101{:07d}")
+        coupang_phones = phones(coupang_orders, "0502{:07d}")
+        self.naver = [
+            {
+                "productOrderId": f"P{n:09d}",
+                "content": {
+                    "order": {"orderId": f"N{n:09d}", "ordererTel": naver_phones[n],
+                              "paymentDate": "2024-05-03T09:30:00.000+09:00"},
+                    "productOrder": {"productOrderId": f"P{n:09d}", "productOrderStatus": "PAYED",
+                                     "productName": f"에어컨 분해세척 {n % 3 + 1}대",
+                                     "shippingAddress": {"baseAddress": addresses[n]}},
+                },
+            }
+            for n in range(naver_orders)
+        ]
+        self.naver_by_product = {order["productOrderId"]: order for order in self.naver}
+        self.coupang = [
+            {
+                "orderId": 900000000 + n,
+                "status": MOCK_COUPANG_STATUS,
+                "paidAt": "2024-05-03T09:30:00",
+                "receiver": {"safeNumber": coupang_phones[n], "addr1": addresses[naver_orders + n]},
+                "orderItems": [{"vendorItemName": f"세탁기 분해세척 {n % 2 + 1}대"}],
+            }
+            for n in range(coupang_orders)
+        ]
+        self.published_at = None
+        self.received = {}      # 수신번호 → 첫 수신 시각 (monotonic)
+        self.duplicates = 0
+        self.requests = {}      # 엔드포인트 → 요청 수
+        self.response_bytes = {}   # 엔드포인트 → 응답 본문 바이트 합계
+        self.injected = {"5xx": 0, "429": 0}
+        self._mids = {}
+        self._mid_seq = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def publish(self):
+        """지금부터 주문이 조회된 것으로 보고 지연 측정을 시작합니다."""
+        with self._lock:
+            self.published_at = time.monotonic()
+            self.received.clear()
+            self.duplicates = 0
+
+    def count(self, endpoint):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def add_bytes(self, endpoint, n):
+        with self._lock:
+            self.response_bytes[endpoint] = self.response_bytes.get(endpoint, 0) + n
+
+    def record_send(self, phones):
+        now = time.monotonic()
+        with self._lock:
+            mid = next(self._mid_seq)
+            self._mids[mid] = list(phones)
+            for phone in phones:
+                if phone in self.received:
+                    self.duplicates += 1
+                else:
+                    self.received[phone] = now
+        return mid
+
+    def history(self, mid):
+        with self._lock:
+            return self._mids.get(mid)
+
+    def latencies(self):
+        """주문 공개 시점부터 알리고 수신까지 걸린 초 (정렬된 list)"""
+        with self._lock:
+            start = self.published_at or 0.0
+            return sorted(t - start for t in self.received.values())
+
+
+def coupang_signature(secret, signed_date, method, path, query):
+    message = signed_date + method + path + query
+    return hmac.new(secret.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def naver_signature_ok(client_id, timestamp, sign):
+    try:
+        hashed = base64.standard_b64decode(sign)
+    except ValueError:
+        return False
+    expected = bcrypt.hashpw(f"{client_id}_{timestamp}".encode("utf-8"), MOCK_NAVER_CLIENT_SECRET.encode("utf-8"))
+    return hmac.compare_digest(hashed, expected)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"    # keep-alive 유지 (커넥션 재사용 효과까지 측정)
+    server_version = "MockAPI/1.0"
+
+    # 조용히
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def market(self):
+        return self.server.market
+
+    @property
+    def config(self):
+        return self.server.config
+
+    # ── 공통 ───────────────────────────────────────────────
+    def _reply(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.market.add_bytes(getattr(self, "_endpoint", None), len(data))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_form(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length).decode("utf-8") if length else ""
+        return dict(parse_qsl(raw, keep_blank_values=True))
+
+    def _inject(self, endpoint):
+        """지연을 주고, 설정한 비율로 5xx / 429 를 돌려줍니다. 응답했으면 True."""
+        self._endpoint = endpoint
+        self.market.count(endpoint)
+        cfg = self.config
+        delay = cfg.latency + (random.uniform(0, cfg.jitter) if cfg.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        if endpoint.split("_", 1)[0] in cfg.down:
+            self.market.injected["5xx"] += 1
+            self._reply(503, {"code": "SERVICE_UNAVAILABLE", "message": "mock outage"})
+            return True
+        roll = random.random()
+        if roll < cfg.throttle_rate:
+            self.market.injected["429"] += 1
+            self._reply(429, {"code": "TOO_MANY_REQUESTS", "message": "mock throttle"},
+                        {"Retry-After": str(cfg.retry_after)})
+            return True
+        if roll < cfg.throttle_rate + cfg.error_rate:
+            self.market.injected["5xx"] += 1
+            self._reply(503, {"code": "SERVICE_UNAVAILABLE", "message": "mock error"})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == NAVER_ORDERS_PATH:
+            return self._naver_orders(url)
+        if url.path == NAVER_CHANGES_PATH:
+            return self._naver_changes(url)
+        match = COUPANG_PATH.match(url.path)
+        if match:
+            return self._coupang_ordersheets(url, match.group(1))
+        self._reply(404, {"message": f"unknown path {url.path}"})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if path == NAVER_QUERY_PATH:
+            return self._naver_query()
+        form = self._read_form()
+        if path == "/external/v1/oauth2/token":
+            return self._naver_token(form)
+        if path == "/akv10/alimtalk/send/":
+            return self._aligo_send(form)
+        if path == "/akv10/history/detail/":
+            return self._aligo_history(form)
+        self._reply(404, {"message": f"unknown path {path}"})
+
+    # ── 네이버 ─────────────────────────────────────────────
+    def _naver_token(self, form):
+        if self._inject("naver_token"):
+            return
+        if form.get("client_id") != MOCK_NAVER_CLIENT_ID or not naver_signature_ok(
+                form.get("client_id", ""), form.get("timestamp", ""), form.get("client_secret_sign", "")):
+            return self._reply(401, {"code": "GW.AUTHN", "message": "invalid client_secret_sign"})
+        self._reply(200, {"access_token": self.server.naver_token, "expires_in": 10800, "token_type": "Bearer"})
+
+    def _naver_orders(self, url):
+        if self._inject("naver_orders") or not self._naver_authorized():
+            return
+        query = parse_qs(url.query)
+        page = int(query.get("page", ["1"])[0])
+        size = int(query.get("pageSize", ["300"])[0])
+        orders = self.market.naver
+        total_pages = max(1, -(-len(orders) // size))
+        contents = orders[(page - 1) * size:page * size]
+        self._reply(200, {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "data": {
+                "contents": contents,
+                "pagination": {"page": page, "size": size, "totalElements": len(orders),
+                               "totalPages": total_pages, "hasNext": page < total_pages},
+            },
+        })
+
+    def _naver_authorized(self):
+        if self.headers.get("Authorization") != f"Bearer {self.server.naver_token}":
+            self._reply(401, {"code": "GW.AUTHN", "message": "invalid token"})
+            return False
+        return True
+
+    def _naver_changes(self, url):
+        if self._inject("naver_changes") or not self._naver_authorized():
+            return
+        query = parse_qs(url.query)
+        limit = int(query.get("limitCount", ["300"])[0])
+        start = int(query.get("moreSequence", ["0"])[0])
+        orders = self.market.naver[start:start + limit]
+        changed_at = query.get("lastChangedFrom", [""])[0]
+        data = {
+            "lastChangeStatuses": [
+                {"productOrderId": o["productOrderId"], "orderId": o["content"]["order"]["orderId"],
+                 "lastChangedType": "PAYED", "productOrderStatus": "PAYED", "lastChangedDate": changed_at}
+                for o in orders
+            ],
+            "count": len(orders),
+        }
+        if start + limit < len(self.market.naver):
+            data["more"] = {"moreFrom": changed_at, "moreSequence": str(start + limit)}
+        self._reply(200, {"timestamp": datetime.now(timezone.utc).isoformat(), "data": data})
+
+    def _naver_query(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self._inject("naver_query") or not self._naver_authorized():
+            return
+        ids = body.get("productOrderIds") or []
+        if len(ids) > 300:
+            return self._reply(400, {"code": "104105", "message": "productOrderIds 는 최대 300개"})
+        found = [self.market.naver_by_product[i]["content"] for i in ids if i in self.market.naver_by_product]
+        self._reply(200, {"timestamp": datetime.now(timezone.utc).isoformat(), "data": found})
+
+    # ── 쿠팡 ───────────────────────────────────────────────
+    def _coupang_ordersheets(self, url, vendor_id):
+        if self._inject("coupang_orders"):
+            return
+        auth = dict(COUPANG_AUTH.findall(self.headers.get("Authorization", "")))
+        expected = coupang_signature(MOCK_COUPANG_SECRET_KEY, auth.get("signed-date", ""), "GET", url.path, url.query)
+        if (auth.get("access-key") != MOCK_COUPANG_ACCESS_KEY or vendor_id != MOCK_COUPANG_VENDOR_ID
+                or not hmac.compare_digest(auth.get("signature", ""), expected)):
+            return self._reply(401, {"code": "ERROR", "message": "Invalid signature."})
+        query = parse_qs(url.query)
+        if query.get("status", [""])[0] != MOCK_COUPANG_STATUS:
+            return self._reply(200, {"code": 200, "message": "OK", "data": [], "nextToken": ""})
+        offset = int(query.get("nextToken", ["0"])[0] or 0)
+        size = int(query.get("maxPerPage", ["50"])[0])
+        orders = self.market.coupang
+        data = orders[offset:offset + size]
+        next_token = str(offset + size) if offset + size < len(orders) else ""
+        self._reply(200, {"code": 200, "message": "OK", "data": data, "nextToken": next_token})
+
+    # ── 알리고 ─────────────────────────────────────────────
+    def _aligo_send(self, form):
+        if self._inject("aligo_send"):
+            return
+        if form.get("apikey") != MOCK_ALIGO_API_KEY:
+            return self._reply(200, {"code": -99, "message": "인증오류입니다."})
+        phones = [v for k, v in form.items() if k.startswith("receiver_")]
+        if not phones:
+            return self._reply(200, {"code": -101, "message": "수신자가 없습니다."})
+        mid = self.market.record_send(phones)
+        self._reply(200, {
+            "code": 0, "message": "성공적으로 전송요청 하였습니다.",
+            "info": {"type": "AT", "mid": mid, "current": "0", "unit": 0, "total": 0,
+                     "scnt": len(phones), "fcnt": 0},
+        })
+
+    def _aligo_history(self, form):
+        if self._inject("aligo_history"):
+            return
+        phones = self.market.history(int(form.get("mid") or 0))
+        if phones is None:
+            return self._reply(200, {"code": -1, "message": "해당 mid 가 없습니다."})
+        self._reply(200, {"code": 0, "message": "정상적으로 조회되었습니다.",
+                          "list": [self._history_item(form.get("mid"), p) for p in phones]})
+
+    def _history_item(self, mid, phone):
+        # 같은 (mid, 번호) 는 항상 같은 결과
+        roll = random.Random(f"{self.config.seed}:{mid}:{phone}").random()
+        if roll < self.config.undelivered_rate:
+            return {"phone": phone, "type": "AT", "rslt": "U", "rslt_message": "메시지 전송 실패"}
+        if roll < self.config.undelivered_rate + self.config.fallback_rate:
+            return {"phone": phone, "type": "SM", "rslt": "0", "rslt_message": "대체 문자 전송"}
+        return {"phone": phone, "type": "AT", "rslt": "0", "rslt_message": "성공"}
+
+
+class MockServer:
+    """
+    백그라운드 스레드에서 도는 대역 서버.
+
+        with MockServer(MockMarket(500, 500), MockConfig(latency=0.02)) as server:
+            env = server.env()
+    """
+
+    def __init__(self, market, config=None, host="127.0.0.1", port=0):
+        self.market = market
+        self.httpd = ThreadingHTTPServer((host, port), MockHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.market = market
+        self.httpd.config = config or MockConfig()
+        self.httpd.naver_token = "mock-access-token"
+        random.seed(self.httpd.config.seed)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """autoalim 을 이 서버로 향하게 하는 환경변수"""
+        return {
+            "NAVER_API_BASE": self.base_url,
+            "COUPANG_API_BASE": self.base_url,
+            "ALIGO_API_BASE": self.base_url,
+            "NAVER_CLIENT_ID": MOCK_NAVER_CLIENT_ID,
+            "NAVER_CLIENT_SECRET": MOCK_NAVER_CLIENT_SECRET,
+            "NAVER_ACCOUNT_ID": MOCK_NAVER_ACCOUNT_ID,
+            "COUPANG_ACCESS_KEY": MOCK_COUPANG_ACCESS_KEY,
+            "COUPANG_SECRET_KEY": MOCK_COUPANG_SECRET_KEY,
+            "COUPANG_VENDOR_ID": MOCK_COUPANG_VENDOR_ID,
+            "COUPANG_STATUSES": MOCK_COUPANG_STATUS,
+            "ALIGO_API_KEY": MOCK_ALIGO_API_KEY,
+            "ALIGO_USER_ID": "mock-user",
+            "ALIGO_SENDER_KEY": "mock-sender-key",
+            "ALIGO_TEMPLATE_CODE": "MOCK_TPL",
+            "ALIGO_SENDER_PHONE": "15660000",
+            "ALIGO_MESSAGE": "접수 완료 안내 (mock)",
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def add_config_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0.0, help="응답마다 기본 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="기본 지연에 더할 0~N초 난수")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 을 돌려줄 비율 (0~1)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429 를 돌려줄 비율 (0~1)")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 응답의 Retry-After(초)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--undelivered-rate", type=float, default=0.0, help="이력 조회에서 전달 실패로 나올 비율 (0~1)")
+    parser.add_argument("--fallback-rate", type=float, default=0.0, help="이력 조회에서 대체 문자로 나올 비율 (0~1)")
+    parser.add_argument("--down", default="", help="장애 중으로 둘 API 묶음 (쉼표로 구분, 예: naver)")
+
+
+def config_from_args(args):
+    return MockConfig(args.latency, args.jitter, args.error_rate, args.throttle_rate, args.retry_after, args.seed,
+                      args.undelivered_rate, args.fallback_rate, [f for f in args.down.split(",") if f])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="네이버/쿠팡/알리고 로컬 대역 서버")
+    parser.add_argument("--orders", type=int, default=1000, help="전체 주문 수 (네이버/쿠팡 반씩)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--repeat-rate", type=float, default=0.0, help="같은 번호로 다시 주문한 비율 (0~1)")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    market = MockMarket(args.orders // 2, args.orders - args.orders // 2, seed=args.seed, repeat_rate=args.repeat_rate)
+    server = MockServer(market, config_from_args(args), args.host, args.port)
+    for k, v in server.env().items():
+        print(f"{k}={v}")
+    print(f"# {server.base_url} 에서 대기 중 (Ctrl+C 로 종료)", file=sys.stderr)
+    market.publish()
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        lat = market.latencies()
+        print(f"# 알리고 수신 {len(lat)}건, 중복 {market.duplicates}건, 요청 {market.requests}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""예전 실행 방법(python daemon.py) 호환용. `python -m autoalim daemon` 과 같습니다."""
+from autoalim.cli import main
+
+if __name__ == "__main__":
+    main(["daemon"])
@@ -0,0 +1,11 @@
+@echo off
+chcp 65001 > nul
+cd /d C:\autokakao
+
+:: 가상환경 활성화
+call venv\Scripts\activate.bat
+
+:: 상주 모드: 한 번만 실행해 두면 POLL_INTERVAL_SECONDS 마다 조회/발송
+:: 실행 기록은 autoalim.jsonl (크기별로 돌려 씀), log.txt 에는 예기치 못한 오류만 남습니다.
+set LOG_CONSOLE=0
+python -m autoalim daemon >> log.txt 2>&1
\ No newline at end of file
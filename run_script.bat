@@ -5,5 +5,6 @@ cd /d C:\autokakao
 :: 가상환경 활성화
 call venv\Scripts\activate.bat
 
-:: 로그 파일에 UTF-8로 출력 저장
-python main.py >> log.txt 2>&1
\ No newline at end of file
+:: 실행 기록은 autoalim.jsonl (크기별로 돌려 씀), log.txt 에는 예기치 못한 오류만 남습니다.
+set LOG_CONSOLE=0
+python -m autoalim run >> log.txt 2>&1
\ No newline at end of file
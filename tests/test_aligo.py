@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""send_chunk: 묶음이 거절된 뒤 수신자별 재시도 결과가 응답에 반영되는지"""
+import pytest
+
+from autoalim import aligo, reconcile
+
+CHUNK = [(("naver", "1"), "010-1111-1111"), (("naver", "2"), "010-2222-2222"), (("coupang", "3"), "010-3333-3333")]
+
+
+@pytest.fixture
+def aligo_api(monkeypatch):
+    """receiver_1 번호 → 응답. 여러 명을 한 번에 보내면 묶음 거절(-99)."""
+    answers = {}
+    calls = []
+
+    def post(data):
+        receivers = [v for k, v in data.items() if k.startswith("receiver_")]
+        calls.append(receivers)
+        if len(receivers) > 1:
+            return {"code": -99, "message": "수신번호 오류"}
+        return answers[receivers[0]]
+
+    monkeypatch.setattr(aligo, "_post_alimtalk", post)
+    return answers, calls
+
+
+def _accepted(mid):
+    return {"code": 0, "message": "성공적으로 전송요청 하였습니다.",
+            "info": {"type": "AT", "mid": mid, "scnt": 1, "fcnt": 0}}
+
+
+def test_retry_success_replaces_batch_rejection(aligo_api):
+    answers, calls = aligo_api
+    answers.update({"010-1111-1111": _accepted(11), "010-2222-2222": _accepted(22), "010-3333-3333": _accepted(33)})
+
+    ok, failed, res, mids = aligo.send_chunk(CHUNK, {})
+
+    assert len(calls) == 4
+    assert failed == [] and len(ok) == 3
+    assert res["code"] == 0
+    assert aligo.message_id(res) == "11"
+    assert res["info"]["mids"] == ["11", "22", "33"] and res["info"]["scnt"] == 3
+    assert res["batch"] == {"code": -99, "message": "수신번호 오류"}
+    assert mids == {("naver", "1"): "11", ("naver", "2"): "22", ("coupang", "3"): "33"}
+
+
+def test_partial_retry_reports_remaining_failure(aligo_api):
+    answers, _ = aligo_api
+    answers.update({"010-1111-1111": _accepted(11), "010-2222-2222": {"code": -101, "message": "잘못된 번호"},
+                    "010-3333-3333": _accepted(33)})
+
+    ok, failed, res, mids = aligo.send_chunk(CHUNK, {})
+
+    assert failed == [("naver", "2")]
+    assert (res["code"], res["message"]) == (-101, "잘못된 번호")
+    assert res["info"]["mids"] == ["11", "33"] and res["info"]["fcnt"] == 1
+    assert ("naver", "2") not in mids
+
+
+def test_accepted_batch_is_returned_as_is(aligo_api):
+    answers, calls = aligo_api
+    answers["010-1111-1111"] = _accepted(7)
+
+    ok, failed, res, _ = aligo.send_chunk(CHUNK[:1], {})
+
+    assert res is answers["010-1111-1111"] and ok == [("naver", "1")] and len(calls) == 1
+
+
+def _partly_failed(mid):
+    return {"code": 0, "message": "성공적으로 전송요청 하였습니다.",
+            "info": {"type": "AT", "mid": mid, "scnt": 1, "fcnt": 1}}
+
+
+def test_partial_failure_left_to_reconcile(aligo_api, monkeypatch):
+    answers, _ = aligo_api
+    answers["010-1111-1111"] = _partly_failed(11)
+    history = []
+    monkeypatch.setattr(aligo, "_aligo_failed_phones", lambda mid: history.append(mid) or set())
+    monkeypatch.setattr(reconcile, "RECONCILE_ENABLED", True)
+
+    ok, failed, res, mids = aligo.send_chunk(CHUNK[:1], {})
+
+    assert history == []                      # 발송 경로에서 이력 상세를 조회하지 않음
+    assert ok == [("naver", "1")] and failed == []
+    assert mids == {("naver", "1"): "11"}     # accepted 로 기록 → reconcile 이 확인
+
+
+def test_partial_failure_checked_inline_without_reconcile(aligo_api, monkeypatch):
+    answers, _ = aligo_api
+    answers["010-1111-1111"] = _partly_failed(11)
+    monkeypatch.setattr(aligo, "_aligo_failed_phones", lambda mid: {"01011111111"})
+    monkeypatch.setattr(reconcile, "RECONCILE_ENABLED", False)
+
+    ok, failed, _, _ = aligo.send_chunk(CHUNK[:1], {})
+
+    assert ok == [] and failed == [("naver", "1")]
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""비동기 _request: 동기 모드(JitterRetry)와 같은 재시도 규칙"""
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiohttp
+import pytest
+
+from autoalim import async_pipeline, circuit_breaker, http_client
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """statuses 에 넣은 상태를 차례로(다 쓰면 200) 돌려주는 로컬 서버. 받은 (메서드, 경로) 를 남깁니다."""
+    statuses, hits = [], []
+
+    class Handler(BaseHTTPRequestHandler):
+        def _answer(self):
+            hits.append((self.command, self.path))
+            length = int(self.headers.get("Content-Length") or 0)
+            self.rfile.read(length)
+            status = statuses.pop(0) if statuses else 200
+            body = b'{"ok": true}'
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = _answer
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(http_client, "GET_RETRIES", 3)
+    monkeypatch.setattr(http_client, "BACKOFF", 0)
+    monkeypatch.setattr(http_client, "BACKOFF_JITTER", 0)
+    monkeypatch.setattr(circuit_breaker, "CIRCUIT_ENABLED", True)
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/orders", statuses, hits
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _call(method, url, **kwargs):
+    async def go():
+        async with aiohttp.ClientSession() as session:
+            return await async_pipeline._request(session, method, "probe_orders", url, **kwargs)
+    return asyncio.run(go())
+
+
+def test_get_retries_transient_5xx(api):
+    url, statuses, hits = api
+    statuses += [503, 502]
+
+    status, body = _call("GET", url)
+
+    assert status == 200 and body == '{"ok": true}'
+    assert len(hits) == 3
+    assert circuit_breaker.breaker("probe").snapshot()["consecutive_failures"] == 0
+
+
+def test_get_gives_up_after_get_retries(api):
+    url, statuses, hits = api
+    statuses += [503] * 10
+
+    status, _ = _call("GET", url)
+
+    assert status == 503
+    assert len(hits) == 4   # 첫 요청 + 재시도 3번 (동기 모드와 같음)
+    assert circuit_breaker.breaker("probe").snapshot()["consecutive_failures"] == 4
+
+
+def test_breaker_opening_stops_get_retries(api):
+    url, statuses, hits = api
+    statuses += [503] * 10
+    br = circuit_breaker.breaker("probe")
+    for _ in range(br.failures - 2):
+        br.record(False)
+
+    status, _ = _call("GET", url)
+
+    assert status == 503
+    assert len(hits) == 2
+    assert br.state == circuit_breaker.OPEN
+
+
+def test_post_5xx_is_not_resent(api):
+    url, statuses, hits = api
+    statuses += [503]
+
+    status, _ = _call("POST", url, data={"a": "1"})
+
+    assert status == 503
+    assert hits == [("POST", "/orders")]
+
+
+def test_post_retried_when_connection_fails(api):
+    with socket.socket() as s:     # 아무도 듣지 않는 포트
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    br = circuit_breaker.breaker("probe")
+
+    with pytest.raises(aiohttp.ClientConnectorError):
+        _call("POST", f"http://127.0.0.1:{port}/send", data={"a": "1"})
+
+    assert br.snapshot()["consecutive_failures"] == 4
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""backfill: 24시간 구간 나누기와 끝난 구간 건너뛰기"""
+from datetime import datetime, timedelta
+
+from autoalim.accounts import Account
+from autoalim.backfill import plan, split_windows
+from autoalim.config import KST
+from autoalim.sent_store import SentStore
+
+DAY = timedelta(hours=24)
+START = datetime(2024, 5, 1, 9, 30, 45, 123, tzinfo=KST)
+
+
+def test_split_on_exact_multiple():
+    start = START.replace(second=0, microsecond=0)
+    windows = split_windows(START, start + 2 * DAY, DAY)
+    assert windows == [(start, start + DAY), (start + DAY, start + 2 * DAY)]
+
+
+def test_last_window_is_cut_at_end():
+    start = START.replace(second=0, microsecond=0)
+    end = start + DAY + timedelta(minutes=1)
+    assert split_windows(START, end, DAY) == [(start, start + DAY), (start + DAY, end)]
+
+
+def test_start_seconds_are_dropped():
+    # 쿠팡 조회는 분 단위라 시작을 분으로 내리므로, 끝이 초까지 있으면 마지막 짧은 구간이 생김
+    start = START.replace(second=0, microsecond=0)
+    windows = split_windows(START, START + DAY, DAY)
+    assert windows == [(start, start + DAY), (start + DAY, START + DAY)]
+
+
+def test_empty_or_inverted_range():
+    start = START.replace(second=0, microsecond=0)
+    assert split_windows(START, start, DAY) == []
+    assert split_windows(START, start - DAY, DAY) == []
+
+
+def test_later_end_keeps_earlier_windows():
+    # 같은 시작 시각으로 다시 실행하면 끝이 달라도 앞 구간이 같아 끝난 구간을 알아볼 수 있음
+    short = split_windows(START, START + DAY + timedelta(hours=3), DAY)
+    longer = split_windows(START, START + 3 * DAY, DAY)
+    assert longer[:1] == short[:1]
+
+
+def test_plan_skips_finished_windows(tmp_path):
+    sent = SentStore(tmp_path / "sent.db")
+    account = Account("default", naver={"client_id": "x"}, coupang={"access_key": "y"})
+    end = START.replace(second=0, microsecond=0) + 2 * DAY
+    try:
+        first, _ = split_windows(START, end, DAY)
+        sent.mark_backfill_done("naver", first[0].timestamp(), first[1].timestamp(), 3)
+
+        windows, jobs = plan(sent, [account], None, START, end)
+        assert windows == 2
+        assert sorted((p, w[0]) for _, p, w in jobs) == sorted(
+            [("naver", first[1]), ("coupang", first[0]), ("coupang", first[1])])
+
+        _, jobs = plan(sent, [account], ["naver"], START, end, force=True)
+        assert [(p, w) for _, p, w in jobs] == [("naver", w) for w in split_windows(START, end, DAY)]
+    finally:
+        sent.close()
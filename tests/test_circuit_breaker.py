@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""회로 차단기: urllib3 재시도 1번마다 실패를 세는지, 1회 실행끼리 상태를 이어받는지"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from autoalim import circuit_breaker, http_client
+from autoalim.sent_store import SentStore
+
+
+@pytest.fixture
+def breakers(monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "CIRCUIT_ENABLED", True)
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    return circuit_breaker
+
+
+@pytest.fixture
+def failing_api(monkeypatch, breakers):
+    """항상 503 을 돌려주는 로컬 서버. 받은 요청 수를 셉니다."""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(http_client, "GET_RETRIES", 3)
+    monkeypatch.setattr(http_client, "BACKOFF", 0)
+    monkeypatch.setattr(http_client, "BACKOFF_JITTER", 0)
+    monkeypatch.setattr(http_client, "_sessions", {})
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/orders", hits
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_each_retry_attempt_counts_as_failure(failing_api):
+    url, hits = failing_api
+    resp = http_client.get("probe_orders", url)
+
+    assert resp.status_code == 503
+    assert len(hits) == 4   # 첫 요청 + 재시도 3번
+    br = circuit_breaker.breaker("probe")
+    assert br.snapshot()["consecutive_failures"] == 4
+    assert br.state == circuit_breaker.CLOSED
+
+
+def test_breaker_opening_mid_retry_stops_sending(failing_api):
+    url, hits = failing_api
+    http_client.get("probe_orders", url)
+    resp = http_client.get("probe_orders", url)
+
+    assert resp.status_code == 503
+    assert len(hits) == 5   # 다섯 번째 실패에서 열림 → 남은 재시도는 보내지 않음
+    br = circuit_breaker.breaker("probe")
+    assert br.state == circuit_breaker.OPEN
+    assert br.snapshot()["consecutive_failures"] == 5
+    with pytest.raises(http_client.CircuitOpenError):
+        http_client.get("probe_orders", url)
+    assert len(hits) == 5
+
+
+def test_state_survives_next_run(tmp_path, monkeypatch, breakers):
+    path = tmp_path / "sent.db"
+    naver, aligo = breakers.breaker("naver"), breakers.breaker("aligo")
+    for _ in range(naver.failures):
+        naver.record(False)
+    for _ in range(2):
+        aligo.record(False)
+    store = SentStore(path)
+    store.save_circuits(breakers.export())
+    store.close()
+
+    monkeypatch.setattr(breakers, "_breakers", {})   # 다음 1회 실행 (새 프로세스)
+    store = SentStore(path)
+    try:
+        breakers.restore(store.load_circuits())
+    finally:
+        store.close()
+
+    assert breakers.breaker("naver").state == circuit_breaker.OPEN
+    assert not breakers.breaker("naver").allow()
+    assert 0 < breakers.breaker("naver").retry_in() <= naver.open_seconds
+    assert breakers.breaker("aligo").state == circuit_breaker.CLOSED
+    assert breakers.breaker("aligo").snapshot()["consecutive_failures"] == 2
+
+
+def test_expired_open_state_allows_probe(breakers):
+    breakers.restore({"coupang": (circuit_breaker.OPEN, 5, 0.0)})   # 차단 시간이 이미 지남
+
+    br = breakers.breaker("coupang")
+    assert br.allow()
+    assert not br.allow()   # half-open: 시험 요청 1건만
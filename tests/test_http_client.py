@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""동기/비동기 모드가 같이 쓰는 재시도 규칙"""
+from autoalim import http_client
+
+
+def test_retryable_methods():
+    assert http_client.retryable("GET")
+    assert http_client.retryable("get")
+    assert not http_client.retryable("POST")            # 서버가 받았을 수 있는 POST 는 다시 보내지 않음
+    assert http_client.retryable("POST", connected=False)
+    assert http_client.retryable("GET", connected=False)
+
+
+def test_backoff_doubles_after_first_retry(monkeypatch):
+    monkeypatch.setattr(http_client, "BACKOFF", 0.5)
+    monkeypatch.setattr(http_client, "BACKOFF_JITTER", 0)
+    assert [http_client.backoff_seconds(n) for n in (1, 2, 3, 4)] == [0.0, 1.0, 2.0, 4.0]
+
+
+def test_backoff_jitter_and_disable(monkeypatch):
+    monkeypatch.setattr(http_client, "BACKOFF", 0.5)
+    monkeypatch.setattr(http_client, "BACKOFF_JITTER", 0.25)
+    assert all(1.0 <= http_client.backoff_seconds(2) <= 1.25 for _ in range(50))
+    monkeypatch.setattr(http_client, "BACKOFF", 0)
+    assert http_client.backoff_seconds(3) == 0.0
+
+
+def test_sync_retry_uses_shared_policy(monkeypatch):
+    monkeypatch.setattr(http_client, "_sessions", {})
+    retry = http_client.session_for("http://127.0.0.1/").get_adapter("http://127.0.0.1/").max_retries
+    assert isinstance(retry, http_client.JitterRetry)
+    assert retry.total == http_client.GET_RETRIES
+    assert set(retry.status_forcelist) == http_client.RETRY_STATUSES
+    assert retry.allowed_methods == http_client.RETRY_METHODS
+
+
+def test_history_has_its_own_family():
+    assert http_client.family_of("aligo_send") == "aligo"
+    assert http_client.family_of("aligo_history") == "aligo_history"
+    assert http_client.breaker_for("aligo_history") is not http_client.breaker_for("aligo_send")
+    assert http_client.limiter_for("aligo_history") is not http_client.limiter_for("aligo_send")
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Projection: json.loads 경로와 ijson 스트리밍 경로가 같은 레코드를 만드는지"""
+import asyncio
+import io
+import json
+
+import pytest
+
+from autoalim.coupang import COUPANG_ORDER
+from autoalim.json_projection import Projection
+
+pytest.importorskip("ijson")
+
+
+def _sheet(order_id, items, **receiver):
+    sheet = {"orderId": order_id, "receiver": {"addr1": "서울 중구", **receiver}, "paidAt": "2024-05-03T10:00:00"}
+    if items is not None:
+        sheet["orderItems"] = items
+    return sheet
+
+
+BODY = json.dumps({
+    "data": [
+        _sheet(1, [{"vendorItemName": "첫 상품"}, {"vendorItemName": "둘째 상품"}], safeNumber="0504-1234-5678"),
+        _sheet(2, [{"sellerProductName": "이름 없음"}, {"vendorItemName": "둘째 상품"}], receiverNumber="010-1"),
+        _sheet(3, [{"vendorItemName": None}, {"vendorItemName": "둘째 상품"}]),
+        _sheet(4, [[], {"vendorItemName": "목록 다음 상품"}]),
+        _sheet(5, []),
+        _sheet(6, None),
+        _sheet(7, [{"vendorItemName": "하나뿐"}]),
+    ],
+    "nextToken": "abc",
+}, ensure_ascii=False).encode("utf-8")
+
+
+def _both(projection, body):
+    return projection.from_bytes(body), projection.from_stream(io.BytesIO(body))
+
+
+def test_coupang_stream_matches_json_on_multi_item_orders():
+    loaded, streamed = _both(COUPANG_ORDER, BODY)
+    assert streamed == loaded
+    assert [r.product for r in loaded[0]] == ["첫 상품", None, None, None, None, None, "하나뿐"]
+    assert loaded[1] == {"nextToken": "abc"}
+
+
+def test_stream_matches_json_for_other_positions():
+    projection = Projection("Second", "data", {
+        "order_id": "orderId",
+        "first": "orderItems.0.vendorItemName",
+        "second": "orderItems.1.vendorItemName",
+        "third": "orderItems.2.vendorItemName",
+    })
+    loaded, streamed = _both(projection, BODY)
+    assert streamed == loaded
+    assert [r.second for r in loaded[0]] == ["둘째 상품", "둘째 상품", "둘째 상품", "목록 다음 상품", None, None, None]
+
+
+class _AsyncReader:
+    """aiohttp StreamReader 처럼 read(n) 을 await 로 주는 객체"""
+
+    def __init__(self, body):
+        self._fp = io.BytesIO(body)
+
+    async def read(self, n=-1):
+        return self._fp.read(7 if n < 0 else min(n, 7))   # 작은 조각으로 나눠 줌
+
+
+def test_async_stream_matches_json():
+    streamed = asyncio.run(COUPANG_ORDER.from_stream_async(_AsyncReader(BODY)))
+    assert streamed == COUPANG_ORDER.from_bytes(BODY)
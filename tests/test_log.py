@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""log: 전화번호만 가리고 주문번호·시각 등은 그대로, 예외는 JSONL 의 "exc" 필드로"""
+import json
+import logging
+
+import pytest
+
+from autoalim import log
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("010-1234-5678", "010-****-5678"),
+    ("01012345678", "010-****-5678"),
+    ("010 1234 5678", "010-****-5678"),
+    ("011-123-4567", "011-****-4567"),
+    ("+82 10-1234-5678", "+82 10-****-5678"),
+    ("+821012345678", "+8210-****-5678"),
+    ("0504-1234-5678", "0504-****-5678"),
+    ("0505-123-4567", "0505-****-4567"),
+    ("02-123-4567", "02-****-4567"),
+    ("031-1234-5678", "031-****-5678"),
+    ("070-1234-5678", "070-****-5678"),
+    ("수신 010-1234-5678 / 010-8765-4321", "수신 010-****-5678 / 010-****-4321"),
+])
+def test_phone_is_masked(text, expected):
+    assert log.redact(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "8212345678901",            # 쿠팡 주문번호 (82 로 시작)
+    "821012345678",             # 구분자 없는 82 는 국가번호로 보지 않음
+    "2024050312345678",         # 네이버 주문번호
+    "N000000591",
+    "0123456789",               # 없는 국번
+    "010-1234-56789",           # 자릿수가 맞지 않음
+    "010-1234 5678",            # 구분자가 섞임
+    "1566-3321",                # 대표번호
+    "2024-05-03T10:00:00.123+09:00",
+])
+def test_non_phone_is_untouched(text):
+    assert log.redact(text) == text
+
+
+def test_json_log_keeps_order_id():
+    record = logging.LogRecord("autoalim", logging.INFO, __file__, 1, "📨 발송", None, None)
+    record.event = "order_sent"
+    record.fields = {"order_id": "8212345678901", "phone": "01012345678"}
+    data = json.loads(log.JsonFormatter().format(record))
+    assert data["order_id"] == "8212345678901"
+    assert data["phone"] == "010-****-5678"
+
+
+def test_traceback_reaches_jsonl(tmp_path, monkeypatch):
+    monkeypatch.setattr(log, "LOG_CONSOLE", False)
+    path = tmp_path / "autoalim.jsonl"
+    log.setup(path)
+    try:
+        try:
+            {}["missing"]
+        except KeyError as e:
+            log.error("poll_failed", f"❌ 처리 실패: {e}", exc_info=True, phone="010-1234-5678")
+    finally:
+        log.shutdown()
+
+    [line] = path.read_text(encoding="utf-8").splitlines()
+    data = json.loads(line)
+    assert data["event"] == "poll_failed"
+    assert data["msg"] == "❌ 처리 실패: 'missing'"       # traceback 은 메시지에 섞이지 않음
+    assert data["exc"].startswith("Traceback")
+    assert "KeyError: 'missing'" in data["exc"]
+    assert data["phone"] == "010-****-5678"
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""pick_new_orders: 변경 상태 목록에서 상세 조회할 상품주문 고르기"""
+from autoalim.naver import NAVER_CHANGE, pick_new_orders
+from autoalim.sent_store import SentStore
+
+
+def _change(order_id, product_order_id, status="PAYED"):
+    return NAVER_CHANGE.record(product_order_id, order_id, status)
+
+
+def test_keeps_one_payed_product_order_per_order():
+    changes = [
+        _change("O1", "P1"),
+        _change("O1", "P2"),                       # 같은 주문의 다른 상품 → 주문당 1번만 상세 조회
+        _change("O2", "P3", "DELIVERING"),         # 결제완료가 아님
+        _change("O3", "P4", None),                 # 상태가 없는 변경은 결제완료로 봄
+    ]
+    assert pick_new_orders("naver", changes, set()) == ["P1", "P4"]
+
+
+def test_seen_orders_skipped_across_pages():
+    seen = set()
+    assert pick_new_orders("naver", [_change("O1", "P1")], seen) == ["P1"]
+    assert pick_new_orders("naver", [_change("O1", "P9"), _change("O2", "P2")], seen) == ["P2"]
+    assert seen == {"O1", "O2"}
+
+
+def test_skip_drops_sent_or_queued_orders(tmp_path):
+    store = SentStore(tmp_path / "sent.db")
+    try:
+        store.enqueue("store-b:naver", "O1", "010-1111-1111")
+        asked = []
+
+        def skip(key, order_ids):
+            asked.append((key, sorted(order_ids)))
+            return store.known(key, order_ids)
+
+        changes = [_change("O1", "P1"), _change(2, "P2")]
+        assert pick_new_orders("store-b:naver", changes, set(), skip) == ["P2"]
+        assert asked == [("store-b:naver", ["2", "O1"])]   # 주문번호는 문자열로, 한 번에 물어봄
+    finally:
+        store.close()
+
+
+def test_skip_not_called_without_candidates():
+    def skip(key, order_ids):
+        raise AssertionError("후보가 없으면 조회하지 않아야 함")
+
+    assert pick_new_orders("naver", [_change("O1", "P1", "CANCELED")], set(), skip) == []
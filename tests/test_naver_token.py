@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""TokenCache: 파일을 같이 쓰는 여러 호출자, 만료 전 백그라운드 갱신"""
+import json
+import threading
+import time
+
+import pytest
+
+from autoalim import naver
+from autoalim.accounts import Account
+
+CREDENTIALS = {"client_id": "id", "client_secret": "secret", "account_id": "seller-1"}
+
+
+@pytest.fixture
+def mint(tmp_path, monkeypatch):
+    """_request_token 대신 호출 횟수를 세는 가짜 발급. gate 가 열릴 때까지 발급을 붙잡아 둘 수 있습니다."""
+    monkeypatch.setattr(naver, "TOKEN_FILE", str(tmp_path / "token"))
+    minted = []
+    gate = threading.Event()
+    gate.set()
+
+    def fake(credentials):
+        gate.wait(5)
+        time.sleep(0.05)   # 발급에 시간이 걸리는 동안 다른 호출자가 잠금을 기다림
+        minted.append(credentials["account_id"])
+        return {"access_token": f"token-{len(minted)}", "expires_at": time.time() + 10800,
+                "account_id": credentials["account_id"]}
+
+    monkeypatch.setattr(naver, "_request_token", fake)
+    return minted, gate
+
+
+def _cache():
+    """프로세스마다 따로 가진 TokenCache (메모리 캐시는 공유하지 않음)"""
+    return naver.TokenCache(Account("default", naver=CREDENTIALS))
+
+
+def _store(cache, token, expires_in):
+    cache._write_file({"access_token": token, "expires_at": time.time() + expires_in, "account_id": "seller-1"})
+
+
+def test_concurrent_callers_reuse_one_minted_token(mint):
+    minted, _ = mint
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(_cache().get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert minted == ["seller-1"]             # 잠금을 기다린 쪽은 파일을 다시 읽어 그 토큰을 씀
+    assert results == ["token-1"] * 8
+    assert _cache().get() == "token-1"
+
+
+def test_inside_refresh_margin_returns_current_token_without_blocking(mint):
+    minted, gate = mint
+    cache = _cache()
+    _store(cache, "old", naver.REFRESH_MARGIN - 100)
+    gate.clear()                              # 발급이 끝나지 않는 동안에도
+
+    started = time.monotonic()
+    assert [cache.get() for _ in range(5)] == ["old"] * 5
+    assert time.monotonic() - started < 0.5
+    assert minted == []
+
+    gate.set()
+    cache._refresh_thread.join(5)
+    assert minted == ["seller-1"]             # 백그라운드 갱신은 한 번만
+    assert cache.get() == "token-1"
+    with open(cache.path) as f:
+        assert json.load(f)["access_token"] == "token-1"
+
+
+def test_refresh_margin_token_minted_elsewhere_is_reused(mint):
+    minted, _ = mint
+    cache = _cache()
+    _store(cache, "old", naver.REFRESH_MARGIN - 100)
+    assert cache.get() == "old"
+    cache._refresh_thread.join(5)
+    assert minted == ["seller-1"]
+
+    other = _cache()                          # 다른 프로세스도 갱신하려 하지만 잠금 안에서 새 토큰을 봄
+    assert other.refresh()["access_token"] == "token-1"
+    assert minted == ["seller-1"]
+
+
+def test_expired_or_foreign_token_is_minted_synchronously(mint):
+    minted, _ = mint
+    cache = _cache()
+    cache._write_file({"access_token": "other", "expires_at": time.time() + 10800, "account_id": "seller-2"})
+    assert cache.get() == "token-1"           # 다른 판매자 계정의 토큰은 쓰지 않음
+
+    _store(cache, "stale", naver.MIN_VALID_SECONDS - 1)
+    assert _cache().get() == "token-2"
+    assert minted == ["seller-1", "seller-1"]
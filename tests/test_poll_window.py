@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""poll_window: 워터마크는 Provider.incremental 인 판매처에만"""
+from datetime import datetime, timedelta
+
+from autoalim import marketplace
+from autoalim.config import KST, MAX_LOOKBACK
+from autoalim.pipeline import WATERMARK_OVERLAP, poll_window
+from autoalim.sent_store import SentStore
+
+
+def test_watermark_only_for_incremental_providers(tmp_path):
+    sent = SentStore(tmp_path / "sent.db")
+    now = datetime(2024, 5, 3, 12, 0, tzinfo=KST)
+    mark = now - timedelta(minutes=5)
+    try:
+        for name in ("naver", "coupang"):
+            sent.set_watermark(name, mark.timestamp())
+
+        naver = marketplace.get("naver")
+        assert naver.incremental
+        assert poll_window(sent, "naver", now, naver.max_window, naver.incremental) == (mark - WATERMARK_OVERLAP, now)
+
+        # 쿠팡은 주문 생성 시각으로 조회하므로 나중에 상품준비중이 된 옛 주문을 위해 매번 전체 구간
+        coupang = marketplace.get("coupang")
+        assert not coupang.incremental
+        assert poll_window(sent, "coupang", now, coupang.max_window, coupang.incremental) == (now - MAX_LOOKBACK, now)
+    finally:
+        sent.close()
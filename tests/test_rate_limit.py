@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""AdaptiveRateLimiter: 429 에 속도를 반으로, Retry-After 동안 멈춤, 연속 성공 뒤 회복"""
+import pytest
+
+from autoalim import rate_limit
+from autoalim.rate_limit import AdaptiveRateLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_paces_requests_at_rate(clock):
+    limiter = AdaptiveRateLimiter("test", rate=10, burst=1, clock=clock)
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == pytest.approx(0.1)
+    clock.now += 1.0
+    assert limiter.reserve() == 0.0
+
+
+def test_429_halves_rate_down_to_floor(clock):
+    limiter = AdaptiveRateLimiter("test", rate=10, clock=clock)
+    assert limiter.observe(429) == 0.0
+    assert limiter.rate == 5
+    for _ in range(20):
+        limiter.observe(429)
+    assert limiter.rate == pytest.approx(10 * rate_limit.MIN_RATIO)
+    assert limiter.throttled == 21
+
+
+def test_retry_after_blocks_requests(clock):
+    limiter = AdaptiveRateLimiter("test", rate=100, burst=5, clock=clock)
+    assert limiter.observe(429, "2") == 2.0
+    assert limiter.reserve() == pytest.approx(2.0)
+    assert limiter.snapshot()["blocked_for"] == pytest.approx(2.0)
+    clock.now += 2.5
+    assert limiter.reserve() == 0.0
+
+
+def test_503_with_retry_after_throttles_without_retry(clock):
+    limiter = AdaptiveRateLimiter("test", rate=10, clock=clock)
+    assert limiter.observe(503, "1") is None
+    assert limiter.rate == 5
+    assert limiter.reserve() == pytest.approx(1.0)
+
+
+def test_recovers_after_consecutive_successes(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit, "INCREASE_AFTER", 3)
+    limiter = AdaptiveRateLimiter("test", rate=10, clock=clock)
+    limiter.observe(429)
+    assert limiter.rate == 5
+
+    for _ in range(2):
+        limiter.observe(200)
+    assert limiter.rate == 5
+    limiter.observe(200)
+    assert limiter.rate == pytest.approx(5 + 10 * rate_limit.INCREASE_RATIO)
+
+    limiter.observe(200)
+    limiter.observe(429)                      # 실패가 끼면 연속 성공 수는 처음부터
+    limiter.observe(200)
+    limiter.observe(200)
+    assert limiter.rate == pytest.approx(3)
+
+    for _ in range(100):
+        limiter.observe(200)
+    assert limiter.rate == 10                 # 설정한 최대 속도를 넘지 않음
+
+
+def test_server_errors_do_not_count_as_success(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit, "INCREASE_AFTER", 1)
+    limiter = AdaptiveRateLimiter("test", rate=10, clock=clock)
+    limiter.observe(429)
+    limiter.observe(503)
+    assert limiter.rate == 5
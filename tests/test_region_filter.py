@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""RegionMatcher: 표기가 다른 주소, 시/도 없는 주소, 우편번호, 빈 주소"""
+import pytest
+
+from autoalim.region_filter import DEFAULT_RULES, RegionMatcher
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return RegionMatcher(DEFAULT_RULES)
+
+
+@pytest.mark.parametrize("address", ["", " ", "\t\n", "12345", "[12345]  "])
+def test_blank_address_is_not_excluded(matcher, address):
+    assert not matcher.excluded(address)
+
+
+@pytest.mark.parametrize("address, excluded", [
+    ("제주특별자치도 제주시 연동 1", True),
+    ("제주시 연동 1", True),                  # 시/도 전체 규칙("제주")의 시
+    ("서귀포시 중앙로 1", True),
+    ("춘천시 효자동", True),                  # "강원"
+    ("보령시 대천동", True),                  # 시 규칙("충남 보령시")
+    ("충청남도 보령 대천동", True),
+    ("충남 천안시 동남구", False),
+    ("고성군 고성읍", False),                 # 경남 고성일 수도 있음
+    ("서울 중구 세종대로 110", False),
+])
+def test_excluded(matcher, address, excluded):
+    assert matcher.excluded(address) is excluded
+
+
+@pytest.mark.parametrize("address", ["12345 제주특별자치도 제주시 연동", "(12345) 제주시 연동", "[32345] 충남 보령시 대천동"])
+def test_leading_postcode_is_skipped(matcher, address):
+    assert matcher.excluded(address)
+
+
+def test_shared_city_name_needs_every_province_excluded():
+    assert RegionMatcher(["강원", "경남"]).excluded("고성군 거진읍")
+    assert not RegionMatcher(["강원"]).excluded("고성군 거진읍")
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""run_lock: 겹친 실행은 트리거 파일로 요청을 넘기고, 잠금을 가진 실행이 한 번 더 돕니다."""
+import threading
+
+import pytest
+
+from autoalim import run_lock
+from autoalim.file_lock import FileLock
+
+
+@pytest.fixture(autouse=True)
+def lock_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_lock, "RUN_LOCK_FILE", tmp_path / "run.lock")
+    monkeypatch.setattr(run_lock, "RUN_TRIGGER_FILE", tmp_path / "run.trigger")
+    monkeypatch.setattr(run_lock, "RUN_OVERLAP", "handoff")
+
+
+def test_overlapping_run_hands_off_to_holder():
+    calls = []
+
+    def overlapping():
+        calls.append("late")
+
+    def work():
+        calls.append("run")
+        if len(calls) == 1:
+            # 작업 스케줄러가 이번 회차가 끝나기 전에 다음 실행을 띄움 (여러 번 와도 한 번으로)
+            assert run_lock.exclusive("run", overlapping) == 0
+            assert run_lock.exclusive("run", overlapping) == 0
+            assert run_lock.pending()
+
+    assert run_lock.exclusive("run", work) == 2
+    assert calls == ["run", "run"]           # 넘겨받은 요청은 잠금을 가진 쪽이 처리
+    assert not run_lock.pending()
+
+
+def test_exit_mode_drops_overlapping_run(monkeypatch):
+    monkeypatch.setattr(run_lock, "RUN_OVERLAP", "exit")
+    calls = []
+
+    def work():
+        calls.append("run")
+        assert run_lock.exclusive("run", lambda: calls.append("late")) == 0
+
+    assert run_lock.exclusive("run", work) == 1
+    assert calls == ["run"]
+    assert not run_lock.pending()
+
+
+def test_stale_trigger_is_consumed_by_next_run():
+    run_lock.request_run()                  # 예전 실행이 남기고 간 요청
+    calls = []
+    assert run_lock.exclusive("run", lambda: calls.append("run")) == 1
+    assert calls == ["run"] and not run_lock.pending()
+
+
+def test_daemon_takes_trigger_once():
+    run_lock.request_run()
+    run_lock.request_run()
+    assert run_lock.take_trigger()
+    assert not run_lock.take_trigger()
+
+
+def test_wait_acquires_after_release():
+    holder = FileLock(run_lock.RUN_LOCK_FILE)
+    assert holder.acquire(blocking=False)
+    timer = threading.Timer(0.2, holder.release)
+    timer.start()
+    try:
+        lock = run_lock.wait("backfill", poll_interval=0.05)
+    finally:
+        timer.join()
+    assert lock is not None and lock.locked
+    lock.release()
+
+
+def test_wait_gives_up_when_stopped():
+    holder = FileLock(run_lock.RUN_LOCK_FILE)
+    assert holder.acquire(blocking=False)
+    stop = threading.Event()
+    stop.set()
+    try:
+        assert run_lock.wait("daemon", stop=stop, poll_interval=0.05) is None
+    finally:
+        holder.release()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""SendBudget: 하루 발송 한도는 수신자(알림톡) 단위로 셉니다."""
+from datetime import datetime
+
+import pytest
+
+from autoalim import pipeline
+from autoalim.aligo import normalize_phone, recipient_count
+from autoalim.config import KST
+from autoalim.pipeline import SendBudget
+from autoalim.sent_store import SentStore
+
+
+@pytest.fixture
+def sent(tmp_path):
+    store = SentStore(tmp_path / "sent.db")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def today(monkeypatch):
+    """pipeline 이 보는 지금 시각을 바꿀 수 있게 합니다."""
+    clock = {"now": datetime(2024, 5, 3, 12, 0, tzinfo=KST)}
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock["now"]
+
+    monkeypatch.setattr(pipeline, "datetime", FakeDatetime)
+    return clock
+
+
+def _send(sent, orders):
+    """대기열에 넣고 꺼내서 한 묶음으로 ack (발송 워커와 같은 순서)"""
+    for key, phone in orders:
+        sent.enqueue(*key, phone, normalize_phone(phone))
+    batch = sent.claim(100)
+    sent.ack([key for key, _ in batch], phones=dict(batch))
+    return batch
+
+
+def test_take_and_refund(sent, today):
+    budget = SendBudget(sent, 5)
+    assert budget.take(3) == 3
+    assert budget.take(3) == 2
+    assert budget.take(1) == 0
+    budget.refund(2)
+    assert budget.remaining() == 2
+    budget.refund(10)
+    assert budget.remaining() == 5
+
+
+def test_restart_counts_coalesced_orders_once(sent, today):
+    running = SendBudget(sent, 10)
+    assert running.take(10) == 10          # 발송 워커: 꺼내기 전에 자리를 잡고
+    # 같은 수신자의 주문 3건 + 다른 수신자 1건 → 알림톡 2건
+    batch = _send(sent, [(("naver", "1"), "010-1111-1111"), (("naver", "2"), "01011111111"),
+                         (("coupang", "3"), "010 1111 1111"), (("coupang", "4"), "010-2222-2222")])
+    running.refund(10 - recipient_count(batch))   # 못 쓴 자리는 돌려줌
+
+    restarted = SendBudget(sent, 10)    # 다시 시작한 프로세스는 DB 에서 셈
+    assert restarted.remaining() == running.remaining() == 8
+
+
+def test_separate_sends_to_same_recipient_count_separately(sent, today):
+    _send(sent, [(("naver", "1"), "010-1111-1111")])
+    _send(sent, [(("naver", "2"), "010-1111-1111")])
+    assert SendBudget(sent, 10).remaining() == 8
+
+
+def test_rollover_recounts_from_store(sent, today):
+    budget = SendBudget(sent, 3)
+    assert budget.take(3) == 3
+    assert budget.take(1) == 0
+
+    today["now"] = datetime(2024, 5, 4, 0, 1, tzinfo=KST)   # 자정이 지남: 오늘 보낸 기록은 없음
+    assert budget.take(2) == 2
+    assert budget.remaining() == 1
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""SentStore: 발송 대기열(claim / lease / ack / nack)과 여러 프로세스(연결)가 같은 파일을 쓸 때의 중복 발송 방지"""
+from types import SimpleNamespace
+
+import pytest
+
+from autoalim import sent_store
+from autoalim.sent_store import SentStore
+
+
+def test_enqueue_skips_order_sent_by_another_store(tmp_path):
+    path = tmp_path / "sent.db"
+    a = SentStore(path)
+    b = SentStore(path)   # a 가 보내기 전에 연 다른 프로세스 (메모리 인덱스가 비어 있음)
+    try:
+        assert a.enqueue("naver", "X", "010-1234-5678")
+        [(key, phone)] = a.claim(10)
+        a.ack([key])
+
+        assert not b.enqueue("naver", "X", "010-1234-5678")
+        assert b.claim(10) == []
+        assert b.known("naver", ["X", "Y"]) == {"X"}
+    finally:
+        a.close()
+        b.close()
+
+
+def test_enqueue_skips_order_queued_by_another_store(tmp_path):
+    path = tmp_path / "sent.db"
+    a = SentStore(path)
+    b = SentStore(path)
+    try:
+        assert a.enqueue("coupang", "1", "01012345678")
+        assert not b.enqueue("coupang", "1", "01012345678")
+        assert b.enqueue("coupang", "2", "01012345678")
+    finally:
+        a.close()
+        b.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """sent_store 가 보는 time.time() 을 직접 움직입니다."""
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(sent_store, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def test_lease_blocks_reclaim_until_it_expires(tmp_path, clock):
+    store = SentStore(tmp_path / "sent.db")
+    try:
+        store.enqueue("naver", "1", "010-1111-1111")
+        assert [key for key, _ in store.claim(10, lease_seconds=60)] == [("naver", "1")]
+        assert store.claim(10, lease_seconds=60) == []      # 다른 워커는 lease 중인 주문을 못 꺼냄
+
+        clock[0] += 61                                       # 발송 중 프로세스가 죽어 ack/nack 이 없었음
+        assert [key for key, _ in store.claim(10, lease_seconds=60)] == [("naver", "1")]
+    finally:
+        store.close()
+
+
+def test_nack_backs_off_and_dead_rows_stop_after_max_attempts(tmp_path, clock):
+    store = SentStore(tmp_path / "sent.db", max_attempts=2)
+    try:
+        store.enqueue("naver", "1", "010-1111-1111")
+        [(key, _)] = store.claim(10)
+        store.nack([key], error="boom")
+        assert store.claim(10) == []                         # RETRY_BASE_SECONDS 동안은 다시 꺼내지 않음
+
+        clock[0] += sent_store.RETRY_BASE_SECONDS
+        [(key, _)] = store.claim(10)
+        store.nack([key], error="boom")
+        assert store.outbox_stats() == {"pending": 0, "dead": 1}
+
+        clock[0] += sent_store.RETRY_MAX_SECONDS
+        assert store.claim(10) == []                         # 재시도 한도를 넘은 주문은 더 보내지 않음
+        assert not store.enqueue("naver", "1", "010-1111-1111")   # 대기열에 남아 있으므로 다시 들어오지도 않음
+    finally:
+        store.close()
+
+
+def test_claim_takes_held_siblings_of_same_recipient(tmp_path, clock):
+    store = SentStore(tmp_path / "sent.db")
+    try:
+        store.enqueue("naver", "1", "010-1111-1111", "01011111111")
+        clock[0] += 5
+        store.enqueue("coupang", "2", "010 1111 1111", "01011111111")   # 같은 수신자, 아직 hold 중
+        store.enqueue("coupang", "3", "010-2222-2222", "01022222222")   # 다른 수신자, 아직 hold 중
+
+        batch = store.claim(10, hold_seconds=3)
+
+        assert sorted(key for key, _ in batch) == [("coupang", "2"), ("naver", "1")]
+        clock[0] += 3
+        assert [key for key, _ in store.claim(10, hold_seconds=3)] == [("coupang", "3")]
+    finally:
+        store.close()
+
+
+def test_ack_moves_orders_to_sent(tmp_path, clock):
+    store = SentStore(tmp_path / "sent.db")
+    try:
+        store.enqueue("naver", "1", "010-1111-1111")
+        batch = store.claim(10)
+        store.ack([key for key, _ in batch], mids={("naver", "1"): "77"}, phones=dict(batch))
+
+        assert store.outbox_stats() == {"pending": 0, "dead": 0}
+        assert store.contains("naver", "1")
+        assert store.accepted_by_mid(clock[0] + 1) == {"77": [(("naver", "1"), "010-1111-1111", clock[0], 0)]}
+        assert not store.enqueue("naver", "1", "010-1111-1111")
+    finally:
+        store.close()